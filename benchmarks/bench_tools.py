@@ -0,0 +1,258 @@
+"""
+Нагрузочный бенчмарк инструментов MCP сервера.
+
+Поднимает заменитель координатора Trino (fake_trino.py) в отдельном
+процессе, затем для каждого сценария запускает --clients конкурентных
+клиентов, каждый из которых делает --requests вызовов инструмента.
+Инструменты вызываются напрямую как корутины, так же как их вызывает
+FastMCP. Для каждого сценария выводятся пропускная способность,
+p50/p90/p99 задержки и число ошибок.
+
+Результаты можно сохранить (--json) и сравнить с предыдущим запуском
+(--baseline): при росте p50/p99 больше --max-regression процентов
+бенчмарк завершается с кодом 1.
+
+Запуск из корня репозитория::
+
+    python benchmarks/bench_tools.py --clients 8 --requests 50 --latency-ms 2
+    python benchmarks/bench_tools.py --scenarios execute_query,describe_table \\
+        --rows 100000 --spooling --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+import fake_trino
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DDL = [
+    "CREATE TABLE hive.default.bench_orders (id bigint, customer varchar(64))",
+    "CREATE VIEW hive.default.bench_view AS SELECT id FROM hive.default.bench_orders",
+]
+
+
+def scenarios(tools) -> Dict[str, Callable[[str], Awaitable[Dict[str, Any]]]]:
+    """
+    Сценарии бенчмарка: имя -> вызов инструмента по jdbc_url.
+
+    :param tools: Пакет src.application.tools
+    :return: Сценарии в порядке выполнения
+    """
+    from src.core.export_writers import parquet_available
+
+    table = {"table": "orders", "schema": "default", "catalog": "hive"}
+    select = "SELECT * FROM hive.default.orders"
+    result = {
+        "connection_status": lambda url: tools.connection_status(url),
+        "list_catalogs": lambda url: tools.list_catalogs(url),
+        "list_tables": lambda url: tools.list_tables(
+            url, schema="default", catalog="hive"
+        ),
+        "describe_table": lambda url: tools.describe_table(url, **table),
+        "table_stats": lambda url: tools.table_stats(url, **table),
+        "diff_schemas": lambda url: tools.diff_schemas(
+            url,
+            "default",
+            source_catalog="hive",
+            target_catalog="iceberg",
+            generate_ddl=True,
+        ),
+        "view_lineage": lambda url: tools.view_lineage(
+            url, "hive.default.orders", catalogs=["hive", "iceberg"]
+        ),
+        "execute_query": lambda url: tools.execute_query(url, select, limit=1000),
+        "execute_query_prepared": lambda url: tools.execute_query(
+            url, f"{select} WHERE id > ?", limit=1000, parameters=[0]
+        ),
+        "execute_query_summary": lambda url: tools.execute_query(
+            url, select, limit=100000, result_format="summary"
+        ),
+        "export_query_csv": lambda url: tools.export_query(url, select),
+        "execute_queries": lambda url: tools.execute_queries(
+            url, [f"{select} WHERE id % 5 = {i}" for i in range(5)], limit=100
+        ),
+        "validate_ddl_statements": lambda url: tools.validate_ddl_statements(DDL),
+        "execute_ddl_statements": lambda url: tools.execute_ddl_statements(
+            url, DDL, catalog="hive", schema="default"
+        ),
+    }
+    # Parquet требует extra parquet (pyarrow), без него сценарий пропускается
+    if parquet_available():
+        result["export_query_parquet"] = lambda url: tools.export_query(
+            url, select, export_format="parquet"
+        )
+    return result
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль с линейной интерполяцией."""
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+async def run_scenario(
+    call: Callable[[str], Awaitable[Dict[str, Any]]],
+    jdbc_url: str,
+    clients: int,
+    requests: int,
+) -> Dict[str, Any]:
+    """
+    Выполняет сценарий конкурентными клиентами.
+
+    :return: Пропускная способность, перцентили задержки и число ошибок
+    """
+    await call(jdbc_url)  # прогрев: подключения, кеши, ленивые импорты
+
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def client():
+        for _ in range(requests):
+            started = time.perf_counter()
+            result = await call(jdbc_url)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if isinstance(result, dict) and "error" in result:
+                errors.append(str(result["error"]))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "calls": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies),
+    }
+
+
+def serve_fake(options: Dict[str, Any], conn):
+    """Запускает fake_trino в дочернем процессе и сообщает порт."""
+    server = fake_trino.FakeTrinoServer(
+        ("127.0.0.1", 0), fake_trino.FakeTrino(**options)
+    )
+    conn.send(server.server_address[1])
+    server.serve_forever()
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    max_regression: float,
+) -> List[str]:
+    """
+    Сравнивает результаты с базовым запуском.
+
+    :return: Список регрессий
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ("p50_ms", "p99_ms"):
+            change = (result[metric] - base[metric]) / base[metric] * 100
+            if change > max_regression:
+                regressions.append(
+                    f"{name} {metric}: {base[metric]:.2f} -> {result[metric]:.2f} "
+                    f"(+{change:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=25, help="вызовов на клиента")
+    parser.add_argument("--scenarios", help="список сценариев через запятую")
+    parser.add_argument("--json", type=Path, help="сохранить результаты")
+    parser.add_argument("--baseline", type=Path, help="результаты для сравнения")
+    parser.add_argument("--max-regression", type=float, default=20.0)
+    fake_trino.add_arguments(parser)
+    args = parser.parse_args()
+
+    parent_conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(
+        target=serve_fake,
+        args=(fake_trino.options_from_args(args), child_conn),
+        daemon=True,
+    )
+    server.start()
+    port = parent_conn.recv()
+    jdbc_url = f"jdbc:trino://127.0.0.1:{port}?user=bench&SSL=false"
+
+    # Конфигурация читается при импорте, поэтому src импортируется после
+    # запуска координатора
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Файлы сценариев export_query пишутся во временный каталог
+    export_dir = tempfile.mkdtemp(prefix="bench-exports-")
+    os.environ.setdefault("EXPORT_DIR", export_dir)
+    sys.path.insert(0, str(ROOT))
+    from src.application import tools
+
+    available = scenarios(tools)
+    selected = args.scenarios.split(",") if args.scenarios else list(available)
+    unknown = [name for name in selected if name not in available]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    print(
+        f"clients={args.clients} requests={args.requests} rows={args.rows} "
+        f"page_size={args.page_size} latency_ms={args.latency_ms} "
+        f"spooling={args.spooling}"
+    )
+    header = f"{'scenario':<26}{'calls':>7}{'err':>5}{'rps':>9}"
+    print(header + "".join(f"{m:>10}" for m in ("p50 ms", "p90 ms", "p99 ms", "max")))
+
+    results = {}
+    try:
+        for name in selected:
+            result = asyncio.run(
+                run_scenario(available[name], jdbc_url, args.clients, args.requests)
+            )
+            results[name] = result
+            print(
+                f"{name:<26}{result['calls']:>7}{result['errors']:>5}"
+                f"{result['throughput']:>9.1f}{result['p50_ms']:>10.2f}"
+                f"{result['p90_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['max_ms']:>10.2f}"
+            )
+            if result["first_error"]:
+                print(f"  first error: {result['first_error'][:160]}")
+    finally:
+        server.terminate()
+        shutil.rmtree(export_dir, ignore_errors=True)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        regressions = compare(
+            results, json.loads(args.baseline.read_text()), args.max_regression
+        )
+        if regressions:
+            print("\nregressions:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nno regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Микробенчмарк анализатора DDL.
+
+Генерирует воспроизводимые наборы CREATE TABLE / CREATE VIEW / DROP
+возрастающего размера (широкие таблицы, вложенные ROW/ARRAY/MAP, длинные
+определения представлений с цепочками JOIN) и измеряет время и пиковую
+память (tracemalloc) каждой фазы анализатора отдельно и analyze_ddl_list
+целиком.
+
+По результатам для каждой фазы оценивается показатель роста: наклон
+log(время) от log(размера) между соседними размерами. Линейная фаза
+дает ~1.0, квадратичная ~2.0. Если показатель больше --max-exponent,
+бенчмарк завершается с кодом 1.
+
+Запуск из корня репозитория::
+
+    python benchmarks/ddl_analyzer.py
+    python benchmarks/ddl_analyzer.py --sizes 500,2000,8000 --columns 10,100,800
+"""
+
+import argparse
+import gc
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCALAR_TYPES = [
+    "bigint",
+    "integer",
+    "double",
+    "boolean",
+    "date",
+    "timestamp(3)",
+    "varchar(255)",
+    "decimal(38, 9)",
+]
+
+
+def random_type(rng: random.Random, depth: int = 0) -> str:
+    """
+    Генерирует тип колонки, в том числе вложенный.
+
+    :param rng: Генератор случайных чисел
+    :param depth: Текущая глубина вложенности
+    :return: Тип Trino
+    """
+    if depth >= 3 or rng.random() < 0.7:
+        return rng.choice(SCALAR_TYPES)
+    kind = rng.choice(("row", "array", "map"))
+    if kind == "array":
+        return f"ARRAY({random_type(rng, depth + 1)})"
+    if kind == "map":
+        return f"MAP(varchar, {random_type(rng, depth + 1)})"
+    fields = ", ".join(
+        f"f{i} {random_type(rng, depth + 1)}" for i in range(rng.randint(2, 5))
+    )
+    return f"ROW({fields})"
+
+
+def create_table(rng: random.Random, name: str, columns: int) -> str:
+    """Генерирует CREATE TABLE с заданным числом колонок."""
+    definitions = []
+    for i in range(columns):
+        column = f"c{i} {random_type(rng)}"
+        if i == 0:
+            column += " NOT NULL"
+        elif rng.random() < 0.1:
+            column += " COMMENT 'column comment'"
+        definitions.append(column)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {name} (\n    "
+        + ",\n    ".join(definitions)
+        + "\n) WITH (format = 'ORC')"
+    )
+
+
+def create_view(rng: random.Random, name: str, tables: List[str], joins: int) -> str:
+    """Генерирует CREATE VIEW с цепочкой JOIN и подзапросом."""
+    picked = [rng.choice(tables) for _ in range(joins + 1)]
+    sql = [f"CREATE VIEW {name} AS", "SELECT t0.c0"]
+    sql += [f"     , t{i}.c0 AS c0_{i}" for i in range(1, len(picked))]
+    sql.append(f"FROM {picked[0]} t0")
+    sql += [
+        f"JOIN {table} t{i} ON t{i}.c0 = t{i - 1}.c0"
+        for i, table in enumerate(picked[1:], 1)
+    ]
+    sql.append(f"WHERE t0.c0 IN (SELECT c0 FROM {rng.choice(tables)})")
+    return "\n".join(sql)
+
+
+def build_bundle(
+    size: int, columns: int = 20, joins: int = 5, seed: int = 42
+) -> List[str]:
+    """
+    Генерирует набор DDL: ~70% таблиц, ~25% представлений, ~5% DROP.
+
+    :param size: Число выражений
+    :param columns: Число колонок в таблицах
+    :param joins: Число JOIN в представлениях
+    :param seed: Зерно генератора
+    :return: Список DDL выражений
+    """
+    rng = random.Random(seed)
+    tables: List[str] = []
+    bundle = []
+    for i in range(size):
+        roll = rng.random()
+        if roll < 0.7 or not tables:
+            name = f"hive.bench.t_{i}"
+            tables.append(name)
+            bundle.append(create_table(rng, name, columns))
+        elif roll < 0.95:
+            bundle.append(create_view(rng, f"hive.bench.v_{i}", tables, joins))
+        else:
+            bundle.append(f"DROP TABLE {rng.choice(tables)}")
+    return bundle
+
+
+def phases(analyzer) -> Dict[str, Callable[[List[str]], Any]]:
+    """
+    Фазы анализатора, каждая применяется ко всему набору.
+
+    :param analyzer: Экземпляр DDLAnalyzer без кеша выражений и пула
+    :return: Имя фазы -> функция над списком DDL
+    """
+    # Повторная валидация неизмененного набора: все выражения из кеша
+    cached_analyzer = type(analyzer)()
+    # Анализ в пуле процессов независимо от размера набора (без кеша)
+    parallel_analyzer = type(analyzer)(cache_size=0, parallel_threshold=1)
+
+    def check_issues(bundle):
+        issues: List[Dict] = []
+        for i, ddl in enumerate(bundle):
+            analyzer._check_ddl_issues(
+                ddl, analyzer.identify_ddl_type(ddl), None, issues, i
+            )
+        return issues
+
+    return {
+        "identify_ddl_type": lambda b: [analyzer.identify_ddl_type(d) for d in b],
+        "extract_object_name": lambda b: [analyzer.extract_object_name(d) for d in b],
+        "extract_dependencies": lambda b: [analyzer.extract_dependencies(d) for d in b],
+        "extract_columns": lambda b: [
+            analyzer.extract_columns_from_create_table(d) for d in b
+        ],
+        "check_ddl_issues": check_issues,
+        "analyze_ddl_list": analyzer.analyze_ddl_list,
+        "analyze_ddl_list_cached": cached_analyzer.analyze_ddl_list,
+        "analyze_ddl_list_parallel": parallel_analyzer.analyze_ddl_list,
+    }
+
+
+def measure(func: Callable[[List[str]], Any], bundle: List[str], repeat: int):
+    """
+    Измеряет фазу: медиану времени и пиковую память отдельным прогоном.
+
+    :return: Время в мс и пик памяти в КиБ
+    """
+    func(bundle)  # прогрев: ленивые регулярные выражения, кеш выражений
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func(bundle)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # tracemalloc замедляет выполнение, поэтому память меряется отдельно
+    gc.collect()
+    tracemalloc.start()
+    func(bundle)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 1024
+
+
+def growth_exponent(sizes: List[int], timings: List[float]) -> float:
+    """Максимальный наклон log(время)/log(размер) между соседними точками."""
+    slopes = [
+        math.log(max(t2, 1e-6) / max(t1, 1e-6)) / math.log(s2 / s1)
+        for (s1, t1), (s2, t2) in zip(zip(sizes, timings), zip(sizes[1:], timings[1:]))
+    ]
+    return max(slopes) if slopes else 0.0
+
+
+def run_series(
+    title: str,
+    bundles: Dict[int, List[str]],
+    analyzer,
+    repeat: int,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Прогоняет все фазы на наборах возрастающего размера и печатает таблицу.
+
+    :param title: Название серии (по какой оси растет размер)
+    :param bundles: Размер -> набор DDL
+    :return: Фаза -> измерения и показатель роста
+    """
+    sizes = list(bundles)
+    print(f"\n{title}")
+    print(
+        f"{'phase':<27}"
+        + "".join(f"{size:>16}" for size in sizes)
+        + f"{'exponent':>10}"
+    )
+
+    results = {}
+    for name, func in phases(analyzer).items():
+        points = [measure(func, bundles[size], repeat) for size in sizes]
+        timings = [ms for ms, _ in points]
+        exponent = growth_exponent(sizes, timings)
+        results[name] = {
+            "sizes": sizes,
+            "ms": [round(ms, 3) for ms in timings],
+            "peak_kib": [round(kib, 1) for _, kib in points],
+            "exponent": round(exponent, 2),
+        }
+        print(
+            f"{name:<27}"
+            + "".join(f"{ms:>8.1f}ms/{kib:>5.0f}K" for ms, kib in points)
+            + f"{exponent:>10.2f}"
+        )
+    return results
+
+
+def parsed_columns(analyzer, bundles: Dict[int, List[str]]) -> Dict[int, float]:
+    """
+    Среднее число колонок, которое анализатор нашел в CREATE TABLE.
+
+    Время extract_columns имеет смысл только вместе с этим числом: если
+    разбор обрывается на первой скобке типа, широкая таблица
+    анализируется так же быстро, как узкая.
+    """
+    parsed = {}
+    for width, bundle in bundles.items():
+        counts = [
+            obj["column_count"]
+            for obj in analyzer.analyze_ddl_list(bundle)["objects"]
+            if "column_count" in obj
+        ]
+        parsed[width] = round(statistics.mean(counts), 1) if counts else 0.0
+    return parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", default="250,1000,4000", help="число выражений в наборе"
+    )
+    parser.add_argument(
+        "--columns", default="10,100,800", help="число колонок в широких таблицах"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-exponent", type=float, default=1.5)
+    parser.add_argument("--json", type=Path, help="сохранить результаты")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    from src.core.ddl_analyzer import DDLAnalyzer
+
+    analyzer = DDLAnalyzer(cache_size=0, parallel_threshold=0)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    widths = [int(width) for width in args.columns.split(",")]
+
+    wide = {width: build_bundle(50, columns=width) for width in widths}
+    results = {
+        "statements": run_series(
+            "bundle size (statements, 20 columns, 5 joins)",
+            {size: build_bundle(size) for size in sizes},
+            analyzer,
+            args.repeat,
+        ),
+        "columns": run_series(
+            "table width (columns, 50 statements)", wide, analyzer, args.repeat
+        ),
+        "joins": run_series(
+            "view length (joins, 50 statements)",
+            {joins: build_bundle(50, joins=joins) for joins in widths},
+            analyzer,
+            args.repeat,
+        ),
+    }
+
+    columns = parsed_columns(analyzer, wide)
+    print(
+        "columns parsed per table: "
+        + ", ".join(f"{width} -> {count}" for width, count in columns.items())
+    )
+
+    if args.json:
+        args.json.write_text(
+            json.dumps({**results, "parsed_columns": columns}, indent=2)
+        )
+
+    superlinear = [
+        f"{series}/{phase}: exponent {result['exponent']}"
+        for series, phase_results in results.items()
+        for phase, result in phase_results.items()
+        if result["exponent"] > args.max_exponent
+    ]
+    if superlinear:
+        print(f"\nsuperlinear phases (exponent > {args.max_exponent}):")
+        for line in superlinear:
+            print(f"  - {line}")
+        sys.exit(1)
+    print(f"\nall phases scale with exponent <= {args.max_exponent}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,560 @@
+"""
+Локальный заменитель координатора Trino для бенчмарков.
+
+Реализует клиентский REST протокол ``/v1/statement``: POST создает запрос,
+клиент опрашивает nextUri и получает страницы строк. Настраиваются
+задержка каждого HTTP ответа, число "пустых" опросов до первых данных,
+размер страницы, число строк результата и, при включенном spooling,
+выдача результата сегментами (первый inline, остальные по ссылке).
+
+Поддерживаются запросы, которые отправляют инструменты сервера:
+SHOW CATALOGS/SCHEMAS/TABLES/STATS, DESCRIBE, EXPLAIN (TYPE IO),
+USE, DDL, SELECT, метаданные схемы и представлений из information_schema, PREPARE/EXECUTE/DEALLOCATE (подготовленные выражения
+передаются в заголовках, как в Trino). Запросы к $partitions/$files завершаются ошибкой
+USER_ERROR, как на коннекторах без служебных таблиц.
+
+Отдельный запуск::
+
+    python benchmarks/fake_trino.py --port 8080 --latency-ms 5 --rows 10000
+"""
+
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote_plus, unquote_plus
+
+VARCHAR = {
+    "rawType": "varchar",
+    "arguments": [{"kind": "LONG", "value": 2147483647}],
+}
+
+
+def _column(name: str, type_name: str) -> Dict[str, Any]:
+    signature = VARCHAR if type_name == "varchar" else {"rawType": type_name}
+    return {
+        "name": name,
+        "type": type_name,
+        "typeSignature": {"arguments": [], **signature},
+    }
+
+
+TABLE_COLUMNS = [
+    ("id", "bigint"),
+    ("customer", "varchar"),
+    ("amount", "double"),
+    ("paid", "boolean"),
+    ("created", "date"),
+]
+_EPOCH = date(2024, 1, 1)
+# Каталог, схема которого отличается от остальных (для diff_schemas)
+DRIFT_CATALOG = "iceberg"
+
+
+def _table_row(i: int) -> List[Any]:
+    return [
+        i,
+        f"customer_{i % 997}",
+        round((i * 7919 % 100000) / 100, 2),
+        i % 3 == 0,
+        (_EPOCH + timedelta(days=i % 365)).isoformat(),
+    ]
+
+
+class FakeQuery:
+    """Запрос: описание колонок, строки или ошибка, состояние выдачи."""
+
+    def __init__(
+        self,
+        query_id: str,
+        columns: Optional[List[Tuple[str, str]]] = None,
+        rows: Optional[List[List[Any]]] = None,
+        row_count: int = 0,
+        error: Optional[str] = None,
+        update_type: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.query_id = query_id
+        self.columns = [_column(n, t) for n, t in columns] if columns else None
+        self.rows = rows
+        self.row_count = len(rows) if rows is not None else row_count
+        self.error = error
+        self.update_type = update_type
+        self.headers = headers or {}
+        self.offset = 0
+        self.polls = 0
+        self.encoding: Optional[str] = None
+
+    def slice(self, start: int, end: int) -> List[List[Any]]:
+        if self.rows is not None:
+            return self.rows[start:end]
+        return [_table_row(i) for i in range(start, min(end, self.row_count))]
+
+
+class FakeTrino:
+    """Состояние заменителя координатора и разбор SQL."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        queued_polls: int = 0,
+        page_size: int = 1000,
+        rows: int = 1000,
+        spooling: bool = False,
+        segment_rows: int = 10000,
+    ):
+        self.latency = latency_ms / 1000
+        self.queued_polls = queued_polls
+        self.page_size = page_size
+        self.rows = rows
+        self.spooling = spooling
+        self.segment_rows = segment_rows
+        self.queries: Dict[str, FakeQuery] = {}
+        self.lock = threading.Lock()
+        self.ids = itertools.count()
+        self.requests = 0
+        # Тексты представлений: (catalog, schema, name) -> SQL
+        self.views: Dict[Tuple[str, str, str], str] = {
+            ("hive", "default", "paid_orders"): "SELECT * FROM orders WHERE paid",
+            ("hive", "default", "customer_totals"): (
+                "SELECT c.customer, sum(o.amount) FROM paid_orders o "
+                "JOIN hive.default.customers c ON o.customer = c.customer GROUP BY 1"
+            ),
+            ("iceberg", "default", "top_customers"): (
+                "SELECT * FROM hive.default.customer_totals ORDER BY 2 DESC LIMIT 10"
+            ),
+        }
+
+    def create_query(self, sql: str, prepared: Dict[str, str]) -> FakeQuery:
+        query_id = f"fake_{next(self.ids)}"
+        query = self._plan(query_id, " ".join(sql.split()), prepared)
+        with self.lock:
+            self.queries[query_id] = query
+        return query
+
+    def _plan(self, query_id: str, sql: str, prepared: Dict[str, str]) -> FakeQuery:
+        upper = sql.upper()
+        if "$PARTITIONS" in upper or "$FILES" in upper:
+            return FakeQuery(query_id, error="Table does not exist")
+        if upper.startswith("PREPARE "):
+            _, name, _, statement = sql.split(" ", 3)
+            return FakeQuery(
+                query_id,
+                update_type="PREPARE",
+                headers={"X-Trino-Added-Prepare": f"{name}={quote_plus(statement)}"},
+            )
+        if upper.startswith("DEALLOCATE PREPARE "):
+            name = sql.split()[2]
+            return FakeQuery(
+                query_id,
+                update_type="DEALLOCATE",
+                headers={"X-Trino-Deallocated-Prepare": name},
+            )
+        if upper.startswith("EXECUTE "):
+            name = sql.split()[1]
+            if name not in prepared:
+                return FakeQuery(
+                    query_id, error=f"Prepared statement not found: {name}"
+                )
+            return self._plan(query_id, prepared[name], prepared)
+        if upper.startswith("USE "):
+            target = sql[4:].strip().split(".")
+            headers = {"X-Trino-Set-Catalog": target[0]} if len(target) > 1 else {}
+            headers["X-Trino-Set-Schema"] = target[-1]
+            return FakeQuery(query_id, update_type="USE", headers=headers)
+        if upper.startswith(("CREATE ", "DROP ", "ALTER ")):
+            return FakeQuery(query_id, update_type=" ".join(upper.split()[:2]))
+        if upper.startswith("SHOW CATALOGS"):
+            return self._values(query_id, "Catalog", ["hive", "iceberg", "system"])
+        if upper.startswith("SHOW SCHEMAS"):
+            return self._values(query_id, "Schema", ["default", "analytics"])
+        if upper.startswith("SHOW TABLES"):
+            return self._values(query_id, "Table", ["orders", "customers", "events"])
+        if upper.startswith("SHOW STATS"):
+            stats = [
+                [name, 1024.0 * self.rows, float(self.rows // 2), 0.0, None, None, None]
+                for name, _ in TABLE_COLUMNS
+            ] + [[None, None, None, None, float(self.rows), None, None]]
+            return FakeQuery(
+                query_id,
+                columns=[
+                    ("column_name", "varchar"),
+                    ("data_size", "double"),
+                    ("distinct_values_count", "double"),
+                    ("nulls_fraction", "double"),
+                    ("row_count", "double"),
+                    ("low_value", "varchar"),
+                    ("high_value", "varchar"),
+                ],
+                rows=stats,
+            )
+        if upper.startswith("DESCRIBE"):
+            return FakeQuery(
+                query_id,
+                columns=[
+                    ("Column", "varchar"),
+                    ("Type", "varchar"),
+                    ("Extra", "varchar"),
+                    ("Comment", "varchar"),
+                ],
+                rows=[[name, type_name, "", ""] for name, type_name in TABLE_COLUMNS],
+            )
+        if upper.startswith("EXPLAIN"):
+            plan = {
+                "inputTableColumnInfos": [
+                    {
+                        "table": {
+                            "catalog": "hive",
+                            "schemaTable": {"schema": "default", "table": "orders"},
+                        },
+                        "constraint": {"none": False, "columnConstraints": []},
+                        "estimate": {
+                            "outputRowCount": float(self.rows),
+                            "outputSizeInBytes": 64.0 * self.rows,
+                        },
+                    }
+                ]
+            }
+            return self._values(query_id, "Query Plan", [json.dumps(plan)])
+        if "INFORMATION_SCHEMA.VIEWS" in upper:
+            return self._view_rows(query_id, sql)
+        if "INFORMATION_SCHEMA.TABLES" in upper:
+            catalog = re.search(r"FROM (\w+)\.information_schema", sql, re.I)
+            return FakeQuery(
+                query_id,
+                columns=[
+                    ("_col0", "varchar"),
+                    ("table_name", "varchar"),
+                    ("table_type", "varchar"),
+                    ("_col3", "varchar"),
+                    ("_col4", "varchar"),
+                    ("ordinal_position", "bigint"),
+                ],
+                rows=(
+                    self._schema_rows(catalog.group(1) if catalog else "")
+                    if re.search(r"table_schema = 'default'", sql)
+                    else []
+                ),
+            )
+        if re.match(r"SELECT\s+(1|VERSION\(\)|CURRENT_\w+)\s*$", upper):
+            return self._values(query_id, "_col0", ["1"])
+        if upper.startswith(("SELECT", "WITH", "VALUES", "TABLE")):
+            return FakeQuery(query_id, columns=TABLE_COLUMNS, row_count=self.rows)
+        return FakeQuery(query_id, error=f"Unsupported statement: {sql[:80]}")
+
+    def _view_rows(self, query_id: str, sql: str) -> FakeQuery:
+        """Тексты представлений каталога или их md5 (to_hex(md5(...)))."""
+        catalog = re.search(r"FROM (\w+)\.information_schema", sql, re.I)
+        names = re.findall(r"table_name IN \(([^)]*)\)", sql, re.I)
+        wanted = {n.strip(" '") for group in names for n in group.split(",")}
+        rows = []
+        for (view_catalog, schema, name), definition in sorted(self.views.items()):
+            if catalog and view_catalog != catalog.group(1).lower():
+                continue
+            if names and name not in wanted:
+                continue
+            if "MD5(" in sql.upper():
+                definition = hashlib.md5(definition.encode()).hexdigest().upper()
+            rows.append([schema, name, definition])
+        return FakeQuery(
+            query_id,
+            columns=[
+                ("table_schema", "varchar"),
+                ("table_name", "varchar"),
+                ("view_definition", "varchar"),
+            ],
+            rows=rows,
+        )
+
+    @staticmethod
+    def _schema_rows(catalog: str) -> List[List[Any]]:
+        """Строки метаданных схемы в формате запроса diff_schemas."""
+        tables = {name: list(TABLE_COLUMNS) for name in ("orders", "customers")}
+        events = list(TABLE_COLUMNS)
+        if catalog.lower() == DRIFT_CATALOG:
+            events = [
+                (name, "decimal(12,2)" if name == "amount" else type_name)
+                for name, type_name in TABLE_COLUMNS
+                if name != "paid"
+            ] + [("source", "varchar")]
+            tables["refunds"] = [("id", "bigint"), ("order_id", "bigint")]
+        tables["events"] = events
+
+        rows: List[List[Any]] = []
+        for table, columns in tables.items():
+            rows.append(["table", table, "BASE TABLE", None, None, None])
+            rows.extend(
+                ["column", table, name, type_name, "NO" if name == "id" else "YES", i]
+                for i, (name, type_name) in enumerate(columns, 1)
+            )
+        return rows
+
+    @staticmethod
+    def _values(query_id: str, name: str, values: List[Any]) -> FakeQuery:
+        return FakeQuery(
+            query_id, columns=[(name, "varchar")], rows=[[v] for v in values]
+        )
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело пишутся отдельно; без TCP_NODELAY каждый ответ
+    # ждет delayed ACK клиента (~40 мс) и задержка координатора искажается
+    disable_nagle_algorithm = True
+    server: "FakeTrinoServer"
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.headers['Host']}"
+
+    def _send(self, status: int, body: bytes = b"", headers=None):
+        fake = self.server.fake
+        with fake.lock:
+            fake.requests += 1
+        if fake.latency:
+            time.sleep(fake.latency)
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload: Dict[str, Any], headers=None):
+        headers = {"Content-Type": "application/json", **(headers or {})}
+        self._send(200, json.dumps(payload).encode(), headers)
+
+    def do_POST(self):
+        sql = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        prepared = dict(
+            item.split("=", 1)
+            for item in self.headers.get("X-Trino-Prepared-Statement", "").split(",")
+            if "=" in item
+        )
+        query = self.server.fake.create_query(
+            sql, {name: unquote_plus(value) for name, value in prepared.items()}
+        )
+        encodings = self.headers.get("X-Trino-Query-Data-Encoding", "")
+        if self.server.fake.spooling and "json" in encodings.split(","):
+            query.encoding = "json"
+        self._send_json(
+            {
+                "id": query.query_id,
+                "infoUri": f"{self.base_url}/ui/query.html?{query.query_id}",
+                "nextUri": f"{self.base_url}/v1/statement/{query.query_id}/1",
+                "stats": self._stats(query, "QUEUED"),
+            }
+        )
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts[:2] == ["v1", "spooled"]:
+            return self._segment(parts)
+        if parts[:2] != ["v1", "statement"] or len(parts) < 3:
+            return self._send(404)
+
+        fake = self.server.fake
+        query = fake.queries.get(parts[2])
+        if query is None:
+            return self._send(404)
+
+        response = {
+            "id": query.query_id,
+            "infoUri": f"{self.base_url}/ui/query.html?{query.query_id}",
+        }
+        if query.error:
+            fake.queries.pop(query.query_id, None)
+            response["stats"] = self._stats(query, "FAILED")
+            response["error"] = {
+                "message": query.error,
+                "errorCode": 1,
+                "errorName": "TABLE_NOT_FOUND",
+                "errorType": "USER_ERROR",
+                "failureInfo": {"type": "io.trino.spi.TrinoException", "stack": []},
+            }
+            return self._send_json(response)
+
+        if query.polls < fake.queued_polls:
+            query.polls += 1
+            response["nextUri"] = self._next_uri(query)
+            response["stats"] = self._stats(query, "RUNNING")
+            return self._send_json(response)
+
+        if query.columns is None:
+            fake.queries.pop(query.query_id, None)
+            response["updateType"] = query.update_type
+            response["stats"] = self._stats(query, "FINISHED")
+            return self._send_json(response, query.headers)
+
+        response["columns"] = query.columns
+        if query.encoding:
+            response["data"] = self._segments(query)
+            query.offset = query.row_count
+        else:
+            end = min(query.offset + fake.page_size, query.row_count)
+            if end > query.offset:
+                response["data"] = query.slice(query.offset, end)
+            query.offset = end
+
+        if query.offset < query.row_count:
+            response["nextUri"] = self._next_uri(query)
+            response["stats"] = self._stats(query, "RUNNING")
+        else:
+            if query.encoding is None or query.row_count <= fake.segment_rows:
+                # spooled сегменты читаются после завершения запроса,
+                # запрос удаляется при подтверждении последнего
+                fake.queries.pop(query.query_id, None)
+            response["stats"] = self._stats(query, "FINISHED")
+        return self._send_json(response, query.headers)
+
+    def do_DELETE(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) >= 3:
+            self.server.fake.queries.pop(parts[2], None)
+        self._send(204)
+
+    def _next_uri(self, query: FakeQuery) -> str:
+        token = query.polls + query.offset + 1
+        return f"{self.base_url}/v1/statement/{query.query_id}/{token}"
+
+    def _segments(self, query: FakeQuery) -> Dict[str, Any]:
+        """Описание результата в spooling протоколе: inline + ссылки."""
+        size = self.server.fake.segment_rows
+        segments = []
+        for index, start in enumerate(range(0, query.row_count, size)):
+            rows_count = min(size, query.row_count - start)
+            metadata = {"rowOffset": start, "rowsCount": rows_count}
+            if index == 0:
+                raw = json.dumps(query.slice(start, start + rows_count)).encode()
+                metadata["segmentSize"] = len(raw)
+                segments.append(
+                    {
+                        "type": "inline",
+                        "data": base64.b64encode(raw).decode(),
+                        "metadata": metadata,
+                    }
+                )
+                continue
+            uri = f"{self.base_url}/v1/spooled/{query.query_id}/{start}/{rows_count}"
+            metadata["segmentSize"] = 0
+            segments.append(
+                {
+                    "type": "spooled",
+                    "uri": uri,
+                    "ackUri": f"{uri}/ack",
+                    "metadata": metadata,
+                }
+            )
+        return {"encoding": "json", "segments": segments}
+
+    def _segment(self, parts: List[str]):
+        queries = self.server.fake.queries
+        if parts[-1] == "ack":
+            query = queries.get(parts[2])
+            if query is not None and int(parts[3]) + int(parts[4]) >= query.row_count:
+                queries.pop(parts[2], None)
+            return self._send(200)
+        query = queries.get(parts[2])
+        if query is None:
+            return self._send(404)
+        start, count = int(parts[3]), int(parts[4])
+        body = json.dumps(query.slice(start, start + count)).encode()
+        self._send(200, body, {"Content-Type": "application/octet-stream"})
+
+    def _stats(self, query: FakeQuery, state: str) -> Dict[str, Any]:
+        total = max(query.row_count // self.server.fake.page_size, 1)
+        if state == "FINISHED":
+            done = total
+        else:
+            done = total * query.offset // max(query.row_count, 1)
+        return {
+            "state": state,
+            "queued": state == "QUEUED",
+            "scheduled": state != "QUEUED",
+            "nodes": 1,
+            "totalSplits": total,
+            "queuedSplits": 0,
+            "runningSplits": total - done,
+            "completedSplits": done,
+            "cpuTimeMillis": 0,
+            "wallTimeMillis": 0,
+            "queuedTimeMillis": 0,
+            "elapsedTimeMillis": 0,
+            "processedRows": query.offset,
+            "processedBytes": query.offset * 64,
+            "peakMemoryBytes": 0,
+        }
+
+
+class FakeTrinoServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], fake: FakeTrino):
+        super().__init__(address, Handler)
+        self.fake = fake
+
+
+def start(host: str = "127.0.0.1", port: int = 0, **options) -> FakeTrinoServer:
+    """
+    Запускает заменитель координатора в фоновом потоке.
+
+    :param host: Адрес
+    :param port: Порт (0 - любой свободный)
+    :param options: Параметры FakeTrino
+    :return: Сервер; адрес в server.server_address
+    """
+    server = FakeTrinoServer((host, port), FakeTrino(**options))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Добавляет параметры заменителя координатора в парсер аргументов."""
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--queued-polls", type=int, default=0)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--spooling", action="store_true")
+    parser.add_argument("--segment-rows", type=int, default=10000)
+
+
+def options_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "latency_ms": args.latency_ms,
+        "queued_polls": args.queued_polls,
+        "page_size": args.page_size,
+        "rows": args.rows,
+        "spooling": args.spooling,
+        "segment_rows": args.segment_rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeTrinoServer(
+        (args.host, args.port), FakeTrino(**options_from_args(args))
+    )
+    print(f"fake trino listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Бенчмарк холодного старта сервера.
+
+Запускает импорт точки входа в отдельном интерпретаторе с
+``python -X importtime``, берет медиану по нескольким запускам и
+сравнивает ее с бюджетом из startup_budget.json. Кроме времени
+проверяется, что при старте не импортируются тяжелые модули,
+которые должны загружаться только при первом вызове инструмента.
+
+Запуск из корня репозитория::
+
+    python benchmarks/startup.py --runs 5 --top 15
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_PATH = Path(__file__).resolve().parent / "startup_budget.json"
+ENTRY_MODULE = "src.api.server"
+
+
+def measure_once(module: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """
+    Импортирует модуль в новом интерпретаторе.
+
+    :param module: Имя модуля точки входа
+    :return: Время процесса в мс и {модуль: (self, cumulative)} в мкс
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return wall_ms, modules
+
+
+def run(runs: int, module: str) -> Dict[str, object]:
+    """
+    Собирает медианные показатели по нескольким запускам.
+
+    :param runs: Количество запусков
+    :param module: Имя модуля точки входа
+    :return: Метрики старта
+    """
+    wall, imports, own = [], [], []
+    last_modules: Dict[str, Tuple[int, int]] = {}
+    for _ in range(runs):
+        wall_ms, modules = measure_once(module)
+        wall.append(wall_ms)
+        imports.append(modules[module][1] / 1000)
+        own.append(
+            sum(
+                self_us
+                for name, (self_us, _) in modules.items()
+                if name == "src" or name.startswith("src.")
+            )
+            / 1000
+        )
+        last_modules = modules
+
+    return {
+        "wall_ms": statistics.median(wall),
+        "import_ms": statistics.median(imports),
+        "own_ms": statistics.median(own),
+        "modules": last_modules,
+    }
+
+
+def check_budget(result: Dict[str, object], budget: Dict[str, object]) -> List[str]:
+    """
+    Сравнивает метрики с бюджетом.
+
+    :return: Список нарушений
+    """
+    violations = []
+    for metric in ("wall_ms", "import_ms", "own_ms"):
+        limit = budget.get(metric)
+        if limit is not None and result[metric] > limit:
+            violations.append(f"{metric}: {result[metric]:.1f} > {limit}")
+
+    modules = result["modules"]
+    for name in budget.get("forbidden_modules", []):
+        if name in modules:
+            violations.append(f"module imported at startup: {name}")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="самые медленные модули")
+    parser.add_argument("--module", default=ENTRY_MODULE)
+    parser.add_argument("--budget", type=Path, default=BUDGET_PATH)
+    args = parser.parse_args()
+
+    result = run(args.runs, args.module)
+    budget = json.loads(args.budget.read_text()) if args.budget.exists() else {}
+
+    print(f"entry module:      {args.module} ({args.runs} runs, median)")
+    for metric in ("wall_ms", "import_ms", "own_ms"):
+        limit = budget.get(metric)
+        suffix = f"  (budget {limit})" if limit is not None else ""
+        print(f"{metric:<18} {result[metric]:8.1f}{suffix}")
+
+    if args.top:
+        print("\nslowest modules by self time (ms):")
+        slowest = sorted(
+            result["modules"].items(), key=lambda item: item[1][0], reverse=True
+        )
+        for name, (self_us, cumulative_us) in slowest[: args.top]:
+            print(f"  {self_us / 1000:8.1f} {cumulative_us / 1000:8.1f}  {name}")
+
+    violations = check_budget(result, budget)
+    if violations:
+        print("\nstartup budget exceeded:")
+        for violation in violations:
+            print(f"  - {violation}")
+        sys.exit(1)
+    print("\nstartup budget: ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,60 @@ from mcp.server.fastmcp import FastMCP
 from src.application.tools.trino_tools import register_tools
 from src.core.config import config
 
-mcp = FastMCP(config.APP_NAME, host=config.HOST, port=config.PORT)
+# Воркеры не делят сессии streamable-http: при нескольких воркерах каждый
+# запрос обрабатывается независимо и может попасть в любой процесс
+mcp = FastMCP(
+    config.APP_NAME,
+    host=config.HOST,
+    port=config.PORT,
+    stateless_http=config.SERVER_WORKERS > 1,
+)
 
 register_tools(mcp)
 
+
+def create_app():
+    """Фабрика ASGI приложения для воркеров uvicorn."""
+    return mcp.streamable_http_app()
+
+
+def run_workers(workers: int):
+    """
+    Запускает сервер в нескольких процессах.
+
+    Родительский процесс открывает порт и запускает общее хранилище
+    кешей, воркеры uvicorn принимают соединения на общем сокете и
+    обращаются к хранилищу по unix сокету.
+
+    :param workers: Число процессов-воркеров
+    """
+    import uvicorn
+
+    from src.infra.shared_cache import start_cache_store
+
+    start_cache_store()
+    uvicorn.run(
+        "src.api.server:create_app",
+        factory=True,
+        host=config.HOST,
+        port=config.PORT,
+        workers=workers,
+        log_level=config.LOG_LEVEL.lower(),
+    )
+
+
+def main():
+    """
+    Точка входа сервера (console script trino-mcp-server).
+
+    Модули инструментов и trino загружаются при первом вызове инструмента,
+    поэтому сервер начинает принимать запросы без их импорта.
+    """
+    if config.SERVER_WORKERS > 1:
+        run_workers(config.SERVER_WORKERS)
+    else:
+        mcp.run(transport="streamable-http")
+
+
 if __name__ == "__main__":
-    mcp.run(transport="streamable-http")
+    main()
@@ -1,21 +1,83 @@
-from src.application.tools.connection_status import connection_status
-from src.application.tools.describe_table import describe_table
-from src.application.tools.execute_ddl_statements import execute_ddl_statements
-from src.application.tools.execute_query import execute_query
-from src.application.tools.get_connection_stats import get_connection_stats
-from src.application.tools.list_catalogs import list_catalogs
-from src.application.tools.list_schemas import list_schemas
-from src.application.tools.list_tables import list_tables
-from src.application.tools.validate_ddl_statements import validate_ddl_statements
+"""
+Инструменты MCP сервера.
+
+Модули инструментов импортируются при первом обращении к инструменту:
+они тянут trino, requests и анализатор DDL, что заметно замедляет
+холодный старт сервера.
+"""
+
+import sys
+from importlib import import_module
+from types import ModuleType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.application.tools.cancel_query import cancel_query
+    from src.application.tools.connection_status import connection_status
+    from src.application.tools.describe_table import describe_table
+    from src.application.tools.diff_schemas import diff_schemas
+    from src.application.tools.execute_ddl_statements import execute_ddl_statements
+    from src.application.tools.execute_queries import execute_queries
+    from src.application.tools.execute_query import execute_query
+    from src.application.tools.export_query import export_query
+    from src.application.tools.get_connection_stats import get_connection_stats
+    from src.application.tools.get_query_result import get_query_result
+    from src.application.tools.get_query_status import get_query_status
+    from src.application.tools.list_catalogs import list_catalogs
+    from src.application.tools.list_clusters import list_clusters
+    from src.application.tools.list_schemas import list_schemas
+    from src.application.tools.list_tables import list_tables
+    from src.application.tools.profile_table import profile_table
+    from src.application.tools.submit_query import submit_query
+    from src.application.tools.table_stats import table_stats
+    from src.application.tools.validate_ddl_statements import validate_ddl_statements
+    from src.application.tools.view_lineage import view_lineage
+    from src.application.tools.workload_report import workload_report
 
 __all__ = [
+    "list_clusters",
     "connection_status",
     "list_catalogs",
     "list_schemas",
     "list_tables",
     "describe_table",
+    "profile_table",
+    "table_stats",
+    "diff_schemas",
+    "view_lineage",
     "execute_query",
+    "execute_queries",
+    "export_query",
+    "submit_query",
+    "get_query_status",
+    "get_query_result",
+    "cancel_query",
     "validate_ddl_statements",
     "execute_ddl_statements",
     "get_connection_stats",
+    "workload_report",
 ]
+
+
+class _LazyToolsModule(ModuleType):
+    """
+    Модуль пакета, в котором импорт подмодуля инструмента не затирает
+    одноименную функцию: при загрузке подмодуля импорт записывает его
+    в атрибут пакета с тем же именем, что и у функции инструмента.
+    """
+
+    def __setattr__(self, name, value):
+        if name in __all__ and isinstance(value, ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _LazyToolsModule
+
+
+def __getattr__(name: str):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    tool = getattr(import_module(f"{__name__}.{name}"), name)
+    globals()[name] = tool
+    return tool
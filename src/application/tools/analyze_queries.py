@@ -1,8 +1,10 @@
+import time
 from typing import Any, Dict, List, Optional
 
 from src.core.logging import get_logger
 from src.core.utils.validate import validate_identifier
 from src.infra import connection_manager
+from src.infra.workload_history import workload_history
 
 logger = get_logger(__name__)
 
@@ -36,9 +38,18 @@ async def analyze_queries(
                 )
 
             for i, sql in enumerate(queries):
+                started = time.monotonic()
                 try:
                     cursor.execute(f"EXPLAIN {sql}")
                     plan = cursor.fetchall()
+                    workload_history.record(
+                        "analyze_queries",
+                        jdbc_url,
+                        sql,
+                        (time.monotonic() - started) * 1000,
+                        cursor=cursor,
+                        row_count=len(plan),
+                    )
 
                     results.append(
                         {
@@ -49,6 +60,14 @@ async def analyze_queries(
                         }
                     )
                 except Exception as e:
+                    workload_history.record(
+                        "analyze_queries",
+                        jdbc_url,
+                        sql,
+                        (time.monotonic() - started) * 1000,
+                        cursor=cursor,
+                        error=str(e),
+                    )
                     results.append(
                         {
                             "query_index": i,
@@ -66,5 +85,5 @@ async def analyze_queries(
         }
 
     except Exception as e:
-        logger.error(f"Error analyzing queries: {e}")
+        logger.error("Error analyzing queries: %s", e)
         return {"error": str(e), "total_queries": len(queries)}
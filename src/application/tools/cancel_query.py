@@ -0,0 +1,18 @@
+from typing import Any, Dict
+
+from src.infra.query_jobs import query_job_manager
+
+
+async def cancel_query(job_id: str) -> Dict[str, Any]:
+    """
+    Отменяет фоновый запрос: ожидающий снимается с очереди,
+    выполняющийся отменяется в Trino.
+
+    :param job_id: Идентификатор задачи из submit_query
+    :return: Статус задачи после отмены
+    """
+    try:
+        job = query_job_manager.cancel(job_id)
+        return {"job_id": job_id, "state": job.state, "cancel_requested": True}
+    except KeyError as e:
+        return {"error": e.args[0], "job_id": job_id}
@@ -36,5 +36,5 @@ async def connection_status(jdbc_url: str) -> Dict[str, Any]:
                 "schema": schema,
             }
     except Exception as e:
-        logger.error(f"Connection test failed: {e}")
+        logger.error("Connection test failed: %s", e)
         return {"status": "failed", "error": str(e)}
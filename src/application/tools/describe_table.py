@@ -28,36 +28,35 @@ async def describe_table(
         if catalog and not validate_identifier(catalog):
             return {"error": "Invalid catalog name", "columns": []}
 
-        with connection_manager.get_connection(jdbc_url) as conn:
-            cursor = conn.cursor()
+        table_path = f"{catalog}.{schema}.{table}" if catalog else f"{schema}.{table}"
 
-            table_path = (
-                f"{catalog}.{schema}.{table}" if catalog else f"{schema}.{table}"
-            )
+        def fetch(conn):
+            cursor = conn.cursor()
             cursor.execute(f"DESCRIBE {table_path}")
+            return cursor.fetchall()
 
-            columns = []
-            for row in cursor.fetchall():
-                columns.append(
-                    {
-                        "name": row[0],
-                        "type": row[1],
-                        "null": row[2] if len(row) > 2 else None,
-                        "key": row[3] if len(row) > 3 else None,
-                        "default": row[4] if len(row) > 4 else None,
-                        "extra": row[5] if len(row) > 5 else None,
-                    }
-                )
+        columns = []
+        for row in connection_manager.run_with_failover(jdbc_url, fetch):
+            columns.append(
+                {
+                    "name": row[0],
+                    "type": row[1],
+                    "null": row[2] if len(row) > 2 else None,
+                    "key": row[3] if len(row) > 3 else None,
+                    "default": row[4] if len(row) > 4 else None,
+                    "extra": row[5] if len(row) > 5 else None,
+                }
+            )
 
-            return {
-                "catalog": catalog,
-                "schema": schema,
-                "table": table,
-                "columns": columns,
-                "column_count": len(columns),
-            }
+        return {
+            "catalog": catalog,
+            "schema": schema,
+            "table": table,
+            "columns": columns,
+            "column_count": len(columns),
+        }
     except TrinoUserError as e:
-        logger.error(f"Error describing table {table}: {e}")
+        logger.error("Error describing table %s: %s", table, e)
         return {
             "error": str(e),
             "catalog": catalog,
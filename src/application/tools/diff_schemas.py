@@ -0,0 +1,160 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from src.core.ddl_analyzer import ddl_analyzer
+from src.core.logging import get_logger
+from src.core.schema_diff import (
+    build_reconcile_ddl,
+    build_schema_query,
+    diff_tables,
+    parse_schema_rows,
+)
+from src.core.utils.validate import validate_identifier
+from src.infra import connection_manager
+from src.infra.cluster_registry import cluster_registry
+
+logger = get_logger(__name__)
+
+
+def _read_schema(
+    jdbc_url: str, catalog: str, schema: str, tables: Optional[List[str]]
+) -> Dict[str, Any]:
+    """Читает колонки всех таблиц схемы одним запросом к information_schema."""
+    sql = build_schema_query(catalog, schema, tables)
+
+    def fetch(conn):
+        cursor = conn.cursor()
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+    start = time.perf_counter()
+    rows = connection_manager.run_with_failover(jdbc_url, fetch)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.debug("Read %s metadata rows of %s.%s", len(rows), catalog, schema)
+    return {"tables": parse_schema_rows(rows), "elapsed_ms": round(elapsed_ms, 3)}
+
+
+async def diff_schemas(
+    source_jdbc_url: str,
+    source_schema: str,
+    target_schema: Optional[str] = None,
+    target_jdbc_url: Optional[str] = None,
+    source_catalog: Optional[str] = None,
+    target_catalog: Optional[str] = None,
+    tables: Optional[List[str]] = None,
+    generate_ddl: bool = False,
+    include_drops: bool = False,
+) -> Dict[str, Any]:
+    """
+    Сравнивает структуру таблиц двух схем, в том числе на разных кластерах.
+
+    Метаданные каждой стороны читаются одним запросом к information_schema,
+    обе стороны - параллельно. Таблицы с одинаковым хешем списка колонок
+    не сравниваются по колонкам. Изменения считаются от target к source:
+    added - есть только в source. Имена приводятся к нижнему регистру;
+    если на одной из сторон нет таблиц, возвращается ошибка.
+
+    :param source_jdbc_url: JDBC URL или имя кластера эталонной схемы
+    :param source_schema: Эталонная схема
+    :param target_schema: Сравниваемая схема (по умолчанию source_schema)
+    :param target_jdbc_url: Кластер сравниваемой схемы (по умолчанию source)
+    :param source_catalog: Каталог эталонной схемы (по умолчанию из JDBC URL)
+    :param target_catalog: Каталог сравниваемой схемы (по умолчанию из
+        JDBC URL target или source_catalog)
+    :param tables: Сравнить только эти таблицы
+    :param generate_ddl: Построить DDL, приводящий target к source,
+        и проверить его DDLAnalyzer
+    :param include_drops: Добавить в DDL удаление лишних таблиц и колонок
+    :return: Добавленные, удаленные и измененные таблицы и DDL
+    """
+    try:
+        target_jdbc_url = target_jdbc_url or source_jdbc_url
+        target_schema = target_schema or source_schema
+        source_cluster = cluster_registry.resolve(source_jdbc_url)
+        target_cluster = cluster_registry.resolve(target_jdbc_url)
+        source_catalog = source_catalog or source_cluster.params.get("catalog")
+        target_catalog = (
+            target_catalog or target_cluster.params.get("catalog") or source_catalog
+        )
+
+        if not source_catalog or not target_catalog:
+            return {"error": "Catalog is required (argument or JDBC URL)"}
+
+        names = [source_catalog, source_schema, target_catalog, target_schema]
+        if not all(validate_identifier(name) for name in names):
+            return {"error": "Invalid catalog or schema name"}
+
+        if tables and not all(validate_identifier(name) for name in tables):
+            return {"error": "Invalid table name"}
+
+        # information_schema хранит имена в нижнем регистре
+        source_catalog, source_schema, target_catalog, target_schema = (
+            name.lower() for name in names
+        )
+        tables = [name.lower() for name in tables] if tables else tables
+
+        same_schema = (source_catalog, source_schema) == (target_catalog, target_schema)
+        if same_schema and source_cluster.key == target_cluster.key:
+            return {"error": "Source and target are the same schema"}
+
+        source, target = await asyncio.gather(
+            asyncio.to_thread(
+                _read_schema, source_jdbc_url, source_catalog, source_schema, tables
+            ),
+            asyncio.to_thread(
+                _read_schema, target_jdbc_url, target_catalog, target_schema, tables
+            ),
+        )
+
+        # Пустая сторона (опечатка в имени или нет прав) превратила бы все
+        # таблицы другой стороны в добавленные или удаленные
+        for side, catalog, schema, read in (
+            ("source", source_catalog, source_schema, source),
+            ("target", target_catalog, target_schema, target),
+        ):
+            if not read["tables"]:
+                return {"error": f"No tables found in {side} schema {catalog}.{schema}"}
+
+        diff = diff_tables(source["tables"], target["tables"])
+        unchanged = diff.pop("unchanged_tables")
+        result: Dict[str, Any] = {
+            "source": {
+                "cluster": source_cluster.display_name,
+                "catalog": source_catalog,
+                "schema": source_schema,
+                "tables": len(source["tables"]),
+                "elapsed_ms": source["elapsed_ms"],
+            },
+            "target": {
+                "cluster": target_cluster.display_name,
+                "catalog": target_catalog,
+                "schema": target_schema,
+                "tables": len(target["tables"]),
+                "elapsed_ms": target["elapsed_ms"],
+            },
+            "summary": {
+                "added_tables": len(diff["added_tables"]),
+                "removed_tables": len(diff["removed_tables"]),
+                "changed_tables": len(diff["changed_tables"]),
+                "unchanged_tables": unchanged,
+            },
+            **diff,
+        }
+
+        if generate_ddl:
+            ddl, skipped = build_reconcile_ddl(
+                diff, f"{target_catalog}.{target_schema}", include_drops
+            )
+            analysis = await asyncio.to_thread(ddl_analyzer.analyze_ddl_list, ddl)
+            result["ddl"] = ddl
+            result["ddl_skipped"] = skipped
+            result["ddl_validation"] = {
+                "by_type": {k: v for k, v in analysis["by_type"].items() if v},
+                "potential_issues": analysis["potential_issues"],
+            }
+
+        return result
+    except Exception as e:
+        logger.error("Error comparing schemas: %s", e)
+        return {"error": str(e)}
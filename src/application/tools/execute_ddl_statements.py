@@ -1,9 +1,13 @@
+import asyncio
+import time
 from typing import Any, Dict, List, Optional
 
-from src.core import ddl_analyzer
+from src.core.ddl_analyzer import ddl_analyzer
 from src.core.logging import get_logger
 from src.core.utils.validate import validate_identifier
 from src.infra import connection_manager
+from src.infra.catalog_metadata import catalog_metadata_validator
+from src.infra.workload_history import workload_history
 
 logger = get_logger(__name__)
 
@@ -14,6 +18,7 @@ async def execute_ddl_statements(
     catalog: Optional[str] = None,
     schema: Optional[str] = None,
     validate_first: bool = True,
+    check_catalog: bool = False,
 ) -> Dict[str, Any]:
     """
     Выполняет список DDL выражений с предварительной валидацией.
@@ -23,6 +28,8 @@ async def execute_ddl_statements(
     :param catalog: Каталог по умолчанию
     :param schema: Схема по умолчанию
     :param validate_first: Выполнить валидацию перед выполнением
+    :param check_catalog: Проверить набор против существующих объектов
+        кластера до выполнения первого выражения
     :return: Результаты выполнения DDL
     """
     try:
@@ -35,7 +42,20 @@ async def execute_ddl_statements(
         }
 
         if validate_first:
-            validation_result = ddl_analyzer.analyze_ddl_list(ddl_list)
+            validation_result = await asyncio.to_thread(
+                ddl_analyzer.analyze_ddl_list, ddl_list
+            )
+            if check_catalog:
+                catalog_check = await asyncio.to_thread(
+                    catalog_metadata_validator.validate,
+                    jdbc_url,
+                    ddl_list,
+                    validation_result,
+                    catalog,
+                    schema,
+                )
+                validation_result["catalog_check"] = catalog_check
+                validation_result["potential_issues"].extend(catalog_check["issues"])
             results["validation"] = validation_result
 
             high_severity_issues = [
@@ -64,8 +84,16 @@ async def execute_ddl_statements(
                 if not ddl or not ddl.strip():
                     continue
 
+                started = time.monotonic()
                 try:
                     cursor.execute(ddl)
+                    workload_history.record(
+                        "execute_ddl_statements",
+                        jdbc_url,
+                        ddl,
+                        (time.monotonic() - started) * 1000,
+                        cursor=cursor,
+                    )
                     object_name = ddl_analyzer.extract_object_name(ddl)
                     ddl_type = ddl_analyzer.identify_ddl_type(ddl)
 
@@ -83,6 +111,14 @@ async def execute_ddl_statements(
                     results["success_count"] += 1
 
                 except Exception as e:
+                    workload_history.record(
+                        "execute_ddl_statements",
+                        jdbc_url,
+                        ddl,
+                        (time.monotonic() - started) * 1000,
+                        cursor=cursor,
+                        error=str(e),
+                    )
                     results["execution_results"].append(
                         {
                             "index": i,
@@ -96,5 +132,5 @@ async def execute_ddl_statements(
         return results
 
     except Exception as e:
-        logger.error(f"Error executing DDL statements: {e}")
+        logger.error("Error executing DDL statements: %s", e)
         return {"error": str(e), "total_statements": len(ddl_list) if ddl_list else 0}
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Union
+
+from src.application.tools.execute_query import run_query
+from src.core.config import config
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+async def execute_queries(
+    jdbc_url: str,
+    statements: List[Union[str, Dict[str, Any]]],
+    limit: int = 100,
+    catalog: Optional[str] = None,
+    schema: Optional[str] = None,
+    max_concurrency: int = 4,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Выполняет несколько независимых SQL запросов параллельно.
+
+    Каждый запрос выполняется на отдельном подключении из пула, ошибки
+    одного запроса не влияют на остальные. Результаты возвращаются
+    в порядке входного списка.
+
+    :param jdbc_url: JDBC URL для подключения к Trino
+    :param statements: SQL запросы: строки или словари
+        {"sql": ..., "parameters": [...], "limit": ..., "timeout": ...}
+        с параметрами и собственными лимитами
+    :param limit: Максимальное количество строк по умолчанию
+    :param catalog: Каталог по умолчанию
+    :param schema: Схема по умолчанию
+    :param max_concurrency: Максимальное число одновременных запросов
+    :param timeout: Таймаут запроса в секундах по умолчанию
+    :return: Результаты выполнения запросов
+    """
+    try:
+        if len(statements) > config.BATCH_MAX_STATEMENTS:
+            return {
+                "error": f"Too many statements, max {config.BATCH_MAX_STATEMENTS}",
+                "total_statements": len(statements),
+            }
+
+        concurrency = max(1, min(max_concurrency, config.BATCH_MAX_CONCURRENCY))
+        semaphore = asyncio.Semaphore(concurrency)
+        default_timeout = timeout or config.BATCH_STATEMENT_TIMEOUT
+
+        async def run(index: int, statement: Union[str, Dict[str, Any]]):
+            if isinstance(statement, str):
+                statement = {"sql": statement}
+            if not isinstance(statement, dict):
+                return {"index": index, "error": "Statement must be str or object"}
+            sql = statement.get("sql")
+            if not sql or not isinstance(sql, str):
+                return {"index": index, "error": "Statement has no sql"}
+
+            async with semaphore:
+                result = await asyncio.to_thread(
+                    run_query,
+                    jdbc_url,
+                    sql,
+                    statement.get("limit", limit),
+                    catalog,
+                    schema,
+                    "rows",
+                    statement.get("timeout", default_timeout),
+                    parameters=statement.get("parameters"),
+                    tool="execute_queries",
+                )
+            return {"index": index, **result}
+
+        results = await asyncio.gather(
+            *(run(i, statement) for i, statement in enumerate(statements))
+        )
+
+        error_count = sum(1 for result in results if "error" in result)
+        return {
+            "total_statements": len(statements),
+            "success_count": len(results) - error_count,
+            "error_count": error_count,
+            "max_concurrency": concurrency,
+            "results": results,
+        }
+
+    except Exception as e:
+        logger.error("Error executing queries: %s", e)
+        return {"error": str(e), "total_statements": len(statements)}
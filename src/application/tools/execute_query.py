@@ -1,11 +1,26 @@
-from typing import Any, Dict, Optional
+import asyncio
+import time
+from threading import Event, Timer
+from typing import Any, Callable, Dict, List, Optional
 
-from src.core.logging import get_logger
+from src.core.columnar import ColumnarResult
+from src.core.config import config
+from src.core.logging import get_logger, query_id_var
+from src.core.result_budget import ResultBudget
+from src.core.tracing import span
+from src.core.utils.sql import count_placeholders, inline_parameters
 from src.core.utils.validate import validate_identifier
 from src.infra import connection_manager
+from src.infra.cluster_registry import cluster_registry
+from src.infra.prepared_statements import prepared_statement_cache
+from src.infra.query_guard import query_guard
+from src.infra.spooling import iter_rows, open_cursor
+from src.infra.workload_history import workload_history
 
 logger = get_logger(__name__)
 
+RESULT_FORMATS = ("rows", "columnar", "summary")
+
 
 async def execute_query(
     jdbc_url: str,
@@ -13,54 +28,279 @@ async def execute_query(
     limit: int = 100,
     catalog: Optional[str] = None,
     schema: Optional[str] = None,
+    result_format: str = "rows",
+    max_bytes: Optional[int] = None,
+    max_cell_bytes: Optional[int] = None,
+    exclude_columns: Optional[List[str]] = None,
+    parameters: Optional[List[Any]] = None,
 ) -> Dict[str, Any]:
     """
-    Выполняет SQL запрос с ограничением на количество строк.
+    Выполняет SQL запрос с ограничением на количество строк и размер ответа.
 
     :param jdbc_url: JDBC URL для подключения к Trino
     :param sql: SQL запрос для выполнения
     :param limit: Максимальное количество строк для возврата
     :param catalog: Каталог по умолчанию
     :param schema: Схема по умолчанию
+    :param result_format: Формат результата: rows - список строк,
+        columnar - значения по колонкам и статистика, summary - только статистика
+    :param max_bytes: Максимальный размер строк результата в байтах
+        (формат rows, по умолчанию RESULT_MAX_BYTES; 0 - без лимита)
+    :param max_cell_bytes: Максимальный размер одной ячейки, большие значения
+        усекаются с маркером (формат rows, по умолчанию RESULT_MAX_CELL_BYTES;
+        0 - без лимита)
+    :param exclude_columns: Колонки, которые не нужно возвращать
+    :param parameters: Значения параметров ? в запросе; запрос выполняется
+        как подготовленное выражение, которое переиспользуется на подключении
     :return: Результат выполнения запроса
     """
-    try:
-        limit = min(limit, 1000)
+    return await asyncio.to_thread(
+        run_query,
+        jdbc_url,
+        sql,
+        limit,
+        catalog,
+        schema,
+        result_format,
+        max_bytes=max_bytes,
+        max_cell_bytes=max_cell_bytes,
+        exclude_columns=exclude_columns,
+        parameters=parameters,
+    )
 
-        with connection_manager.get_connection(jdbc_url) as conn:
-            cursor = conn.cursor()
-
-            if catalog:
-                if validate_identifier(catalog):
-                    cursor.execute(f"USE {catalog}")
-                else:
-                    return {"error": "Invalid catalog name"}
-
-            if schema:
-                if validate_identifier(schema):
-                    cursor.execute(
-                        f"USE {catalog}.{schema}" if catalog else f"USE {schema}"
-                    )
-                else:
-                    return {"error": "Invalid schema name"}
 
-            cursor.execute(sql)
+def run_query(
+    jdbc_url: str,
+    sql: str,
+    limit: int = 100,
+    catalog: Optional[str] = None,
+    schema: Optional[str] = None,
+    result_format: str = "rows",
+    timeout: Optional[float] = None,
+    on_cursor: Optional[Callable[[Any], None]] = None,
+    max_bytes: Optional[int] = None,
+    max_cell_bytes: Optional[int] = None,
+    exclude_columns: Optional[List[str]] = None,
+    parameters: Optional[List[Any]] = None,
+    tool: str = "execute_query",
+) -> Dict[str, Any]:
+    """
+    Синхронно выполняет SQL запрос (для вызова из пула потоков).
+
+    :param timeout: Таймаут в секундах, по истечении запрос отменяется в Trino
+        (по умолчанию - query_timeout кластера)
+    :param on_cursor: Вызывается с курсором перед выполнением запроса
+        (для отслеживания прогресса и отмены)
+    :param max_bytes: Бюджет размера строк (0 - без ограничения)
+    :param max_cell_bytes: Бюджет размера ячейки (0 - без ограничения)
+    :param exclude_columns: Колонки, которые не нужно возвращать
+    :param parameters: Значения параметров ? в запросе
+    :param tool: Инструмент, от имени которого запрос попадает в журнал
+    :return: Результат выполнения запроса
+    """
+    started = time.monotonic()
+    cursors = []
+
+    def attach(cursor):
+        cursors.append(cursor)
+        if on_cursor is not None:
+            on_cursor(cursor)
 
-            columns = (
-                [desc[0] for desc in cursor.description] if cursor.description else []
-            )
+    result = _run_query(
+        jdbc_url,
+        sql,
+        limit,
+        catalog,
+        schema,
+        result_format,
+        timeout,
+        attach,
+        max_bytes,
+        max_cell_bytes,
+        exclude_columns,
+        parameters,
+    )
+    workload_history.record(
+        tool,
+        jdbc_url,
+        sql,
+        (time.monotonic() - started) * 1000,
+        cursor=cursors[0] if cursors else None,
+        row_count=result.get("row_count"),
+        error=result.get("error"),
+    )
+    return result
 
-            rows = cursor.fetchmany(limit)
 
+def _run_query(
+    jdbc_url: str,
+    sql: str,
+    limit: int,
+    catalog: Optional[str],
+    schema: Optional[str],
+    result_format: str,
+    timeout: Optional[float],
+    on_cursor: Callable[[Any], None],
+    max_bytes: Optional[int],
+    max_cell_bytes: Optional[int],
+    exclude_columns: Optional[List[str]],
+    parameters: Optional[List[Any]],
+) -> Dict[str, Any]:
+    """Выполняет запрос, параметры описаны в run_query."""
+    timer = None
+    timed_out = Event()
+    try:
+        if result_format not in RESULT_FORMATS:
+            return {"error": f"Invalid result format: {result_format}", "sql": sql}
+
+        parameters = list(parameters or [])
+        placeholders = count_placeholders(sql)
+        if placeholders != len(parameters):
             return {
+                "error": f"Query has {placeholders} parameters, "
+                f"{len(parameters)} values given",
                 "sql": sql,
-                "columns": columns,
-                "rows": [list(row) for row in rows],
-                "row_count": len(rows),
-                "limited": len(rows) == limit,
-                "catalog": catalog,
-                "schema": schema,
             }
+        # Оценка EXPLAIN зависит от значений, поэтому guard проверяет
+        # запрос с подставленными литералами
+        inlined_sql = inline_parameters(sql, parameters) if parameters else sql
+
+        max_rows = (
+            config.QUERY_MAX_ROWS
+            if result_format == "rows"
+            else config.COLUMNAR_MAX_ROWS
+        )
+        limit = min(limit, max_rows)
+        timeout = timeout or cluster_registry.resolve(jdbc_url).query_timeout
+        budget = ResultBudget(
+            max_bytes=config.RESULT_MAX_BYTES if max_bytes is None else max_bytes,
+            max_cell_bytes=(
+                config.RESULT_MAX_CELL_BYTES
+                if max_cell_bytes is None
+                else max_cell_bytes
+            ),
+            exclude_columns=exclude_columns,
+        )
+
+        with connection_manager.get_connection(jdbc_url) as conn:
+            cursor = open_cursor(conn)
+
+            with span(
+                "trino.use", **{"trino.catalog": catalog, "trino.schema": schema}
+            ):
+                if catalog:
+                    if validate_identifier(catalog):
+                        cursor.execute(f"USE {catalog}")
+                    else:
+                        return {"error": "Invalid catalog name"}
+
+                if schema:
+                    if validate_identifier(schema):
+                        cursor.execute(
+                            f"USE {catalog}.{schema}" if catalog else f"USE {schema}"
+                        )
+                    else:
+                        return {"error": "Invalid schema name"}
+
+            with span("guard.check") as checked:
+                guard = query_guard.check(conn, jdbc_url, inlined_sql, catalog, schema)
+                checked.set(**{"guard.action": guard["action"]})
+            if guard["action"] in ("reject", "require_predicate"):
+                return {"error": guard["reason"], "sql": sql, "guard": guard}
+
+            if timeout:
+                timer = Timer(timeout, _cancel_query, (cursor, timed_out))
+                timer.daemon = True
+                timer.start()
+
+            on_cursor(cursor)
+
+            with span("trino.execute", **{"trino.prepared": bool(parameters)}) as run:
+                if guard["sql"] != inlined_sql or not parameters:
+                    # Выборка guard переписывает запрос - выполняем его как есть
+                    cursor.execute(guard["sql"])
+                elif not prepared_statement_cache.execute(
+                    conn, cursor, sql, parameters
+                ):
+                    cursor.execute(inlined_sql)
+                run.set_query(cursor)
+            # Поток выполняет запрос в копии контекста вызова, так что
+            # query_id попадает только в записи лога этого запроса
+            query_id_var.set(cursor.query_id)
+
+            description = budget.project(cursor.description)
+            columns = [desc[0] for desc in description]
+
+            if result_format == "rows":
+                with span("trino.fetch") as fetch:
+                    rows, more = budget.consume(
+                        budget.project_rows(iter_rows(cursor, limit))
+                    )
+                    fetch.set(**{"mcp.row_count": len(rows)})
+                    fetch.set_query(cursor)
+                if more:
+                    # Остаток результата не нужен - освобождаем ресурсы Trino
+                    _cancel_remaining(cursor)
+                response = {
+                    "sql": sql,
+                    "columns": columns,
+                    "rows": rows,
+                    "row_count": len(rows),
+                    "limited": more or len(rows) == limit,
+                    "catalog": catalog,
+                    "schema": schema,
+                    "budget": budget.report(),
+                }
+            else:
+                with span("trino.fetch") as fetch:
+                    result = ColumnarResult.from_description(description).consume(
+                        budget.project_rows(iter_rows(cursor, limit))
+                    )
+                    fetch.set(**{"mcp.row_count": result.row_count})
+                    fetch.set_query(cursor)
+                response = {
+                    "sql": sql,
+                    "columns": columns,
+                    "row_count": result.row_count,
+                    "limited": result.row_count == limit,
+                    "summary": result.summary(),
+                    "catalog": catalog,
+                    "schema": schema,
+                }
+                if result_format == "columnar":
+                    response["data"] = result.to_dict()["data"]
+                if budget.excluded or budget.unknown_excluded:
+                    response["budget"] = budget.report(include_limits=False)
+
+            if timed_out.is_set():
+                return {"error": f"Query timed out after {timeout}s", "sql": sql}
+
+            if guard["action"] == "sample":
+                response["guard"] = guard
+            return response
+
     except Exception as e:
-        logger.error(f"Error executing query: {e}")
+        if timed_out.is_set():
+            return {"error": f"Query timed out after {timeout}s", "sql": sql}
+        logger.error("Error executing query: %s", e)
         return {"error": str(e), "sql": sql}
+    finally:
+        if timer is not None:
+            timer.cancel()
+
+
+def _cancel_remaining(cursor):
+    """Отменяет запрос, строки которого не вошли в бюджет ответа."""
+    try:
+        cursor.cancel()
+    except Exception as e:
+        logger.debug("Error cancelling truncated query: %s", e)
+
+
+def _cancel_query(cursor, timed_out: Event):
+    """Отменяет запрос в Trino по таймауту."""
+    timed_out.set()
+    try:
+        cursor.cancel()
+    except Exception as e:
+        logger.warning("Error cancelling timed out query: %s", e)
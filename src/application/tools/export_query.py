@@ -0,0 +1,278 @@
+import asyncio
+import os
+import re
+import sys
+import time
+import uuid
+from itertools import islice
+from threading import Event, Timer
+from typing import Any, Dict, Optional
+
+from src.core.config import config
+from src.core.export_writers import (
+    CSV_COMPRESSIONS,
+    EXPORT_FORMATS,
+    PARQUET_COMPRESSIONS,
+    open_export_writer,
+    parquet_available,
+)
+from src.core.logging import get_logger, query_id_var
+from src.core.tracing import span
+from src.core.utils.sql import is_query
+from src.core.utils.validate import validate_identifier
+from src.infra import connection_manager
+from src.infra.query_guard import query_guard
+from src.infra.spooling import iter_rows, open_cursor
+from src.infra.workload_history import workload_history
+
+logger = get_logger(__name__)
+
+_FILE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_.-]*$")
+_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+
+
+async def export_query(
+    jdbc_url: str,
+    sql: str,
+    export_format: str = "csv",
+    file_name: Optional[str] = None,
+    catalog: Optional[str] = None,
+    schema: Optional[str] = None,
+    compression: Optional[str] = None,
+    max_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Выгружает полный результат запроса в локальный файл CSV или Parquet.
+
+    Строки читаются потоком и записываются пачками по EXPORT_BATCH_ROWS
+    (для Parquet - отдельными row group), поэтому память не зависит от
+    размера результата. Файл создается в EXPORT_DIR.
+
+    :param jdbc_url: JDBC URL для подключения к Trino
+    :param sql: SQL запрос на чтение
+    :param export_format: csv или parquet (требует extra parquet с pyarrow)
+    :param file_name: Имя файла в EXPORT_DIR (по умолчанию генерируется)
+    :param catalog: Каталог по умолчанию
+    :param schema: Схема по умолчанию
+    :param compression: Сжатие: csv - gzip, parquet - snappy, gzip, zstd,
+        lz4, brotli (по умолчанию EXPORT_PARQUET_COMPRESSION)
+    :param max_rows: Максимальное количество строк (по умолчанию EXPORT_MAX_ROWS)
+    :return: Путь к файлу, число строк, размер и схема
+    """
+    return await asyncio.to_thread(
+        run_export,
+        jdbc_url,
+        sql,
+        export_format,
+        file_name,
+        catalog,
+        schema,
+        compression,
+        max_rows,
+    )
+
+
+def run_export(
+    jdbc_url: str,
+    sql: str,
+    export_format: str = "csv",
+    file_name: Optional[str] = None,
+    catalog: Optional[str] = None,
+    schema: Optional[str] = None,
+    compression: Optional[str] = None,
+    max_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Синхронно выгружает результат запроса (для вызова из пула потоков).
+
+    Данные пишутся во временный файл, который переименовывается
+    после успешной записи, так что незавершенный экспорт не оставляет
+    частичного файла под итоговым именем.
+    """
+    started = time.monotonic()
+    cursors = []
+    result = _export(
+        cursors,
+        jdbc_url,
+        sql,
+        export_format,
+        file_name,
+        catalog,
+        schema,
+        compression,
+        max_rows,
+    )
+    workload_history.record(
+        "export_query",
+        jdbc_url,
+        sql,
+        (time.monotonic() - started) * 1000,
+        cursor=cursors[0] if cursors else None,
+        row_count=result.get("row_count"),
+        error=result.get("error"),
+    )
+    return result
+
+
+def _export(
+    cursors: list,
+    jdbc_url: str,
+    sql: str,
+    export_format: str,
+    file_name: Optional[str],
+    catalog: Optional[str],
+    schema: Optional[str],
+    compression: Optional[str],
+    max_rows: Optional[int],
+) -> Dict[str, Any]:
+    """Выполняет экспорт, параметры описаны в run_export."""
+    timer = None
+    timed_out = Event()
+    tmp_path = None
+    try:
+        if export_format not in EXPORT_FORMATS:
+            return {"error": f"Invalid export format: {export_format}", "sql": sql}
+        if export_format == "parquet" and not parquet_available():
+            return {
+                "error": "Parquet export requires pyarrow "
+                '(pip install ".[parquet]"), '
+                "use export_format=csv",
+                "sql": sql,
+            }
+        if not is_query(sql):
+            return {"error": "Only read queries can be exported", "sql": sql}
+        if file_name and not _FILE_NAME_PATTERN.match(file_name):
+            return {"error": f"Invalid file name: {file_name}", "sql": sql}
+
+        if export_format == "parquet" and compression is None:
+            compression = config.EXPORT_PARQUET_COMPRESSION or None
+        compressions = (
+            CSV_COMPRESSIONS if export_format == "csv" else PARQUET_COMPRESSIONS
+        )
+        if compression not in compressions:
+            return {
+                "error": f"Invalid compression for {export_format}: {compression}",
+                "sql": sql,
+            }
+        max_rows = config.EXPORT_MAX_ROWS if max_rows is None else max_rows
+        limit = max_rows if max_rows and max_rows > 0 else sys.maxsize
+
+        export_dir = os.path.abspath(config.EXPORT_DIR)
+        os.makedirs(export_dir, exist_ok=True)
+        file_name = file_name or (
+            f"export_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+            f"{_EXTENSIONS[export_format]}"
+            + (".gz" if compression == "gzip" and export_format == "csv" else "")
+        )
+        path = os.path.join(export_dir, file_name)
+        if os.path.exists(path):
+            return {"error": f"File already exists: {path}", "sql": sql}
+
+        timeout = config.EXPORT_TIMEOUT
+        started = time.monotonic()
+
+        with connection_manager.get_connection(jdbc_url) as conn:
+            cursor = open_cursor(conn)
+
+            if catalog:
+                if not validate_identifier(catalog):
+                    return {"error": "Invalid catalog name"}
+                cursor.execute(f"USE {catalog}")
+            if schema:
+                if not validate_identifier(schema):
+                    return {"error": "Invalid schema name"}
+                cursor.execute(
+                    f"USE {catalog}.{schema}" if catalog else f"USE {schema}"
+                )
+
+            guard = query_guard.check(conn, jdbc_url, sql, catalog, schema)
+            if guard["action"] in ("reject", "require_predicate"):
+                return {"error": guard["reason"], "sql": sql, "guard": guard}
+
+            if timeout:
+                timer = Timer(timeout, _cancel_export, (cursor, timed_out))
+                timer.daemon = True
+                timer.start()
+
+            # Экспорт выгружает полный результат: выборка guard не применяется
+            cursors.append(cursor)
+            with span("trino.execute") as run:
+                cursor.execute(sql)
+                run.set_query(cursor)
+            query_id_var.set(cursor.query_id)
+
+            tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.part"
+            writer = open_export_writer(
+                tmp_path, export_format, cursor.description, compression
+            )
+            row_count = 0
+            batches = 0
+            limited = False
+            with span("export.write", **{"export.format": export_format}) as written:
+                try:
+                    # Лишняя строка сверх limit показывает, что результат обрезан
+                    rows = iter_rows(
+                        cursor, limit if limit == sys.maxsize else limit + 1
+                    )
+                    while row_count < limit:
+                        batch = list(
+                            islice(
+                                rows, min(config.EXPORT_BATCH_ROWS, limit - row_count)
+                            )
+                        )
+                        if not batch:
+                            break
+                        writer.write_batch(batch)
+                        row_count += len(batch)
+                        batches += 1
+                    limited = row_count == limit and next(rows, None) is not None
+                finally:
+                    writer.close()
+                written.set(**{"mcp.row_count": row_count, "export.batches": batches})
+                written.set_query(cursor)
+
+            if timed_out.is_set():
+                return {"error": f"Export timed out after {timeout}s", "sql": sql}
+            if limited:
+                # Остаток результата не нужен - освобождаем ресурсы Trino
+                try:
+                    cursor.cancel()
+                except Exception as e:
+                    logger.debug("Error cancelling limited export: %s", e)
+
+        os.replace(tmp_path, path)
+        tmp_path = None
+        logger.info("Exported %s rows to %s", row_count, path)
+
+        return {
+            "path": path,
+            "format": export_format,
+            "compression": compression,
+            "row_count": row_count,
+            "batches": batches,
+            "limited": limited,
+            "size_bytes": os.path.getsize(path),
+            "columns": writer.schema,
+            "elapsed_seconds": round(time.monotonic() - started, 3),
+            "sql": sql,
+        }
+
+    except Exception as e:
+        if timed_out.is_set():
+            return {"error": f"Export timed out after {timeout}s", "sql": sql}
+        logger.error("Error exporting query: %s", e)
+        return {"error": str(e), "sql": sql}
+    finally:
+        if timer is not None:
+            timer.cancel()
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _cancel_export(cursor, timed_out: Event):
+    """Отменяет выгружаемый запрос по таймауту."""
+    timed_out.set()
+    try:
+        cursor.cancel()
+    except Exception as e:
+        logger.warning("Error cancelling timed out export: %s", e)
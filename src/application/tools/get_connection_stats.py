@@ -1,12 +1,21 @@
 from typing import Any, Dict
 
+from src.core.logging import get_logging_stats
+from src.core.tracing import get_tracing_stats
 from src.infra import connection_manager
+from src.infra.prepared_statements import prepared_statement_cache
 
 
 async def get_connection_stats() -> Dict[str, Any]:
     """
     Возвращает статистику активных подключений.
 
-    :return: Статистика подключений
+    :return: Статистика подключений, кеша подготовленных выражений,
+        логов и трассировки
     """
-    return connection_manager.get_stats()
+    return {
+        **connection_manager.get_stats(),
+        "prepared_statements": prepared_statement_cache.get_stats(),
+        "logging": get_logging_stats(),
+        "tracing": get_tracing_stats(),
+    }
@@ -0,0 +1,37 @@
+from typing import Any, Dict
+
+from src.infra.query_jobs import query_job_manager
+
+
+async def get_query_result(
+    job_id: str, offset: int = 0, limit: int = 0
+) -> Dict[str, Any]:
+    """
+    Возвращает результат завершенного фонового запроса.
+
+    Для формата rows можно получить результат частями через offset и limit.
+
+    :param job_id: Идентификатор задачи из submit_query
+    :param offset: Номер первой строки (для формата rows)
+    :param limit: Количество строк (0 - все оставшиеся)
+    :return: Результат запроса или статус, если запрос еще не завершен
+    """
+    try:
+        job = query_job_manager.get(job_id)
+    except KeyError as e:
+        return {"error": e.args[0], "job_id": job_id}
+
+    if job.state != "FINISHED" or job.result is None:
+        status = job.status()
+        status.setdefault("error", f"Query job is {job.state.lower()}")
+        return status
+
+    result = dict(job.result)
+    if "rows" in result and (offset or limit):
+        end = offset + limit if limit else None
+        result["rows"] = result["rows"][offset:end]
+        result["offset"] = offset
+        result["total_row_count"] = result["row_count"]
+        result["row_count"] = len(result["rows"])
+
+    return {"job_id": job_id, "state": job.state, **result}
@@ -0,0 +1,19 @@
+from typing import Any, Dict
+
+from src.infra.query_jobs import query_job_manager
+
+
+async def get_query_status(job_id: str) -> Dict[str, Any]:
+    """
+    Возвращает состояние и прогресс фонового запроса.
+
+    Прогресс считается по статистике Trino: доля завершенных сплитов,
+    число обработанных строк и байт.
+
+    :param job_id: Идентификатор задачи из submit_query
+    :return: Статус задачи
+    """
+    try:
+        return query_job_manager.get(job_id).status()
+    except KeyError as e:
+        return {"error": e.args[0], "job_id": job_id}
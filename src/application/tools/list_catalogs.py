@@ -15,13 +15,15 @@ async def list_catalogs(jdbc_url: str) -> Dict[str, Any]:
     :param jdbc_url: JDBC URL для подключения к Trino
     :return: Список каталогов
     """
-    try:
-        with connection_manager.get_connection(jdbc_url) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SHOW CATALOGS")
-            catalogs = [row[0] for row in cursor.fetchall()]
 
-            return {"catalogs": catalogs, "count": len(catalogs)}
+    def fetch(conn):
+        cursor = conn.cursor()
+        cursor.execute("SHOW CATALOGS")
+        return [row[0] for row in cursor.fetchall()]
+
+    try:
+        catalogs = connection_manager.run_with_failover(jdbc_url, fetch)
+        return {"catalogs": catalogs, "count": len(catalogs)}
     except TrinoUserError as e:
-        logger.error(f"Error listing catalogs: {e}")
+        logger.error("Error listing catalogs: %s", e)
         return {"error": str(e), "catalogs": []}
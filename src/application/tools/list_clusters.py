@@ -0,0 +1,15 @@
+from typing import Any, Dict
+
+from src.infra.cluster_registry import cluster_registry
+
+
+async def list_clusters() -> Dict[str, Any]:
+    """
+    Возвращает именованные кластеры Trino из конфигурации.
+
+    Имя кластера можно передавать в инструменты вместо jdbc_url.
+
+    :return: Кластеры без учетных данных
+    """
+    clusters = cluster_registry.list()
+    return {"clusters": clusters, "count": len(clusters)}
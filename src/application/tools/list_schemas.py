@@ -16,18 +16,20 @@ async def list_schemas(jdbc_url: str, catalog: Optional[str] = None) -> Dict[str
     :param catalog: Название каталога (опционально)
     :return: Список схем
     """
-    try:
-        with connection_manager.get_connection(jdbc_url) as conn:
-            cursor = conn.cursor()
 
-            if catalog:
-                cursor.execute(f"SHOW SCHEMAS FROM {catalog}")
-            else:
-                cursor.execute("SHOW SCHEMAS")
+    def fetch(conn):
+        cursor = conn.cursor()
+
+        if catalog:
+            cursor.execute(f"SHOW SCHEMAS FROM {catalog}")
+        else:
+            cursor.execute("SHOW SCHEMAS")
 
-            schemas = [row[0] for row in cursor.fetchall()]
+        return [row[0] for row in cursor.fetchall()]
 
-            return {"catalog": catalog, "schemas": schemas, "count": len(schemas)}
+    try:
+        schemas = connection_manager.run_with_failover(jdbc_url, fetch)
+        return {"catalog": catalog, "schemas": schemas, "count": len(schemas)}
     except TrinoUserError as e:
-        logger.error(f"Error listing schemas: {e}")
+        logger.error("Error listing schemas: %s", e)
         return {"error": str(e), "catalog": catalog, "schemas": []}
@@ -27,7 +27,7 @@ async def list_tables(
         if catalog and not validate_identifier(catalog):
             return {"error": "Invalid catalog name", "tables": []}
 
-        with connection_manager.get_connection(jdbc_url) as conn:
+        def fetch(conn):
             cursor = conn.cursor()
 
             if catalog:
@@ -35,18 +35,19 @@ async def list_tables(
             else:
                 cursor.execute(f"SHOW TABLES FROM {schema}")
 
-            tables = []
-            for row in cursor.fetchall():
-                tables.append(
-                    {"name": row[0], "type": row[1] if len(row) > 1 else "TABLE"}
-                )
-
-            return {
-                "catalog": catalog,
-                "schema": schema,
-                "tables": tables,
-                "count": len(tables),
-            }
+            return cursor.fetchall()
+
+        tables = [
+            {"name": row[0], "type": row[1] if len(row) > 1 else "TABLE"}
+            for row in connection_manager.run_with_failover(jdbc_url, fetch)
+        ]
+
+        return {
+            "catalog": catalog,
+            "schema": schema,
+            "tables": tables,
+            "count": len(tables),
+        }
     except TrinoUserError as e:
-        logger.error(f"Error listing tables: {e}")
+        logger.error("Error listing tables: %s", e)
         return {"error": str(e), "catalog": catalog, "schema": schema, "tables": []}
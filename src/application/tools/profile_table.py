@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from src.core.logging import get_logger
+from src.core.profiling import build_profile_query, parse_profile_row
+from src.core.utils.validate import validate_identifier
+from src.infra import connection_manager
+
+logger = get_logger(__name__)
+
+
+async def profile_table(
+    jdbc_url: str,
+    table: str,
+    schema: str,
+    catalog: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    sample_percent: Optional[float] = None,
+    top_k: int = 5,
+) -> Dict[str, Any]:
+    """
+    Строит профиль значений колонок таблицы одним агрегирующим запросом
+    на стороне Trino, без передачи строк.
+
+    :param jdbc_url: JDBC URL для подключения к Trino
+    :param table: Название таблицы
+    :param schema: Название схемы
+    :param catalog: Название каталога (опционально)
+    :param columns: Колонки для профилирования (по умолчанию все)
+    :param sample_percent: Процент строк для TABLESAMPLE BERNOULLI (0-100]
+    :param top_k: Количество самых частых значений для колонки
+    :return: Профиль таблицы: число строк и статистика по колонкам
+    """
+    try:
+        if not all(validate_identifier(name) for name in [table, schema]):
+            return {"error": "Invalid table or schema name", "columns": {}}
+
+        if catalog and not validate_identifier(catalog):
+            return {"error": "Invalid catalog name", "columns": {}}
+
+        if columns and not all(validate_identifier(name) for name in columns):
+            return {"error": "Invalid column name", "columns": {}}
+
+        if sample_percent is not None and not 0 < sample_percent <= 100:
+            return {"error": "sample_percent must be in (0, 100]", "columns": {}}
+
+        table_path = f"{catalog}.{schema}.{table}" if catalog else f"{schema}.{table}"
+        result = await asyncio.to_thread(
+            _run_profile, jdbc_url, table_path, columns, sample_percent, top_k
+        )
+        if "error" in result:
+            return result
+        return {
+            "catalog": catalog,
+            "schema": schema,
+            "table": table,
+            "row_count": result["row_count"],
+            "sample_percent": sample_percent,
+            "columns": result["columns"],
+            "sql": result["sql"],
+        }
+    except Exception as e:
+        logger.error("Error profiling table %s: %s", table, e)
+        return {
+            "error": str(e),
+            "catalog": catalog,
+            "schema": schema,
+            "table": table,
+            "columns": {},
+        }
+
+
+def _run_profile(
+    jdbc_url: str,
+    table_path: str,
+    columns: Optional[List[str]],
+    sample_percent: Optional[float],
+    top_k: int,
+) -> Dict[str, Any]:
+    """
+    Синхронно читает колонки таблицы и выполняет агрегирующий запрос
+    (для вызова из пула потоков).
+
+    :return: Число строк, профиль колонок и SQL или ошибка
+    """
+    with connection_manager.get_connection(jdbc_url) as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(f"DESCRIBE {table_path}")
+        table_columns = [(row[0], row[1]) for row in cursor.fetchall()]
+
+        if columns:
+            requested = {name.lower() for name in columns}
+            missing = requested - {name for name, _ in table_columns}
+            if missing:
+                return {
+                    "error": f"Unknown columns: {', '.join(sorted(missing))}",
+                    "columns": {},
+                }
+            table_columns = [
+                (name, type_name)
+                for name, type_name in table_columns
+                if name in requested
+            ]
+
+        sql, plan = build_profile_query(
+            table_path, table_columns, sample_percent, top_k
+        )
+        cursor.execute(sql)
+        row = cursor.fetchone()
+        aliases = [desc[0] for desc in cursor.description]
+
+        row_count, profile = parse_profile_row(row, aliases, plan)
+        return {"row_count": row_count, "columns": profile, "sql": sql}
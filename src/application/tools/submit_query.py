@@ -0,0 +1,52 @@
+from functools import partial
+from typing import Any, Dict, Optional
+
+from src.application.tools.execute_query import RESULT_FORMATS, run_query
+from src.core.logging import get_logger
+from src.infra.query_jobs import query_job_manager
+
+logger = get_logger(__name__)
+
+
+async def submit_query(
+    jdbc_url: str,
+    sql: str,
+    limit: int = 100,
+    catalog: Optional[str] = None,
+    schema: Optional[str] = None,
+    result_format: str = "rows",
+) -> Dict[str, Any]:
+    """
+    Запускает SQL запрос в фоне и сразу возвращает идентификатор задачи.
+
+    Статус и прогресс запрашиваются через get_query_status, результат -
+    через get_query_result, отмена - через cancel_query.
+
+    :param jdbc_url: JDBC URL для подключения к Trino
+    :param sql: SQL запрос для выполнения
+    :param limit: Максимальное количество строк результата
+    :param catalog: Каталог по умолчанию
+    :param schema: Схема по умолчанию
+    :param result_format: Формат результата: rows, columnar или summary
+    :return: Идентификатор и статус задачи
+    """
+    try:
+        if result_format not in RESULT_FORMATS:
+            return {"error": f"Invalid result format: {result_format}", "sql": sql}
+
+        runner = partial(
+            run_query,
+            jdbc_url,
+            sql,
+            limit,
+            catalog,
+            schema,
+            result_format,
+            tool="submit_query",
+        )
+        job = query_job_manager.submit(jdbc_url, sql, runner)
+        return {"job_id": job.job_id, "state": job.state, "sql": sql}
+
+    except Exception as e:
+        logger.error("Error submitting query: %s", e)
+        return {"error": str(e), "sql": sql}
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+from src.core.logging import get_logger
+from src.core.utils.validate import validate_identifier
+from src.infra.table_stats import table_stats_provider
+
+logger = get_logger(__name__)
+
+
+async def table_stats(
+    jdbc_url: str,
+    table: str,
+    schema: str,
+    catalog: Optional[str] = None,
+    include_partitions: bool = True,
+    refresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Возвращает статистику и размер таблицы без ее сканирования.
+
+    :param jdbc_url: JDBC URL для подключения к Trino
+    :param table: Название таблицы
+    :param schema: Название схемы
+    :param catalog: Название каталога (опционально)
+    :param include_partitions: Читать $partitions/$files (Hive/Iceberg)
+    :param refresh: Игнорировать закешированную статистику
+    :return: Оценка числа строк и объема, статистика колонок, партиции
+    """
+    try:
+        if not all(validate_identifier(name) for name in [table, schema]):
+            return {"error": "Invalid table or schema name"}
+
+        if catalog and not validate_identifier(catalog):
+            return {"error": "Invalid catalog name"}
+
+        table_path = f"{catalog}.{schema}.{table}" if catalog else f"{schema}.{table}"
+        stats = await asyncio.to_thread(
+            table_stats_provider.get,
+            jdbc_url,
+            table_path,
+            include_partitions=include_partitions,
+            refresh=refresh,
+        )
+
+        return {"catalog": catalog, "schema": schema, "table": table, **stats}
+    except Exception as e:
+        logger.error("Error getting stats for table %s: %s", table, e)
+        return {
+            "error": str(e),
+            "catalog": catalog,
+            "schema": schema,
+            "table": table,
+        }
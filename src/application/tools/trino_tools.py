@@ -1,17 +1,9 @@
 from typing import Optional
 
-from src.application.tools import (
-    connection_status,
-    describe_table,
-    execute_ddl_statements,
-    execute_query,
-    get_connection_stats,
-    list_catalogs,
-    list_schemas,
-    list_tables,
-    validate_ddl_statements,
-)
-from src.core.logging import get_logger
+from src.application import tools
+from src.core.config import config
+from src.core.logging import bind_request, get_logger
+from src.core.tracing import trace_tool
 
 logger = get_logger(__name__)
 
@@ -19,44 +11,67 @@ logger = get_logger(__name__)
 def register_tools(mcp_server):
     """
     Регистрирует все инструменты для работы с Trino в FastMCP сервере.
+
+    Каждый вызов инструмента получает request_id для записей лога и span
+    трассировки; trace_tool сериализует результат в строку ответа.
     """
 
     @mcp_server.tool()
+    @bind_request
+    @trace_tool
+    async def list_clusters_tool() -> str:
+        """
+        Возвращает именованные кластеры Trino из конфигурации.
+        Имя кластера можно передавать в любой инструмент вместо jdbc_url.
+        """
+        try:
+            return await tools.list_clusters()
+        except Exception as e:
+            logger.error("Error in list_clusters: %s", e)
+            return f"Error: {str(e)}"
+
+    @mcp_server.tool()
+    @bind_request
+    @trace_tool
     async def connection_status_tool(jdbc_url: str) -> str:
         """Проверяет статус подключения к Trino."""
         try:
-            result = connection_status(jdbc_url=jdbc_url)
+            result = tools.connection_status(jdbc_url=jdbc_url)
             if hasattr(result, "__await__"):
                 result = await result
-            return str(result)
+            return result
         except Exception as e:
-            logger.error(f"Error in connection_status: {e}")
+            logger.error("Error in connection_status: %s", e)
             return f"Error: {str(e)}"
 
     @mcp_server.tool()
+    @bind_request
+    @trace_tool
     async def list_catalogs_tool(jdbc_url: str) -> str:
         """Возвращает список всех доступных каталогов."""
         try:
-            result = await list_catalogs(jdbc_url=jdbc_url)
-            return str(result)
+            return await tools.list_catalogs(jdbc_url=jdbc_url)
         except Exception as e:
-            logger.error(f"Error in list_catalogs: {e}")
+            logger.error("Error in list_catalogs: %s", e)
             return f"Error: {str(e)}"
 
     @mcp_server.tool()
+    @bind_request
+    @trace_tool
     async def list_schemas_tool(jdbc_url: str, catalog: Optional[str] = None) -> str:
         """Возвращает список схем в указанном каталоге."""
         try:
             kwargs = {"jdbc_url": jdbc_url}
             if catalog:
                 kwargs["catalog"] = catalog
-            result = await list_schemas(**kwargs)
-            return str(result)
+            return await tools.list_schemas(**kwargs)
         except Exception as e:
-            logger.error(f"Error in list_schemas: {e}")
+            logger.error("Error in list_schemas: %s", e)
             return f"Error: {str(e)}"
 
     @mcp_server.tool()
+    @bind_request
+    @trace_tool
     async def list_tables_tool(
         jdbc_url: str, schema: str, catalog: Optional[str] = None
     ) -> str:
@@ -65,13 +80,14 @@ def register_tools(mcp_server):
             kwargs = {"jdbc_url": jdbc_url, "schema": schema}
             if catalog:
                 kwargs["catalog"] = catalog
-            result = await list_tables(**kwargs)
-            return str(result)
+            return await tools.list_tables(**kwargs)
         except Exception as e:
-            logger.error(f"Error in list_tables: {e}")
+            logger.error("Error in list_tables: %s", e)
             return f"Error: {str(e)}"
 
     @mcp_server.tool()
+    @bind_request
+    @trace_tool
     async def describe_table_tool(
         jdbc_url: str, table: str, schema: str, catalog: Optional[str] = None
     ) -> str:
@@ -80,76 +96,465 @@ def register_tools(mcp_server):
             kwargs = {"jdbc_url": jdbc_url, "table": table, "schema": schema}
             if catalog:
                 kwargs["catalog"] = catalog
-            result = await describe_table(**kwargs)
-            return str(result)
+            return await tools.describe_table(**kwargs)
+        except Exception as e:
+            logger.error("Error in describe_table: %s", e)
+            return f"Error: {str(e)}"
+
+    @mcp_server.tool()
+    @bind_request
+    @trace_tool
+    async def profile_table_tool(
+        jdbc_url: str,
+        table: str,
+        schema: str,
+        catalog: Optional[str] = None,
+        columns: Optional[list] = None,
+        sample_percent: Optional[float] = None,
+        top_k: int = 5,
+    ) -> str:
+        """
+        Возвращает профиль колонок таблицы (доля NULL, число различных,
+        min/max, перцентили, частые значения) одним агрегирующим запросом.
+        """
+        try:
+            kwargs = {
+                "jdbc_url": jdbc_url,
+                "table": table,
+                "schema": schema,
+                "top_k": top_k,
+            }
+            if catalog:
+                kwargs["catalog"] = catalog
+            if columns:
+                kwargs["columns"] = columns
+            if sample_percent:
+                kwargs["sample_percent"] = sample_percent
+            return await tools.profile_table(**kwargs)
         except Exception as e:
-            logger.error(f"Error in describe_table: {e}")
+            logger.error("Error in profile_table: %s", e)
             return f"Error: {str(e)}"
 
     @mcp_server.tool()
+    @bind_request
+    @trace_tool
+    async def table_stats_tool(
+        jdbc_url: str,
+        table: str,
+        schema: str,
+        catalog: Optional[str] = None,
+        include_partitions: bool = True,
+        refresh: bool = False,
+    ) -> str:
+        """
+        Возвращает статистику таблицы (SHOW STATS, число строк, объем,
+        партиции и файлы для Hive/Iceberg) без сканирования данных.
+        """
+        try:
+            kwargs = {
+                "jdbc_url": jdbc_url,
+                "table": table,
+                "schema": schema,
+                "include_partitions": include_partitions,
+                "refresh": refresh,
+            }
+            if catalog:
+                kwargs["catalog"] = catalog
+            return await tools.table_stats(**kwargs)
+        except Exception as e:
+            logger.error("Error in table_stats: %s", e)
+            return f"Error: {str(e)}"
+
+    @mcp_server.tool()
+    @bind_request
+    @trace_tool
+    async def diff_schemas_tool(
+        source_jdbc_url: str,
+        source_schema: str,
+        target_schema: Optional[str] = None,
+        target_jdbc_url: Optional[str] = None,
+        source_catalog: Optional[str] = None,
+        target_catalog: Optional[str] = None,
+        tables: Optional[list] = None,
+        generate_ddl: bool = False,
+        include_drops: bool = False,
+    ) -> str:
+        """
+        Сравнивает структуру таблиц двух схем (каталогов или кластеров)
+        двумя запросами к information_schema: добавленные, удаленные и
+        измененные таблицы и колонки относительно source.
+
+        generate_ddl строит CREATE/ALTER, приводящие target к source,
+        и проверяет их анализатором DDL; include_drops добавляет удаление
+        лишних таблиц и колонок.
+        """
+        try:
+            kwargs = {
+                "source_jdbc_url": source_jdbc_url,
+                "source_schema": source_schema,
+                "generate_ddl": generate_ddl,
+                "include_drops": include_drops,
+            }
+            if target_schema:
+                kwargs["target_schema"] = target_schema
+            if target_jdbc_url:
+                kwargs["target_jdbc_url"] = target_jdbc_url
+            if source_catalog:
+                kwargs["source_catalog"] = source_catalog
+            if target_catalog:
+                kwargs["target_catalog"] = target_catalog
+            if tables:
+                kwargs["tables"] = tables
+            return await tools.diff_schemas(**kwargs)
+        except Exception as e:
+            logger.error("Error in diff_schemas: %s", e)
+            return f"Error: {str(e)}"
+
+    @mcp_server.tool()
+    @bind_request
+    @trace_tool
+    async def view_lineage_tool(
+        jdbc_url: str,
+        name: str,
+        catalog: Optional[str] = None,
+        direction: str = "both",
+        max_depth: Optional[int] = None,
+        catalogs: Optional[list] = None,
+        refresh: bool = False,
+    ) -> str:
+        """
+        Возвращает граф зависимостей представлений для таблицы или
+        представления: upstream (из чего оно строится) и downstream
+        (какие представления сломаются при его удалении).
+
+        Индекс представлений каталога строится одним запросом к
+        information_schema.views и кешируется. catalogs добавляет
+        представления других каталогов, direction: upstream, downstream
+        или both.
+        """
+        try:
+            kwargs = {
+                "jdbc_url": jdbc_url,
+                "name": name,
+                "direction": direction,
+                "refresh": refresh,
+            }
+            if catalog:
+                kwargs["catalog"] = catalog
+            if max_depth:
+                kwargs["max_depth"] = max_depth
+            if catalogs:
+                kwargs["catalogs"] = catalogs
+            return await tools.view_lineage(**kwargs)
+        except Exception as e:
+            logger.error("Error in view_lineage: %s", e)
+            return f"Error: {str(e)}"
+
+    @mcp_server.tool()
+    @bind_request
+    @trace_tool
     async def execute_query_tool(
         jdbc_url: str,
         sql: str,
         limit: int = 100,
         catalog: Optional[str] = None,
         schema: Optional[str] = None,
+        result_format: str = "rows",
+        max_bytes: Optional[int] = None,
+        max_cell_bytes: Optional[int] = None,
+        exclude_columns: Optional[list] = None,
+        parameters: Optional[list] = None,
+    ) -> str:
+        """
+        Выполняет SQL запрос с ограничением на количество строк и размер ответа.
+
+        result_format: rows - список строк, columnar - значения по колонкам
+        со статистикой (min/max/NULL/число различных), summary - только статистика.
+        max_bytes / max_cell_bytes ограничивают размер строк и отдельных ячеек
+        (большие значения усекаются с маркером, по умолчанию лимиты заданы
+        RESULT_MAX_BYTES / RESULT_MAX_CELL_BYTES и выключены), exclude_columns убирает
+        широкие колонки. Что было отброшено, указано в поле budget.
+        parameters - значения параметров ? в sql: запрос выполняется как
+        подготовленное выражение, повторные вызовы переиспользуют его.
+        """
+        try:
+            kwargs = {
+                "jdbc_url": jdbc_url,
+                "sql": sql,
+                "limit": limit,
+                "result_format": result_format,
+            }
+            if catalog:
+                kwargs["catalog"] = catalog
+            if schema:
+                kwargs["schema"] = schema
+            if max_bytes is not None:
+                kwargs["max_bytes"] = max_bytes
+            if max_cell_bytes is not None:
+                kwargs["max_cell_bytes"] = max_cell_bytes
+            if exclude_columns:
+                kwargs["exclude_columns"] = exclude_columns
+            if parameters:
+                kwargs["parameters"] = parameters
+            return await tools.execute_query(**kwargs)
+        except Exception as e:
+            logger.error("Error in execute_query: %s", e)
+            return f"Error: {str(e)}"
+
+    @mcp_server.tool()
+    @bind_request
+    @trace_tool
+    async def execute_queries_tool(
+        jdbc_url: str,
+        statements: list,
+        limit: int = 100,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+        max_concurrency: int = 4,
+        timeout: Optional[float] = None,
     ) -> str:
-        """Выполняет SQL запрос с ограничением на количество строк."""
+        """
+        Выполняет несколько независимых SQL запросов параллельно.
+
+        statements: строки SQL или объекты {"sql", "parameters", "limit", "timeout"}.
+        Результаты возвращаются в порядке входа, ошибки изолированы.
+        """
         try:
-            kwargs = {"jdbc_url": jdbc_url, "sql": sql, "limit": limit}
+            kwargs = {
+                "jdbc_url": jdbc_url,
+                "statements": statements,
+                "limit": limit,
+                "max_concurrency": max_concurrency,
+            }
             if catalog:
                 kwargs["catalog"] = catalog
             if schema:
                 kwargs["schema"] = schema
-            result = await execute_query(**kwargs)
-            return str(result)
+            if timeout:
+                kwargs["timeout"] = timeout
+            return await tools.execute_queries(**kwargs)
         except Exception as e:
-            logger.error(f"Error in execute_query: {e}")
+            logger.error("Error in execute_queries: %s", e)
             return f"Error: {str(e)}"
 
     @mcp_server.tool()
-    async def validate_ddl_statements_tool(ddl_list: list) -> str:
-        """Анализирует и валидирует список DDL выражений."""
+    @bind_request
+    @trace_tool
+    async def export_query_tool(
+        jdbc_url: str,
+        sql: str,
+        export_format: str = "csv",
+        file_name: Optional[str] = None,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+        compression: Optional[str] = None,
+        max_rows: Optional[int] = None,
+    ) -> str:
+        """
+        Выгружает полный результат запроса в локальный файл CSV или Parquet.
+
+        Строки пишутся потоком пачками (row group для Parquet), файл
+        создается в EXPORT_DIR. Возвращает путь, число строк и схему.
+        export_format: csv (по умолчанию) или parquet (нужен pyarrow).
+        compression: csv - gzip, parquet - snappy, gzip, zstd, lz4, brotli.
+        """
         try:
-            result = await validate_ddl_statements(ddl_list=ddl_list)
-            return str(result)
+            kwargs = {
+                "jdbc_url": jdbc_url,
+                "sql": sql,
+                "export_format": export_format,
+            }
+            if file_name:
+                kwargs["file_name"] = file_name
+            if catalog:
+                kwargs["catalog"] = catalog
+            if schema:
+                kwargs["schema"] = schema
+            if compression:
+                kwargs["compression"] = compression
+            if max_rows is not None:
+                kwargs["max_rows"] = max_rows
+            return await tools.export_query(**kwargs)
         except Exception as e:
-            logger.error(f"Error in validate_ddl_statements: {e}")
+            logger.error("Error in export_query: %s", e)
             return f"Error: {str(e)}"
 
+    # Фоновые запросы хранятся в памяти воркера: при нескольких воркерах
+    # статус и результат задания запросил бы не тот процесс
+    if config.SERVER_WORKERS <= 1:
+
+        @mcp_server.tool()
+        @bind_request
+        @trace_tool
+        async def submit_query_tool(
+            jdbc_url: str,
+            sql: str,
+            limit: int = 100,
+            catalog: Optional[str] = None,
+            schema: Optional[str] = None,
+            result_format: str = "rows",
+        ) -> str:
+            """
+            Запускает долгий SQL запрос в фоне и сразу возвращает job_id.
+
+            Прогресс: get_query_status_tool, результат: get_query_result_tool,
+            отмена: cancel_query_tool.
+            """
+            try:
+                kwargs = {
+                    "jdbc_url": jdbc_url,
+                    "sql": sql,
+                    "limit": limit,
+                    "result_format": result_format,
+                }
+                if catalog:
+                    kwargs["catalog"] = catalog
+                if schema:
+                    kwargs["schema"] = schema
+                return await tools.submit_query(**kwargs)
+            except Exception as e:
+                logger.error("Error in submit_query: %s", e)
+                return f"Error: {str(e)}"
+
+        @mcp_server.tool()
+        @bind_request
+        @trace_tool
+        async def get_query_status_tool(job_id: str) -> str:
+            """Возвращает состояние и прогресс фонового запроса."""
+            try:
+                return await tools.get_query_status(job_id=job_id)
+            except Exception as e:
+                logger.error("Error in get_query_status: %s", e)
+                return f"Error: {str(e)}"
+
+        @mcp_server.tool()
+        @bind_request
+        @trace_tool
+        async def get_query_result_tool(
+            job_id: str, offset: int = 0, limit: int = 0
+        ) -> str:
+            """
+            Возвращает результат завершенного фонового запроса.
+            offset/limit позволяют читать строки частями.
+            """
+            try:
+                return await tools.get_query_result(
+                    job_id=job_id, offset=offset, limit=limit
+                )
+            except Exception as e:
+                logger.error("Error in get_query_result: %s", e)
+                return f"Error: {str(e)}"
+
+        @mcp_server.tool()
+        @bind_request
+        @trace_tool
+        async def cancel_query_tool(job_id: str) -> str:
+            """Отменяет фоновый запрос."""
+            try:
+                return await tools.cancel_query(job_id=job_id)
+            except Exception as e:
+                logger.error("Error in cancel_query: %s", e)
+                return f"Error: {str(e)}"
+
     @mcp_server.tool()
+    @bind_request
+    @trace_tool
+    async def validate_ddl_statements_tool(
+        ddl_list: list,
+        jdbc_url: Optional[str] = None,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+    ) -> str:
+        """
+        Анализирует и валидирует список DDL выражений.
+
+        С jdbc_url набор также проверяется против существующих объектов
+        кластера: конфликты имен, отсутствующие зависимости и колонки.
+        """
+        try:
+            kwargs = {"ddl_list": ddl_list}
+            if jdbc_url:
+                kwargs["jdbc_url"] = jdbc_url
+            if catalog:
+                kwargs["catalog"] = catalog
+            if schema:
+                kwargs["schema"] = schema
+            return await tools.validate_ddl_statements(**kwargs)
+        except Exception as e:
+            logger.error("Error in validate_ddl_statements: %s", e)
+            return f"Error: {str(e)}"
+
+    @mcp_server.tool()
+    @bind_request
+    @trace_tool
     async def execute_ddl_statements_tool(
         jdbc_url: str,
         ddl_list: list,
         catalog: Optional[str] = None,
         schema: Optional[str] = None,
         validate_first: bool = True,
+        check_catalog: bool = False,
     ) -> str:
-        """Выполняет список DDL выражений с предварительной валидацией."""
+        """
+        Выполняет список DDL выражений с предварительной валидацией.
+
+        check_catalog проверяет набор против существующих объектов
+        кластера до выполнения первого выражения.
+        """
         try:
             kwargs = {
                 "jdbc_url": jdbc_url,
                 "ddl_list": ddl_list,
                 "validate_first": validate_first,
+                "check_catalog": check_catalog,
             }
             if catalog:
                 kwargs["catalog"] = catalog
             if schema:
                 kwargs["schema"] = schema
-            result = await execute_ddl_statements(**kwargs)
-            return str(result)
+            return await tools.execute_ddl_statements(**kwargs)
         except Exception as e:
-            logger.error(f"Error in execute_ddl_statements: {e}")
+            logger.error("Error in execute_ddl_statements: %s", e)
             return f"Error: {str(e)}"
 
     @mcp_server.tool()
+    @bind_request
+    @trace_tool
     async def get_connection_stats_tool() -> str:
         """Возвращает статистику активных подключений."""
         try:
-            result = await get_connection_stats()
-            return str(result)
+            return await tools.get_connection_stats()
+        except Exception as e:
+            logger.error("Error in get_connection_stats: %s", e)
+            return f"Error: {str(e)}"
+
+    @mcp_server.tool()
+    @bind_request
+    @trace_tool
+    async def workload_report_tool(
+        since_hours: float = 24,
+        tool: Optional[str] = None,
+        cluster: Optional[str] = None,
+        order_by: str = "elapsed",
+        limit: int = 20,
+    ) -> str:
+        """
+        Возвращает самые затратные запросы за период, сгруппированные по
+        отпечатку (SQL без литералов): число вызовов и ошибок, время,
+        CPU, прочитанные строки и байты, последний query id.
+
+        order_by: elapsed, cpu, bytes, rows, calls или errors.
+        tool и cluster ограничивают отчет инструментом или кластером.
+        """
+        try:
+            kwargs = {"since_hours": since_hours, "order_by": order_by, "limit": limit}
+            if tool:
+                kwargs["tool"] = tool
+            if cluster:
+                kwargs["cluster"] = cluster
+            return await tools.workload_report(**kwargs)
         except Exception as e:
-            logger.error(f"Error in get_connection_stats: {e}")
+            logger.error("Error in workload_report: %s", e)
             return f"Error: {str(e)}"
 
     logger.info("Все инструменты Trino зарегистрированы в FastMCP сервере")
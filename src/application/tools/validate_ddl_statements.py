@@ -1,22 +1,51 @@
-from typing import Any, Dict, List
+import asyncio
+from typing import Any, Dict, List, Optional
 
-from src.core import ddl_analyzer
+from src.core.ddl_analyzer import ddl_analyzer
 from src.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-async def validate_ddl_statements(ddl_list: List[str]) -> Dict[str, Any]:
+async def validate_ddl_statements(
+    ddl_list: List[str],
+    jdbc_url: Optional[str] = None,
+    catalog: Optional[str] = None,
+    schema: Optional[str] = None,
+) -> Dict[str, Any]:
     """
     Анализирует и валидирует список DDL выражений.
 
+    Если передан jdbc_url, набор дополнительно проверяется против
+    существующих объектов кластера (один запрос к information_schema
+    на каталог): создание существующих объектов, ссылки на отсутствующие
+    таблицы, изменение несуществующих колонок.
+
     :param ddl_list: Список DDL выражений для анализа
+    :param jdbc_url: JDBC URL для проверки по кластеру (опционально)
+    :param catalog: Каталог по умолчанию для неполных имен
+    :param schema: Схема по умолчанию для неполных имен
     :return: Результаты анализа DDL
     """
     try:
-        return ddl_analyzer.analyze_ddl_list(ddl_list)
+        result = await asyncio.to_thread(ddl_analyzer.analyze_ddl_list, ddl_list)
+        if jdbc_url:
+            # Клиент trino нужен только для проверки по кластеру
+            from src.infra.catalog_metadata import catalog_metadata_validator
+
+            catalog_check = await asyncio.to_thread(
+                catalog_metadata_validator.validate,
+                jdbc_url,
+                ddl_list,
+                result,
+                catalog=catalog,
+                schema=schema,
+            )
+            result["catalog_check"] = catalog_check
+            result["potential_issues"].extend(catalog_check["issues"])
+        return result
     except Exception as e:
-        logger.error(f"Error analyzing DDL statements: {e}")
+        logger.error("Error analyzing DDL statements: %s", e)
         return {
             "error": str(e),
             "total_statements": len(ddl_list) if ddl_list else 0,
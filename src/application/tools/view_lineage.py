@@ -0,0 +1,78 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from src.core.logging import get_logger
+from src.core.utils.validate import validate_identifier
+from src.infra.cluster_registry import cluster_registry
+from src.infra.view_lineage import LINEAGE_DIRECTIONS, view_lineage_index
+
+logger = get_logger(__name__)
+
+
+async def view_lineage(
+    jdbc_url: str,
+    name: str,
+    catalog: Optional[str] = None,
+    direction: str = "both",
+    max_depth: Optional[int] = None,
+    catalogs: Optional[List[str]] = None,
+    refresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Возвращает представления, от которых зависит объект (upstream), и
+    представления, которые сломаются при его удалении или изменении
+    (downstream).
+
+    Тексты представлений каталога читаются одним запросом и индексируются;
+    повторные вызовы обходят граф в памяти, а после VIEW_LINEAGE_CACHE_TTL
+    индекс обновляется только для измененных представлений.
+
+    :param jdbc_url: JDBC URL для подключения к Trino
+    :param name: Имя таблицы или представления (schema.name или
+        catalog.schema.name)
+    :param catalog: Каталог для имени без каталога (по умолчанию из JDBC URL)
+    :param direction: upstream, downstream или both
+    :param max_depth: Глубина обхода графа (по умолчанию без ограничения)
+    :param catalogs: Каталоги, представления которых учитываются
+        (по умолчанию каталог объекта)
+    :param refresh: Обновить индекс, не дожидаясь истечения TTL
+    :return: Объекты выше и ниже по графу и состояние индекса каталогов
+    """
+    try:
+        if not validate_identifier(name, allow_qualified=True):
+            return {"error": "Invalid object name"}
+
+        parts = name.split(".")
+        if len(parts) == 2:
+            catalog = catalog or cluster_registry.resolve(jdbc_url).params.get(
+                "catalog"
+            )
+            if not catalog:
+                return {"error": "Catalog is required (argument or JDBC URL)"}
+            parts = [catalog] + parts
+        if len(parts) != 3:
+            return {"error": "Name must be schema.name or catalog.schema.name"}
+
+        catalogs = catalogs or [parts[0]]
+        if not all(validate_identifier(item) for item in [parts[0]] + catalogs):
+            return {"error": "Invalid catalog name"}
+
+        if direction not in LINEAGE_DIRECTIONS:
+            return {"error": f"Invalid direction: {direction}"}
+
+        if max_depth is not None and max_depth < 1:
+            return {"error": "max_depth must be positive"}
+
+        indexes = await asyncio.gather(
+            *(
+                asyncio.to_thread(view_lineage_index.ensure, jdbc_url, item, refresh)
+                for item in dict.fromkeys(item.lower() for item in catalogs)
+            )
+        )
+        result = view_lineage_index.lineage(
+            jdbc_url, catalogs, ".".join(parts), direction, max_depth
+        )
+        return {**result, "indexes": list(indexes)}
+    except Exception as e:
+        logger.error("Error building lineage of %s: %s", name, e)
+        return {"error": str(e), "name": name}
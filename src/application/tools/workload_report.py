@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+from src.core.logging import get_logger
+from src.infra.workload_history import REPORT_ORDERS, workload_history
+
+logger = get_logger(__name__)
+
+
+async def workload_report(
+    since_hours: float = 24,
+    tool: Optional[str] = None,
+    cluster: Optional[str] = None,
+    order_by: str = "elapsed",
+    limit: int = 20,
+) -> Dict[str, Any]:
+    """
+    Возвращает самые затратные запросы из журнала, сгруппированные по
+    отпечатку (SQL без литералов).
+
+    :param since_hours: Период отчета в часах (0 - весь журнал)
+    :param tool: Только запросы этого инструмента (execute_query,
+        execute_queries, submit_query, export_query, analyze_queries,
+        execute_ddl_statements)
+    :param cluster: Только запросы этого кластера (имя или JDBC URL)
+    :param order_by: Сортировка: elapsed, cpu, bytes, rows, calls, errors
+    :param limit: Количество отпечатков в отчете
+    :return: Итоги периода и отпечатки с суммарной стоимостью
+    """
+    try:
+        if order_by not in REPORT_ORDERS:
+            return {"error": f"Invalid order: {order_by}"}
+        return await asyncio.to_thread(
+            workload_history.report, since_hours, tool, cluster, order_by, limit
+        )
+    except Exception as e:
+        logger.error("Error building workload report: %s", e)
+        return {"error": str(e)}
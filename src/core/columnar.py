@@ -0,0 +1,276 @@
+from array import array
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy опционален
+    np = None
+
+INT_TYPES = {"tinyint", "smallint", "integer", "bigint"}
+FLOAT_TYPES = {"real", "double"}
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_DATE = date(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def raw_type(type_name: str) -> str:
+    """
+    Возвращает базовый тип Trino без параметров.
+    Пример: "decimal(10,2)" -> "decimal", "timestamp(3)" -> "timestamp"
+
+    :param type_name: Полное имя типа
+    :return: Базовое имя типа
+    """
+    return type_name.split("(", 1)[0].strip().lower()
+
+
+class ColumnBuffer:
+    """
+    Типизированный буфер значений одной колонки.
+
+    Числовые, булевы колонки, даты и timestamp без часового пояса хранятся
+    в array.array (8 байт на значение вместо Python объекта), NULL
+    отмечаются в отдельной маске. Остальные типы хранятся списком.
+    """
+
+    def __init__(self, name: str, type_name: str):
+        self.name = name
+        self.type_name = type_name
+        self.kind = self._kind(type_name)
+
+        self._typecode = {"float": "d"}.get(self.kind, "q")
+        self._values = [] if self.kind == "object" else array(self._typecode)
+        self._nulls = bytearray()
+        self._null_count = 0
+
+    @staticmethod
+    def _kind(type_name: str) -> str:
+        base_type = raw_type(type_name)
+        if base_type in INT_TYPES:
+            return "int"
+        if base_type in FLOAT_TYPES:
+            return "float"
+        if base_type == "boolean":
+            return "bool"
+        if base_type == "timestamp" and "with time zone" not in type_name.lower():
+            return "timestamp"
+        if base_type == "date":
+            return "date"
+        return "object"
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def extend(self, values: Tuple[Any, ...]):
+        """
+        Добавляет страницу значений колонки.
+
+        :param values: Значения колонки из страницы строк
+        """
+        if self.kind == "object":
+            self._values.extend(values)
+            self._nulls.extend(value is None for value in values)
+            self._null_count += values.count(None)
+            return
+
+        has_nulls = None in values
+        if has_nulls:
+            self._nulls.extend(value is None for value in values)
+            self._null_count += values.count(None)
+        else:
+            self._nulls.extend(bytes(len(values)))
+
+        if self.kind == "timestamp":
+            values = [
+                (value - _EPOCH) // _MICROSECOND if value is not None else 0
+                for value in values
+            ]
+        elif self.kind == "date":
+            values = [
+                (value - _EPOCH_DATE).days if value is not None else 0
+                for value in values
+            ]
+        elif has_nulls:
+            values = [value if value is not None else 0 for value in values]
+
+        self._values.extend(values)
+
+    def to_list(self) -> List[Any]:
+        """
+        Сериализует буфер в список Python значений.
+
+        :return: Значения колонки с None на месте NULL
+        """
+        if self.kind == "object":
+            return list(self._values)
+
+        values = self._values.tolist()
+        if self.kind in ("bool", "timestamp", "date"):
+            values = [self._format_value(value) for value in values]
+
+        if self._null_count:
+            values = [
+                None if is_null else value
+                for value, is_null in zip(values, self._nulls)
+            ]
+        return values
+
+    def _format_value(self, value: Any) -> Any:
+        """Преобразует значение буфера в сериализуемое представление."""
+        if self.kind == "timestamp":
+            return (_EPOCH + value * _MICROSECOND).isoformat()
+        if self.kind == "date":
+            return (_EPOCH_DATE + timedelta(days=value)).isoformat()
+        if self.kind == "bool":
+            return bool(value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Считает сводную статистику колонки: NULL, min, max, число различных.
+
+        Для типизированных буферов при наличии numpy расчет векторный
+        (буферы оборачиваются без копирования).
+
+        :return: Статистика колонки
+        """
+        result = {
+            "type": self.type_name,
+            "count": len(self),
+            "null_count": self._null_count,
+            "min": None,
+            "max": None,
+            "distinct_count": 0,
+        }
+        if self._null_count == len(self):
+            return result
+
+        if self.kind == "object":
+            min_value, max_value, distinct = self._object_stats()
+        elif np is not None:
+            min_value, max_value, distinct = self._numpy_stats()
+        else:
+            values = [
+                value
+                for value, is_null in zip(self._values, self._nulls)
+                if not is_null
+            ]
+            min_value, max_value, distinct = min(values), max(values), len(set(values))
+            min_value = self._format_value(min_value)
+            max_value = self._format_value(max_value)
+
+        result.update(min=min_value, max=max_value, distinct_count=distinct)
+        return result
+
+    def _numpy_stats(self) -> Tuple[Any, Any, int]:
+        dtype = np.float64 if self._typecode == "d" else np.int64
+        values = np.frombuffer(self._values, dtype=dtype)
+        if self._null_count:
+            mask = np.frombuffer(bytes(self._nulls), dtype=np.uint8)
+            values = values[mask == 0]
+
+        if dtype is np.float64:
+            values = values[~np.isnan(values)]
+            if not values.size:
+                return None, None, 0
+
+        return (
+            self._format_value(values.min().item()),
+            self._format_value(values.max().item()),
+            int(np.unique(values).size),
+        )
+
+    def _object_stats(self) -> Tuple[Any, Any, Optional[int]]:
+        values = [value for value in self._values if value is not None]
+        try:
+            distinct = len(set(values))
+        except TypeError:
+            distinct = len({repr(value) for value in values})
+
+        try:
+            min_value, max_value = min(values), max(values)
+        except TypeError:
+            return None, None, distinct
+
+        if not isinstance(min_value, (int, float, str)):
+            min_value, max_value = str(min_value), str(max_value)
+        return min_value, max_value, distinct
+
+
+class ColumnarResult:
+    """
+    Колоночный буфер результата запроса.
+
+    Строки принимаются страницами и раскладываются по типизированным
+    буферам колонок, без промежуточного списка списков на весь результат.
+    """
+
+    def __init__(self, columns: List[Tuple[str, str]], page_size: int = 4096):
+        self.buffers = [ColumnBuffer(name, type_name) for name, type_name in columns]
+        self._page_size = page_size
+
+    @classmethod
+    def from_description(cls, description, **kwargs) -> "ColumnarResult":
+        """
+        Создает буфер по cursor.description.
+
+        :param description: Описание колонок курсора DB-API
+        :return: Пустой колоночный буфер
+        """
+        return cls([(desc[0], desc[1]) for desc in description or []], **kwargs)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.buffers[0]) if self.buffers else 0
+
+    def append_page(self, rows: List[List[Any]]):
+        """
+        Добавляет страницу строк, транспонируя ее по колонкам.
+
+        :param rows: Строки результата
+        """
+        if not rows:
+            return
+        for buffer, values in zip(self.buffers, zip(*rows)):
+            buffer.extend(values)
+
+    def consume(self, rows: Iterable[List[Any]]) -> "ColumnarResult":
+        """
+        Вычитывает строки из итератора страницами по page_size.
+
+        :param rows: Итератор строк
+        :return: self
+        """
+        rows = iter(rows)
+        while True:
+            page = list(islice(rows, self._page_size))
+            if not page:
+                return self
+            self.append_page(page)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Возвращает статистику по всем колонкам.
+
+        Список идет в порядке колонок результата, поэтому колонки
+        с одинаковыми именами (SELECT a.id, b.id) не теряются.
+
+        :return: Имя колонки и ее статистика для каждой колонки
+        """
+        return [{"name": buffer.name, **buffer.stats()} for buffer in self.buffers]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Сериализует результат в колоночном виде.
+
+        :return: Имена и типы колонок и значения по колонкам в том же
+            порядке (колонки с одинаковыми именами сохраняются)
+        """
+        return {
+            "columns": [buffer.name for buffer in self.buffers],
+            "types": [buffer.type_name for buffer in self.buffers],
+            "data": [buffer.to_list() for buffer in self.buffers],
+        }
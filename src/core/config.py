@@ -1,4 +1,6 @@
+import json
 import os
+from typing import Any, Dict
 
 from dotenv import load_dotenv
 
@@ -7,6 +9,22 @@ if os.path.exists(".env.local"):
     load_dotenv(".env.local", override=True)
 
 
+def _load_clusters() -> Dict[str, Dict[str, Any]]:
+    """
+    Загружает именованные кластеры Trino из TRINO_CLUSTERS_FILE
+    или TRINO_CLUSTERS (JSON объект "имя -> настройки").
+
+    :return: Настройки кластеров по имени
+    """
+    path = os.getenv("TRINO_CLUSTERS_FILE")
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    raw = os.getenv("TRINO_CLUSTERS")
+    return json.loads(raw) if raw else {}
+
+
 class Config:
     """
     Конфигурация приложения
@@ -14,9 +32,103 @@ class Config:
 
     APP_NAME = os.getenv("APP_NAME", "SQL RecSys")
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 1.0))
+
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "otlp").lower()
+    TRACING_OTLP_ENDPOINT = os.getenv(
+        "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+    )
+    TRACING_FILE = os.getenv("TRACING_FILE", "./traces.jsonl")
+    TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", 1.0))
+    TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "trino-mcp")
 
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", 8005))
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 1))
+    # Задаются сервером для воркеров при SERVER_WORKERS > 1
+    CACHE_STORE_ADDRESS = os.getenv("CACHE_STORE_ADDRESS", "")
+    CACHE_STORE_AUTHKEY = os.getenv("CACHE_STORE_AUTHKEY", "")
+
+    CLUSTERS = _load_clusters()
+    CLUSTER_URL_CACHE_SIZE = int(os.getenv("CLUSTER_URL_CACHE_SIZE", 256))
+
+    CONNECTION_POOL_SIZE = int(os.getenv("CONNECTION_POOL_SIZE", 20))
+    CONNECTION_POOL_IDLE_PER_CLUSTER = int(
+        os.getenv("CONNECTION_POOL_IDLE_PER_CLUSTER", 4)
+    )
+    CONNECTION_TTL = int(os.getenv("CONNECTION_TTL", 3600))
+
+    ENDPOINT_FAILURE_COOLDOWN = float(os.getenv("ENDPOINT_FAILURE_COOLDOWN", 30))
+    ENDPOINT_LATENCY_EWMA_ALPHA = float(os.getenv("ENDPOINT_LATENCY_EWMA_ALPHA", 0.3))
+
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 4))
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 20))
+    HTTP_COMPRESSION = os.getenv("HTTP_COMPRESSION", "true").lower() == "true"
+    HTTP_TCP_KEEPALIVE = os.getenv("HTTP_TCP_KEEPALIVE", "true").lower() == "true"
+
+    SPOOLING_ENCODING = os.getenv("SPOOLING_ENCODING", "json+zstd,json+lz4,json")
+    SPOOLING_FETCH_WORKERS = int(os.getenv("SPOOLING_FETCH_WORKERS", 4))
+
+    QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", 1000))
+    COLUMNAR_MAX_ROWS = int(os.getenv("COLUMNAR_MAX_ROWS", 100000))
+    RESULT_MAX_BYTES = int(os.getenv("RESULT_MAX_BYTES", 0))
+    RESULT_MAX_CELL_BYTES = int(os.getenv("RESULT_MAX_CELL_BYTES", 0))
+
+    PREPARED_STATEMENTS_PER_CONNECTION = int(
+        os.getenv("PREPARED_STATEMENTS_PER_CONNECTION", 16)
+    )
+    PREPARED_STATEMENTS_MAX_BYTES = int(
+        os.getenv("PREPARED_STATEMENTS_MAX_BYTES", 6144)
+    )
+
+    EXPORT_DIR = os.getenv("EXPORT_DIR", "./exports")
+    EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", 50000))
+    EXPORT_MAX_ROWS = int(os.getenv("EXPORT_MAX_ROWS", 0))
+    EXPORT_TIMEOUT = float(os.getenv("EXPORT_TIMEOUT", 3600))
+    EXPORT_PARQUET_COMPRESSION = os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")
+
+    BATCH_MAX_STATEMENTS = int(os.getenv("BATCH_MAX_STATEMENTS", 50))
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 8))
+    BATCH_STATEMENT_TIMEOUT = float(os.getenv("BATCH_STATEMENT_TIMEOUT", 300))
+
+    QUERY_JOBS_MAX = int(os.getenv("QUERY_JOBS_MAX", 100))
+    QUERY_JOBS_MAX_RUNNING = int(os.getenv("QUERY_JOBS_MAX_RUNNING", 4))
+    QUERY_JOBS_RETENTION = float(os.getenv("QUERY_JOBS_RETENTION", 3600))
+    QUERY_JOBS_MAX_RESULT_BYTES = int(
+        os.getenv("QUERY_JOBS_MAX_RESULT_BYTES", 256 * 1024 * 1024)
+    )
+
+    WORKLOAD_HISTORY_ENABLED = (
+        os.getenv("WORKLOAD_HISTORY_ENABLED", "true").lower() == "true"
+    )
+    WORKLOAD_HISTORY_PATH = os.getenv(
+        "WORKLOAD_HISTORY_PATH", "./workload_history.sqlite3"
+    )
+    WORKLOAD_HISTORY_QUEUE_SIZE = int(os.getenv("WORKLOAD_HISTORY_QUEUE_SIZE", 10000))
+    WORKLOAD_HISTORY_RETENTION_DAYS = float(
+        os.getenv("WORKLOAD_HISTORY_RETENTION_DAYS", 30)
+    )
+
+    TABLE_STATS_CACHE_SIZE = int(os.getenv("TABLE_STATS_CACHE_SIZE", 1024))
+    TABLE_STATS_CACHE_TTL = int(os.getenv("TABLE_STATS_CACHE_TTL", 600))
+
+    VIEW_LINEAGE_CACHE_TTL = int(os.getenv("VIEW_LINEAGE_CACHE_TTL", 600))
+    VIEW_LINEAGE_FETCH_BATCH_SIZE = int(os.getenv("VIEW_LINEAGE_FETCH_BATCH_SIZE", 500))
+
+    GUARD_ENABLED = os.getenv("GUARD_ENABLED", "true").lower() == "true"
+    GUARD_MAX_SCAN_BYTES = float(os.getenv("GUARD_MAX_SCAN_BYTES", 100 * 1024**3))
+    GUARD_MAX_SCAN_ROWS = float(os.getenv("GUARD_MAX_SCAN_ROWS", 0))
+    GUARD_ACTION = os.getenv("GUARD_ACTION", "reject")
+    GUARD_CACHE_SIZE = int(os.getenv("GUARD_CACHE_SIZE", 1024))
+    GUARD_CACHE_TTL = int(os.getenv("GUARD_CACHE_TTL", 300))
+
+    DDL_ANALYSIS_CACHE_SIZE = int(os.getenv("DDL_ANALYSIS_CACHE_SIZE", 4096))
+    DDL_PARALLEL_THRESHOLD = int(os.getenv("DDL_PARALLEL_THRESHOLD", 0))
+    DDL_PARALLEL_CHUNK_SIZE = int(os.getenv("DDL_PARALLEL_CHUNK_SIZE", 500))
+    DDL_PARALLEL_WORKERS = int(os.getenv("DDL_PARALLEL_WORKERS", 0)) or None
 
 
 config = Config()
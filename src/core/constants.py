@@ -4,3 +4,8 @@ IDENTIFIER_PATTERN = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
 QUALIFIED_IDENTIFIER_PATTERN = re.compile(
     r"^[a-zA-Z_][a-zA-Z0-9_]*(\.[a-zA-Z_][a-zA-Z0-9_]*)*$"
 )
+
+# CA (проверка цепочки без проверки имени хоста) клиентом requests
+# не поддерживается
+SSL_VERIFICATION_MODES = ("FULL", "NONE")
+SPOOLING_ENCODINGS = ("json+zstd", "json+lz4", "json")
@@ -1,16 +1,66 @@
+import hashlib
+import multiprocessing
+import os
 import re
-from typing import Any, Dict, List, Optional, Set
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from threading import Lock
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+from src.core.config import config
 from src.core.enums.ddl import DDLType
 from src.core.logging import get_logger
+from src.core.utils.cache import TTLCache
 
 logger = get_logger(__name__)
 
 
 class DDLAnalyzer:
+    """
+    Анализатор DDL выражений.
 
-    def __init__(self):
-        self.ddl_patterns = {
+    Регулярные выражения компилируются при первом использовании,
+    чтобы импорт модуля не замедлял старт сервера.
+
+    Результаты анализа отдельных выражений кешируются по хешу текста
+    (LRU, cache_size записей), поэтому при повторной валидации набора,
+    в котором изменилось одно выражение, заново анализируется только оно.
+    Межвыраженческие проверки (граф зависимостей, конфликты имен)
+    пересчитываются для всего набора.
+
+    Если в наборе не меньше parallel_threshold выражений, которых нет
+    в кеше, они анализируются частями по chunk_size в пуле процессов.
+    Части собираются в исходном порядке, поэтому результат не зависит
+    от числа процессов.
+    """
+
+    CREATE_TYPES = (DDLType.CREATE_TABLE, DDLType.CREATE_VIEW, DDLType.CREATE_SCHEMA)
+
+    def __init__(
+        self,
+        cache_size: int = 4096,
+        parallel_threshold: int = 0,
+        chunk_size: int = 500,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        :param cache_size: Максимальное количество закешированных выражений
+        :param parallel_threshold: Минимальное число выражений для анализа
+            в пуле процессов (0 - всегда в текущем потоке)
+        :param chunk_size: Число выражений в одной задаче пула
+        :param max_workers: Размер пула (None - число ядер, при одном ядре
+            пул не используется)
+        """
+        self._statement_cache = TTLCache(maxsize=cache_size)
+        self._parallel_threshold = parallel_threshold
+        self._chunk_size = chunk_size
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = Lock()
+
+    @cached_property
+    def ddl_patterns(self) -> Dict[DDLType, re.Pattern]:
+        return {
             DDLType.CREATE_TABLE: re.compile(r"^\s*CREATE\s+TABLE\s+", re.IGNORECASE),
             DDLType.CREATE_VIEW: re.compile(r"^\s*CREATE\s+VIEW\s+", re.IGNORECASE),
             DDLType.CREATE_SCHEMA: re.compile(r"^\s*CREATE\s+SCHEMA\s+", re.IGNORECASE),
@@ -19,15 +69,57 @@ class DDLAnalyzer:
             DDLType.DROP_VIEW: re.compile(r"^\s*DROP\s+VIEW\s+", re.IGNORECASE),
         }
 
-        self.object_name_pattern = re.compile(
+    @cached_property
+    def object_name_pattern(self) -> re.Pattern:
+        return re.compile(
             r"(?:CREATE|ALTER|DROP)\s+(?:TABLE|VIEW|SCHEMA)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?([^\s\(]+)",
             re.IGNORECASE,
         )
 
-        self.column_pattern = re.compile(
-            r"\(\s*([^)]+)\s*\)", re.IGNORECASE | re.DOTALL
+    @cached_property
+    def column_definition_pattern(self) -> re.Pattern:
+        return re.compile(r'("(?:[^"]|"")*"|`[^`]*`|\S+)\s*(.*)$', re.DOTALL)
+
+    @cached_property
+    def dependency_patterns(self) -> List[re.Pattern]:
+        return [
+            re.compile(r"\bFROM\s+([^\s,\)]+)", re.IGNORECASE),
+            re.compile(r"\bJOIN\s+([^\s,\)]+)", re.IGNORECASE),
+        ]
+
+    @cached_property
+    def reference_noise_patterns(self) -> List[re.Pattern]:
+        return [
+            # строковые литералы и функции с FROM внутри скобок
+            re.compile(r"'(?:[^']|'')*'"),
+            re.compile(
+                r"\b(?:EXTRACT|SUBSTRING|TRIM|OVERLAY|POSITION)\s*\([^()]*\)",
+                re.IGNORECASE,
+            ),
+            re.compile(r"\bIS\s+(?:NOT\s+)?DISTINCT\s+FROM\b", re.IGNORECASE),
+        ]
+
+    @cached_property
+    def reference_name_pattern(self) -> re.Pattern:
+        identifier = r'(?:"(?:[^"]|"")*"|[A-Za-z_][\w$@]*)'
+        return re.compile(rf"{identifier}(?:\s*\.\s*{identifier})*")
+
+    @cached_property
+    def reference_keyword_pattern(self) -> re.Pattern:
+        return re.compile(r"\b(FROM|JOIN)\s+", re.IGNORECASE)
+
+    @cached_property
+    def from_list_end_pattern(self) -> re.Pattern:
+        return re.compile(
+            r"(?:WHERE|GROUP|ORDER|HAVING|LIMIT|OFFSET|FETCH|UNION|EXCEPT|INTERSECT"
+            r"|WINDOW|JOIN|INNER|LEFT|RIGHT|FULL|CROSS|NATURAL|ON|USING)\b",
+            re.IGNORECASE,
         )
 
+    @cached_property
+    def cte_pattern(self) -> re.Pattern:
+        return re.compile(r"(?:\bWITH|,)\s+([A-Za-z_]\w*)\s+AS\s*\(", re.IGNORECASE)
+
     def identify_ddl_type(self, ddl: str) -> DDLType:
         """
         Определяет тип DDL выражения.
@@ -65,10 +157,7 @@ class DDLAnalyzer:
         dependencies = set()
 
         if self.identify_ddl_type(ddl) == DDLType.CREATE_VIEW:
-            from_pattern = re.compile(r"\bFROM\s+([^\s,\)]+)", re.IGNORECASE)
-            join_pattern = re.compile(r"\bJOIN\s+([^\s,\)]+)", re.IGNORECASE)
-
-            for pattern in [from_pattern, join_pattern]:
+            for pattern in self.dependency_patterns:
                 matches = pattern.findall(ddl)
                 for match in matches:
                     table_name = match.strip('`"')
@@ -82,6 +171,89 @@ class DDLAnalyzer:
 
         return dependencies
 
+    def extract_query_references(self, sql: str) -> Set[str]:
+        """
+        Извлекает имена таблиц и представлений, которые читает запрос
+        (например, текст представления из information_schema.views).
+
+        В отличие от extract_dependencies не требует CREATE VIEW,
+        разбирает список FROM через запятую до следующего предложения
+        (WHERE, GROUP BY, JOIN и т.п.), учитывает идентификаторы в кавычках
+        и пропускает подзапросы, UNNEST, имена CTE и FROM внутри литералов
+        и функций EXTRACT/SUBSTRING/TRIM.
+
+        :param sql: Текст запроса
+        :return: Множество имен в том виде, в каком они записаны в запросе
+        """
+        for pattern in self.reference_noise_patterns:
+            sql = pattern.sub(" ", sql)
+        ctes = {name.lower() for name in self.cte_pattern.findall(sql)}
+
+        items = []
+        for match in self.reference_keyword_pattern.finditer(sql):
+            if match.group(1).upper() == "JOIN":
+                items.append(sql[match.end() :])
+            else:
+                items.extend(self._from_list_items(sql, match.end()))
+
+        references = set()
+        for item in items:
+            item = item.strip()
+            match = self.reference_name_pattern.match(item)
+            if not match or item[match.end() :].lstrip().startswith("("):
+                # Подзапрос или табличная функция (UNNEST, TABLE(...))
+                continue
+            name = match.group(0)
+            if name.upper() in ("LATERAL", "UNNEST", "TABLE", "SELECT", "VALUES"):
+                continue
+            if "." not in name and name.strip('"').lower() in ctes:
+                continue
+            references.add(name)
+        return references
+
+    def _from_list_items(self, sql: str, start: int) -> List[str]:
+        """
+        Разбивает список FROM на элементы по запятым верхнего уровня.
+
+        Список заканчивается на закрывающей скобке подзапроса, ';' или
+        ключевом слове следующего предложения.
+
+        :param sql: Текст запроса без литералов
+        :param start: Позиция начала списка
+        :return: Тексты элементов списка
+        """
+        items = []
+        depth = 0
+        item_start = position = start
+        while position < len(sql):
+            char = sql[position]
+            if char == '"':
+                end = sql.find('"', position + 1)
+                position = len(sql) if end < 0 else end + 1
+                continue
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                if not depth:
+                    break
+                depth -= 1
+            elif depth == 0 and char == ";":
+                break
+            elif depth == 0 and char == ",":
+                items.append(sql[item_start:position])
+                item_start = position + 1
+            elif char.isalpha() or char == "_":
+                if depth == 0 and self.from_list_end_pattern.match(sql, position):
+                    break
+                while position < len(sql) and (
+                    sql[position].isalnum() or sql[position] in "_$@"
+                ):
+                    position += 1
+                continue
+            position += 1
+        items.append(sql[item_start:position])
+        return items
+
     def extract_columns_from_create_table(self, ddl: str) -> List[Dict[str, Any]]:
         """
         Извлекает информацию о колонках из CREATE TABLE.
@@ -92,11 +264,9 @@ class DDLAnalyzer:
         if self.identify_ddl_type(ddl) != DDLType.CREATE_TABLE:
             return []
 
-        match = self.column_pattern.search(ddl)
-        if not match:
+        columns_text = self._column_list(ddl)
+        if columns_text is None:
             return []
-
-        columns_text = match.group(1)
         columns = []
 
         current_column = ""
@@ -122,6 +292,63 @@ class DDLAnalyzer:
 
         return columns
 
+    def _column_list(self, ddl: str) -> Optional[str]:
+        """
+        Возвращает текст списка колонок CREATE TABLE между скобками
+        с учетом вложенных скобок типов (varchar(10), decimal(12, 2),
+        row(...)), строковых литералов и идентификаторов в кавычках.
+
+        :param ddl: CREATE TABLE выражение
+        :return: Текст списка колонок или None (например, для CREATE TABLE AS)
+        """
+        match = self.object_name_pattern.search(ddl)
+        if not match:
+            return None
+        start = match.end()
+        while start < len(ddl) and ddl[start].isspace():
+            start += 1
+        if start >= len(ddl) or ddl[start] != "(":
+            return None
+
+        depth = 0
+        position = start
+        while position < len(ddl):
+            char = ddl[position]
+            if char in "'\"":
+                end = ddl.find(char, position + 1)
+                if end < 0:
+                    return None
+                position = end + 1
+                continue
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+                if not depth:
+                    return ddl[start + 1 : position]
+            position += 1
+        return None
+
+    @staticmethod
+    def _split_column_type(text: str) -> Tuple[str, str]:
+        """
+        Отделяет тип колонки от ограничений и свойств
+        (NOT NULL, COMMENT, WITH, DEFAULT): пробелы внутри скобок типа
+        (decimal(12, 2), row(x int)) тип не разрывают.
+
+        :param text: Определение колонки после имени
+        :return: Тип и остаток определения
+        """
+        depth = 0
+        for position, char in enumerate(text):
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif char.isspace() and depth == 0:
+                return text[:position], text[position:].strip()
+        return text, ""
+
     def _parse_column_definition(self, column_def: str) -> Dict[str, Any]:
         """
         Парсит определение отдельной колонки.
@@ -129,8 +356,8 @@ class DDLAnalyzer:
         :param column_def: Определение колонки
         :return: Словарь с информацией о колонке
         """
-        parts = column_def.strip().split()
-        if len(parts) < 2:
+        match = self.column_definition_pattern.match(column_def.strip())
+        if not match or not match.group(2):
             return {
                 "name": column_def,
                 "type": "UNKNOWN",
@@ -138,12 +365,12 @@ class DDLAnalyzer:
                 "constraints": [],
             }
 
-        name = parts[0].strip('`"')
-        type_part = parts[1]
+        name = match.group(1).strip('`"')
+        type_part, remaining = self._split_column_type(match.group(2))
 
-        size_match = re.match(r"([^(]+)\(([^)]+)\)", type_part)
+        size_match = re.match(r"([^(]+)\((.*)\)$", type_part, re.DOTALL)
         if size_match:
-            data_type = size_match.group(1)
+            data_type = size_match.group(1).strip()
             size = size_match.group(2)
         else:
             data_type = type_part
@@ -152,7 +379,7 @@ class DDLAnalyzer:
         constraints = []
         nullable = True
 
-        remaining = " ".join(parts[2:]).upper()
+        remaining = remaining.upper()
         if "NOT NULL" in remaining:
             nullable = False
             constraints.append("NOT NULL")
@@ -172,6 +399,94 @@ class DDLAnalyzer:
             "constraints": constraints,
         }
 
+    def analyze_statement(self, ddl: str) -> Dict[str, Any]:
+        """
+        Анализирует одно DDL выражение с кешированием по хешу текста.
+
+        Результат общий для всех вызовов с тем же текстом и не должен
+        изменяться вызывающим кодом.
+
+        :param ddl: DDL выражение
+        :return: Тип, имя объекта, зависимости, колонки и проблемы выражения
+        """
+        key = hashlib.sha256(ddl.encode()).hexdigest()
+        analysis = self._statement_cache.get(key)
+        if analysis is None:
+            analysis = self._analyze(ddl)
+            self._statement_cache.set(key, analysis)
+        return analysis
+
+    def _analyze(self, ddl: str) -> Dict[str, Any]:
+        """Анализирует одно DDL выражение без кеша."""
+        ddl_type = self.identify_ddl_type(ddl)
+        object_name = self.extract_object_name(ddl)
+        analysis = {
+            "type": ddl_type,
+            "name": object_name,
+            "dependencies": sorted(self.extract_dependencies(ddl)),
+            "ddl_preview": ddl[:100] + "..." if len(ddl) > 100 else ddl,
+            "issues": [],
+        }
+        if ddl_type == DDLType.CREATE_TABLE:
+            analysis["columns"] = self.extract_columns_from_create_table(ddl)
+        self._check_ddl_issues(ddl, ddl_type, object_name, analysis["issues"], None)
+        return analysis
+
+    def analyze_statements(self, ddl_list: List[str]) -> List[Dict[str, Any]]:
+        """
+        Анализирует выражения набора, большие наборы - в пуле процессов.
+
+        :param ddl_list: Непустые DDL выражения
+        :return: Результаты analyze_statement в порядке ddl_list
+        """
+        keys = [hashlib.sha256(ddl.encode()).hexdigest() for ddl in ddl_list]
+        analyses = {key: self._statement_cache.get(key) for key in keys}
+        missing = {
+            key: ddl for key, ddl in zip(keys, ddl_list) if analyses[key] is None
+        }
+
+        if (
+            self._parallel_threshold
+            and self._max_workers > 1
+            and len(missing) >= self._parallel_threshold
+        ):
+            statements = list(missing.values())
+            chunks = [
+                statements[i : i + self._chunk_size]
+                for i in range(0, len(statements), self._chunk_size)
+            ]
+            logger.info(
+                "Analyzing %s DDL statements in %s chunks", len(statements), len(chunks)
+            )
+            # map возвращает части в порядке отправки
+            results = [
+                analysis
+                for chunk in self._get_pool().map(_analyze_chunk, chunks)
+                for analysis in chunk
+            ]
+        else:
+            results = [self._analyze(ddl) for ddl in missing.values()]
+
+        for key, analysis in zip(missing, results):
+            analyses[key] = analysis
+            self._statement_cache.set(key, analysis)
+        return [analyses[key] for key in keys]
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Создает пул процессов при первом большом наборе.
+
+        Используется spawn: сервер многопоточный, и fork копировал бы
+        состояние блокировок других потоков.
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
     def analyze_ddl_list(self, ddl_list: List[str]) -> Dict[str, Any]:
         """
         Анализирует список DDL выражений.
@@ -190,49 +505,98 @@ class DDLAnalyzer:
         for ddl_type in DDLType:
             results["by_type"][ddl_type.value] = 0
 
-        for i, ddl in enumerate(ddl_list):
-            if not ddl or not ddl.strip():
-                continue
+        indexed = [(i, ddl) for i, ddl in enumerate(ddl_list) if ddl and ddl.strip()]
+        analyses = self.analyze_statements([ddl for _, ddl in indexed])
 
-            ddl_type = self.identify_ddl_type(ddl)
+        for (i, _), analysis in zip(indexed, analyses):
+            ddl_type = analysis["type"]
+            object_name = analysis["name"]
             results["by_type"][ddl_type.value] += 1
 
-            object_name = self.extract_object_name(ddl)
-            dependencies = self.extract_dependencies(ddl)
-
             obj_info = {
                 "index": i,
                 "type": ddl_type.value,
                 "name": object_name,
-                "dependencies": list(dependencies),
-                "ddl_preview": ddl[:100] + "..." if len(ddl) > 100 else ddl,
+                "dependencies": list(analysis["dependencies"]),
+                "ddl_preview": analysis["ddl_preview"],
             }
 
             if ddl_type == DDLType.CREATE_TABLE:
-                columns = self.extract_columns_from_create_table(ddl)
-                obj_info["columns"] = columns
-                obj_info["column_count"] = len(columns)
+                obj_info["columns"] = analysis["columns"]
+                obj_info["column_count"] = len(analysis["columns"])
 
             results["objects"].append(obj_info)
 
-            if dependencies:
+            if analysis["dependencies"]:
                 results["dependencies"][object_name or f"statement_{i}"] = list(
-                    dependencies
+                    analysis["dependencies"]
                 )
 
-            self._check_ddl_issues(
-                ddl, ddl_type, object_name, results["potential_issues"], i
+            results["potential_issues"].extend(
+                {**issue, "statement_index": i} for issue in analysis["issues"]
             )
 
+        self._check_cross_statement_issues(
+            results["objects"], results["potential_issues"]
+        )
+
         return results
 
+    def _check_cross_statement_issues(
+        self, objects: List[Dict[str, Any]], issues: List[Dict]
+    ):
+        """
+        Проверяет связи между выражениями набора: повторное создание
+        объекта и ссылки представлений на объекты, создаваемые позже.
+        Обе проблемы - предупреждения: они не блокируют выполнение набора.
+
+        :param objects: Объекты набора в порядке выражений
+        :param issues: Список для добавления найденных проблем
+        """
+        create_types = {ddl_type.value for ddl_type in self.CREATE_TYPES}
+        created: Dict[str, int] = {}
+        for obj in objects:
+            if obj["type"] in create_types and obj["name"]:
+                name = obj["name"].lower()
+                if name in created:
+                    issues.append(
+                        {
+                            "type": "duplicate_object",
+                            "severity": "warning",
+                            "message": f"Объект уже создается выражением {created[name]}",
+                            "object": obj["name"],
+                            "statement_index": obj["index"],
+                        }
+                    )
+                else:
+                    created[name] = obj["index"]
+
+        for obj in objects:
+            for dependency in obj["dependencies"]:
+                created_at = created.get(dependency.lower())
+                if created_at is not None and created_at > obj["index"]:
+                    issues.append(
+                        {
+                            "type": "dependency_order",
+                            "severity": "warning",
+                            "message": f"Зависимость {dependency} создается позже, "
+                            f"выражением {created_at}",
+                            "object": obj["name"],
+                            "statement_index": obj["index"],
+                        }
+                    )
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику кеша анализа выражений."""
+        return self._statement_cache.stats()
+
     def _check_ddl_issues(
         self,
         ddl: str,
         ddl_type: DDLType,
         object_name: Optional[str],
         issues: List[Dict],
-        index: int,
+        index: Optional[int],
     ):
         """
         Проверяет DDL на потенциальные проблемы.
@@ -295,4 +659,15 @@ class DDLAnalyzer:
                 )
 
 
-ddl_analyzer = DDLAnalyzer()
+def _analyze_chunk(ddl_list: List[str]) -> List[Dict[str, Any]]:
+    """Анализирует часть набора в процессе пула."""
+    return [_worker_analyzer._analyze(ddl) for ddl in ddl_list]
+
+
+ddl_analyzer = DDLAnalyzer(
+    cache_size=config.DDL_ANALYSIS_CACHE_SIZE,
+    parallel_threshold=config.DDL_PARALLEL_THRESHOLD,
+    chunk_size=config.DDL_PARALLEL_CHUNK_SIZE,
+    max_workers=config.DDL_PARALLEL_WORKERS,
+)
+_worker_analyzer = DDLAnalyzer(cache_size=0)
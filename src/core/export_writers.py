@@ -0,0 +1,170 @@
+import csv
+import gzip
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.core.columnar import raw_type
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow опционален
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = ("csv", "parquet")
+CSV_COMPRESSIONS = (None, "gzip")
+PARQUET_COMPRESSIONS = (None, "snappy", "gzip", "zstd", "lz4", "brotli")
+
+
+def parquet_available() -> bool:
+    """Проверяет, установлен ли pyarrow для записи Parquet."""
+    return pa is not None
+
+
+def _to_text(value: Any) -> Any:
+    """Сериализует составные значения (ARRAY/MAP/ROW) в JSON."""
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, default=str, ensure_ascii=False)
+    return value
+
+
+class CsvExportWriter:
+    """
+    Запись результата в CSV пачками строк.
+
+    NULL записывается пустым значением, составные типы - в JSON.
+    """
+
+    def __init__(
+        self, path: str, description: Sequence[Any], compression: Optional[str]
+    ):
+        if compression not in CSV_COMPRESSIONS:
+            raise ValueError(f"неподдерживаемое сжатие CSV: {compression}.")
+        self._file = (
+            gzip.open(path, "wt", encoding="utf-8", newline="")
+            if compression == "gzip"
+            else open(path, "w", encoding="utf-8", newline="")
+        )
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([desc[0] for desc in description])
+        self.schema = [
+            {"name": desc[0], "type": desc[1], "export_type": "text"}
+            for desc in description
+        ]
+
+    def write_batch(self, rows: List[Sequence[Any]]):
+        self._writer.writerows([_to_text(value) for value in row] for row in rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetExportWriter:
+    """
+    Запись результата в Parquet: каждая пачка строк - отдельная row group.
+
+    Типы колонок выводятся из типов Trino, составные типы и типы без
+    прямого соответствия записываются строками (составные - в JSON).
+    """
+
+    def __init__(
+        self, path: str, description: Sequence[Any], compression: Optional[str]
+    ):
+        if pa is None:
+            raise ValueError(
+                "для экспорта в Parquet установите пакет pyarrow "
+                '(pip install ".[parquet]") или используйте format=csv.'
+            )
+        if compression not in PARQUET_COMPRESSIONS:
+            raise ValueError(f"неподдерживаемое сжатие Parquet: {compression}.")
+
+        self._names = [desc[0] for desc in description]
+        fields = [pa.field(desc[0], self._arrow_type(desc[1])) for desc in description]
+        self._arrow_schema = pa.schema(fields)
+        self._text_columns = [
+            i for i, field in enumerate(fields) if pa.types.is_string(field.type)
+        ]
+        self._writer = pq.ParquetWriter(
+            path, self._arrow_schema, compression=compression or "none"
+        )
+        self.schema = [
+            {"name": desc[0], "type": desc[1], "export_type": str(field.type)}
+            for desc, field in zip(description, fields)
+        ]
+
+    @staticmethod
+    def _arrow_type(type_name: str):
+        """
+        Сопоставляет тип Trino типу Arrow.
+
+        :param type_name: Тип колонки Trino
+        :return: Тип Arrow
+        """
+        base_type = raw_type(type_name)
+        simple = {
+            "tinyint": pa.int8(),
+            "smallint": pa.int16(),
+            "integer": pa.int32(),
+            "bigint": pa.int64(),
+            "real": pa.float32(),
+            "double": pa.float64(),
+            "boolean": pa.bool_(),
+            "date": pa.date32(),
+            "varbinary": pa.binary(),
+        }
+        if base_type in simple:
+            return simple[base_type]
+        if base_type == "timestamp":
+            if "with time zone" in type_name.lower():
+                return pa.timestamp("us", tz="UTC")
+            return pa.timestamp("us")
+        if base_type == "decimal" and "(" in type_name:
+            precision, scale = (
+                int(part) for part in type_name.split("(", 1)[1].rstrip(")").split(",")
+            )
+            return pa.decimal128(precision, scale)
+        return pa.string()
+
+    def write_batch(self, rows: List[Sequence[Any]]):
+        columns: Dict[int, List[Any]] = {i: [] for i in range(len(self._names))}
+        for row in rows:
+            for i, value in enumerate(row):
+                columns[i].append(value)
+        for i in self._text_columns:
+            columns[i] = [
+                None if value is None else str(_to_text(value)) for value in columns[i]
+            ]
+        table = pa.Table.from_arrays(
+            [
+                pa.array(columns[i], type=field.type)
+                for i, field in enumerate(self._arrow_schema)
+            ],
+            schema=self._arrow_schema,
+        )
+        self._writer.write_table(table)
+
+    def close(self):
+        self._writer.close()
+
+
+def open_export_writer(
+    path: str,
+    export_format: str,
+    description: Sequence[Any],
+    compression: Optional[str] = None,
+):
+    """
+    Открывает файл экспорта.
+
+    :param path: Путь к файлу
+    :param export_format: csv или parquet
+    :param description: cursor.description результата
+    :param compression: Сжатие (csv: gzip; parquet: snappy, gzip, zstd, lz4, brotli)
+    :return: Writer с методами write_batch и close и атрибутом schema
+    """
+    if export_format == "csv":
+        return CsvExportWriter(path, description, compression)
+    if export_format == "parquet":
+        return ParquetExportWriter(path, description, compression)
+    raise ValueError(f"неподдерживаемый формат экспорта: {export_format}.")
@@ -0,0 +1,143 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.columnar import FLOAT_TYPES, INT_TYPES, raw_type
+
+NUMERIC_TYPES = INT_TYPES | FLOAT_TYPES | {"decimal"}
+ORDERABLE_TYPES = NUMERIC_TYPES | {
+    "varchar",
+    "char",
+    "date",
+    "time",
+    "timestamp",
+    "boolean",
+}
+NOT_DISTINCT_TYPES = {"map", "json", "hyperloglog", "qdigest", "tdigest"}
+PERCENTILES = (0.25, 0.5, 0.75)
+
+
+def _top_k_expression(column: str, base_type: str) -> Optional[str]:
+    """
+    Возвращает аргумент approx_most_frequent для колонки.
+
+    approx_most_frequent поддерживает только bigint и varchar, поэтому
+    целые приводятся к bigint, даты и boolean - к varchar.
+
+    :param column: Экранированное имя колонки
+    :param base_type: Базовый тип колонки
+    :return: Выражение или None, если top-k для типа не считается
+    """
+    if base_type in ("varchar", "char"):
+        return f"CAST({column} AS varchar)" if base_type == "char" else column
+    if base_type in INT_TYPES:
+        return f"CAST({column} AS bigint)"
+    if base_type in ("date", "boolean"):
+        return f"CAST({column} AS varchar)"
+    return None
+
+
+def build_profile_query(
+    table_path: str,
+    columns: List[Tuple[str, str]],
+    sample_percent: Optional[float] = None,
+    top_k: int = 5,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Строит один агрегирующий запрос профиля таблицы.
+
+    Имена таблицы и колонок должны быть провалидированы заранее.
+
+    :param table_path: Полное имя таблицы
+    :param columns: Список (имя колонки, тип)
+    :param sample_percent: Процент строк для TABLESAMPLE BERNOULLI
+    :param top_k: Количество самых частых значений
+    :return: SQL запрос и план разбора результата по колонкам
+    """
+    select_items = ["count(*) AS row_count"]
+    plan = []
+
+    for i, (name, type_name) in enumerate(columns):
+        column = f'"{name}"'
+        base_type = raw_type(type_name)
+        entry = {"name": name, "type": type_name, "aliases": {}}
+
+        def add(metric: str, expression: str):
+            alias = f"c{i}_{metric}"
+            select_items.append(f"{expression} AS {alias}")
+            entry["aliases"][metric] = alias
+
+        add("non_null", f"count({column})")
+        if base_type not in NOT_DISTINCT_TYPES:
+            add("distinct", f"approx_distinct({column})")
+        if base_type in ORDERABLE_TYPES:
+            add("min", f"min({column})")
+            add("max", f"max({column})")
+        if base_type in NUMERIC_TYPES:
+            percentiles = ", ".join(str(p) for p in PERCENTILES)
+            add(
+                "percentiles",
+                f"approx_percentile(CAST({column} AS double), ARRAY[{percentiles}])",
+            )
+
+        top_k_expression = _top_k_expression(column, base_type)
+        if top_k > 0 and top_k_expression:
+            capacity = max(top_k * 10, 100)
+            add(
+                "top_values",
+                f"approx_most_frequent({top_k}, {top_k_expression}, {capacity})",
+            )
+
+        plan.append(entry)
+
+    sample = f" TABLESAMPLE BERNOULLI ({sample_percent})" if sample_percent else ""
+    sql = f"SELECT {', '.join(select_items)} FROM {table_path}{sample}"
+    return sql, plan
+
+
+def parse_profile_row(
+    row: List[Any], aliases: List[str], plan: List[Dict[str, Any]]
+) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+    """
+    Разбирает строку результата запроса профиля.
+
+    :param row: Единственная строка результата
+    :param aliases: Имена колонок результата
+    :param plan: План разбора из build_profile_query
+    :return: Количество строк и профиль по колонкам
+    """
+    values = dict(zip(aliases, row))
+    row_count = values["row_count"] or 0
+    profile = {}
+
+    for entry in plan:
+        metrics = {
+            metric: values.get(alias) for metric, alias in entry["aliases"].items()
+        }
+        non_null = metrics.pop("non_null") or 0
+        column_profile = {
+            "type": entry["type"],
+            "null_fraction": (
+                round(1 - non_null / row_count, 6) if row_count else None
+            ),
+        }
+
+        if "distinct" in metrics:
+            column_profile["distinct_estimate"] = metrics["distinct"]
+        if "min" in metrics:
+            column_profile["min"] = metrics["min"]
+            column_profile["max"] = metrics["max"]
+        if metrics.get("percentiles"):
+            column_profile["percentiles"] = {
+                f"p{int(p * 100)}": value
+                for p, value in zip(PERCENTILES, metrics["percentiles"])
+            }
+        if metrics.get("top_values"):
+            column_profile["top_values"] = [
+                {"value": value, "count": count}
+                for value, count in sorted(
+                    metrics["top_values"].items(), key=lambda item: -item[1]
+                )
+            ]
+
+        profile[entry["name"]] = column_profile
+
+    return row_count, profile
@@ -0,0 +1,168 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+TRUNCATION_MARKER = "...[truncated {size} bytes]"
+
+
+def value_size(value: Any) -> int:
+    """
+    Размер значения в ответе инструмента: ответ сериализуется через str(),
+    поэтому считается длина repr в байтах UTF-8.
+
+    :param value: Значение ячейки или строка результата
+    :return: Размер в байтах
+    """
+    return len(repr(value).encode("utf-8"))
+
+
+class ResultBudget:
+    """
+    Ограничение размера результата запроса в байтах.
+
+    Строки читаются потоком и добавляются, пока суммарный размер не
+    превысит max_bytes. Ячейки больше max_cell_bytes (длинные VARCHAR,
+    JSON, ARRAY/MAP/ROW) заменяются усеченной строкой с маркером,
+    колонки из exclude_columns не возвращаются. В отчете указано,
+    что именно было отброшено.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 0,
+        max_cell_bytes: int = 0,
+        exclude_columns: Optional[Iterable[str]] = None,
+    ):
+        """
+        :param max_bytes: Максимальный размер строк результата (0 - без ограничения)
+        :param max_cell_bytes: Максимальный размер ячейки (0 - без ограничения)
+        :param exclude_columns: Имена колонок, которые не нужно возвращать
+        """
+        self.max_bytes = max_bytes
+        self.max_cell_bytes = max_cell_bytes
+        self.exclude_columns = [name.lower() for name in exclude_columns or []]
+
+        self.used_bytes = 0
+        self.stopped = False
+        self.truncated_cells: Dict[str, Dict[str, int]] = {}
+        self.excluded: List[str] = []
+        self.unknown_excluded: List[str] = []
+        self._keep: Optional[List[int]] = None
+        self._columns: List[str] = []
+
+    def project(self, description: Optional[Sequence[Any]]) -> List[Any]:
+        """
+        Убирает исключенные колонки из описания результата.
+
+        :param description: cursor.description
+        :return: Описание оставшихся колонок
+        """
+        description = list(description or [])
+        names = [desc[0].lower() for desc in description]
+        self.excluded = [
+            desc[0] for desc in description if desc[0].lower() in self.exclude_columns
+        ]
+        self.unknown_excluded = [
+            name for name in self.exclude_columns if name not in names
+        ]
+        self._keep = [
+            i for i, name in enumerate(names) if name not in self.exclude_columns
+        ]
+        kept = [description[i] for i in self._keep]
+        self._columns = [desc[0] for desc in kept]
+        return kept
+
+    def project_rows(self, rows: Iterable[Sequence[Any]]) -> Iterable[List[Any]]:
+        """
+        Убирает исключенные колонки из строк.
+
+        :param rows: Строки результата
+        :yields: Строки только с оставшимися колонками
+        """
+        if not self.excluded:
+            yield from rows
+            return
+        keep = self._keep
+        for row in rows:
+            yield [row[i] for i in keep]
+
+    def consume(self, rows: Iterable[Sequence[Any]]) -> Tuple[List[List[Any]], bool]:
+        """
+        Набирает строки, пока они помещаются в бюджет.
+
+        :param rows: Строки результата (после project_rows)
+        :return: Принятые строки и признак, что в результате остались
+            строки, не вошедшие в бюджет
+        """
+        accepted = []
+        for row in rows:
+            row, truncated = self._truncate_cells(row)
+            size = value_size(row) + 2  # разделитель ", " в списке строк
+            if self.max_bytes and self.used_bytes + size > self.max_bytes:
+                self.stopped = True
+                return accepted, True
+            self.used_bytes += size
+            accepted.append(row)
+            for column, original_size in truncated:
+                stats = self.truncated_cells.setdefault(
+                    column, {"cells": 0, "max_original_bytes": 0}
+                )
+                stats["cells"] += 1
+                stats["max_original_bytes"] = max(
+                    stats["max_original_bytes"], original_size
+                )
+        return accepted, False
+
+    def _truncate_cells(
+        self, row: Sequence[Any]
+    ) -> Tuple[List[Any], List[Tuple[str, int]]]:
+        """
+        Заменяет слишком большие ячейки усеченной строкой с маркером.
+
+        Усекаются только строки, бинарные значения и составные типы
+        (ARRAY/MAP/ROW), размер скалярных значений ограничен их типом.
+
+        :param row: Строка результата
+        :return: Строка и список (колонка, исходный размер) усеченных ячеек
+        """
+        if not self.max_cell_bytes:
+            return list(row), []
+
+        result = []
+        truncated = []
+        for i, value in enumerate(row):
+            if not isinstance(value, (str, bytes, list, tuple, dict)):
+                result.append(value)
+                continue
+
+            text = value if isinstance(value, str) else repr(value)
+            encoded = text.encode("utf-8")
+            if len(encoded) <= self.max_cell_bytes:
+                result.append(value)
+                continue
+
+            prefix = encoded[: self.max_cell_bytes].decode("utf-8", errors="ignore")
+            result.append(prefix + TRUNCATION_MARKER.format(size=len(encoded)))
+            column = self._columns[i] if i < len(self._columns) else str(i)
+            truncated.append((column, len(encoded)))
+        return result, truncated
+
+    def report(self, include_limits: bool = True) -> Dict[str, Any]:
+        """
+        Возвращает отчет о том, что было отброшено.
+
+        :param include_limits: Включить лимиты размера (только для результатов,
+            к которым они применялись)
+        :return: Лимиты, использованный объем, усеченные ячейки по колонкам
+            и исключенные колонки
+        """
+        report: Dict[str, Any] = {"excluded_columns": self.excluded}
+        if include_limits:
+            report.update(
+                max_bytes=self.max_bytes or None,
+                max_cell_bytes=self.max_cell_bytes or None,
+                used_bytes=self.used_bytes,
+                stopped_by_budget=self.stopped,
+                truncated_cells=self.truncated_cells,
+            )
+        if self.unknown_excluded:
+            report["unknown_excluded_columns"] = self.unknown_excluded
+        return report
@@ -0,0 +1,245 @@
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.core.utils.sql import format_literal
+from src.core.utils.validate import validate_identifier
+
+Column = Tuple[str, str, bool]
+
+
+def quote_identifier(name: str) -> str:
+    """
+    Экранирует имя объекта для DDL, если оно не простой идентификатор.
+
+    :param name: Имя из information_schema
+    :return: Имя для подстановки в SQL
+    """
+    if validate_identifier(name):
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def build_schema_query(
+    catalog: str, schema: str, tables: Optional[Sequence[str]] = None
+) -> str:
+    """
+    Строит запрос метаданных всех таблиц схемы: типы объектов из
+    information_schema.tables и колонки из information_schema.columns
+    через UNION ALL, чтобы схема читалась одним запросом.
+
+    Имя каталога должно быть провалидировано заранее.
+
+    :param catalog: Каталог
+    :param schema: Схема
+    :param tables: Только эти таблицы (по умолчанию все)
+    :return: SQL запрос
+    """
+    condition = f"table_schema = {format_literal(schema)}"
+    if tables:
+        table_list = ", ".join(format_literal(name) for name in sorted(set(tables)))
+        condition += f" AND table_name IN ({table_list})"
+    return (
+        "SELECT 'table', table_name, table_type, NULL, NULL, NULL "
+        f"FROM {catalog}.information_schema.tables WHERE {condition} "
+        "UNION ALL SELECT 'column', table_name, column_name, data_type, "
+        "is_nullable, ordinal_position "
+        f"FROM {catalog}.information_schema.columns WHERE {condition}"
+    )
+
+
+def parse_schema_rows(rows: List[List[Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Собирает описание таблиц из строк build_schema_query.
+
+    Для каждой таблицы считается хеш списка колонок (имя, тип,
+    nullable в порядке ordinal_position): таблицы с равными хешами
+    при сравнении не разбираются по колонкам.
+
+    :param rows: Строки результата запроса
+    :return: {таблица: {"type", "columns": [(имя, тип, nullable)], "hash"}}
+    """
+    tables: Dict[str, Dict[str, Any]] = {}
+    positioned: Dict[str, List[Tuple[int, Column]]] = {}
+    for kind, table, name, data_type, is_nullable, position in rows:
+        if kind == "table":
+            tables.setdefault(table, {})["type"] = name
+        else:
+            column = (name, data_type, is_nullable != "NO")
+            positioned.setdefault(table, []).append((int(position or 0), column))
+
+    for table, columns in positioned.items():
+        info = tables.setdefault(table, {})
+        info.setdefault("type", "BASE TABLE")
+        info["columns"] = [column for _, column in sorted(columns)]
+
+    for info in tables.values():
+        info.setdefault("columns", [])
+        digest = hashlib.sha256()
+        for name, data_type, nullable in info["columns"]:
+            digest.update(f"{name}\0{data_type}\0{nullable:d}\n".encode())
+        info["hash"] = digest.hexdigest()[:16]
+    return tables
+
+
+def diff_tables(
+    source: Dict[str, Dict[str, Any]], target: Dict[str, Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Сравнивает описания двух схем.
+
+    Изменения считаются от target к source: added - есть только
+    в source, removed - есть только в target.
+
+    :param source: Результат parse_schema_rows эталонной схемы
+    :param target: Результат parse_schema_rows сравниваемой схемы
+    :return: Добавленные, удаленные и измененные таблицы
+    """
+    added = sorted(set(source) - set(target))
+    removed = sorted(set(target) - set(source))
+    changed = []
+    unchanged = 0
+
+    for table in sorted(set(source) & set(target)):
+        left, right = source[table], target[table]
+        if left["hash"] == right["hash"] and left["type"] == right["type"]:
+            unchanged += 1
+            continue
+
+        left_columns = {name: (t, n) for name, t, n in left["columns"]}
+        right_columns = {name: (t, n) for name, t, n in right["columns"]}
+        change: Dict[str, Any] = {"name": table}
+        if left["type"] != right["type"]:
+            change["source_type"] = left["type"]
+            change["target_type"] = right["type"]
+
+        change["added_columns"] = [
+            {"name": name, "type": data_type, "nullable": nullable}
+            for name, data_type, nullable in left["columns"]
+            if name not in right_columns
+        ]
+        change["removed_columns"] = [
+            {"name": name, "type": data_type, "nullable": nullable}
+            for name, data_type, nullable in right["columns"]
+            if name not in left_columns
+        ]
+        change["changed_columns"] = [
+            {
+                "name": name,
+                "source_type": left_columns[name][0],
+                "target_type": right_columns[name][0],
+                "source_nullable": left_columns[name][1],
+                "target_nullable": right_columns[name][1],
+            }
+            for name, _, _ in left["columns"]
+            if name in right_columns and left_columns[name] != right_columns[name]
+        ]
+        common = [name for name, _, _ in left["columns"] if name in right_columns]
+        if common != [name for name, _, _ in right["columns"] if name in left_columns]:
+            change["column_order_changed"] = True
+        changed.append(change)
+
+    return {
+        "added_tables": [
+            {
+                "name": table,
+                "type": source[table]["type"],
+                "columns": [
+                    {"name": name, "type": data_type, "nullable": nullable}
+                    for name, data_type, nullable in source[table]["columns"]
+                ],
+            }
+            for table in added
+        ],
+        "removed_tables": [
+            {"name": table, "type": target[table]["type"]} for table in removed
+        ],
+        "changed_tables": changed,
+        "unchanged_tables": unchanged,
+    }
+
+
+def build_reconcile_ddl(
+    diff: Dict[str, Any], table_prefix: str, include_drops: bool = False
+) -> Tuple[List[str], List[Dict[str, str]]]:
+    """
+    Строит DDL, приводящий target к структуре source.
+
+    Представления не создаются (в information_schema нет их текста),
+    NOT NULL у существующей колонки не устанавливается (в Trino есть
+    только DROP NOT NULL) - такие изменения возвращаются как пропущенные.
+
+    :param diff: Результат diff_tables
+    :param table_prefix: Каталог и схема target ("catalog.schema")
+    :param include_drops: Добавлять DROP для таблиц и колонок,
+        которых нет в source
+    :return: DDL выражения и пропущенные изменения
+    """
+    statements: List[str] = []
+    skipped: List[Dict[str, str]] = []
+
+    def path(table: str) -> str:
+        return f"{table_prefix}.{quote_identifier(table)}"
+
+    for table in diff["added_tables"]:
+        if table["type"] != "BASE TABLE":
+            skipped.append(
+                {"object": table["name"], "reason": f"{table['type']} не создается"}
+            )
+            continue
+        columns = ", ".join(
+            f"{quote_identifier(column['name'])} {column['type']}"
+            + ("" if column["nullable"] else " NOT NULL")
+            for column in table["columns"]
+        )
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {path(table['name'])} ({columns})"
+        )
+
+    for table in diff["changed_tables"]:
+        name = table["name"]
+        if "source_type" in table:
+            skipped.append(
+                {
+                    "object": name,
+                    "reason": f"тип объекта {table['target_type']} "
+                    f"отличается от {table['source_type']}",
+                }
+            )
+            continue
+        for column in table["added_columns"]:
+            statements.append(
+                f"ALTER TABLE {path(name)} ADD COLUMN IF NOT EXISTS "
+                f"{quote_identifier(column['name'])} {column['type']}"
+            )
+        for column in table["changed_columns"]:
+            column_name = quote_identifier(column["name"])
+            if column["source_type"] != column["target_type"]:
+                statements.append(
+                    f"ALTER TABLE {path(name)} ALTER COLUMN {column_name} "
+                    f"SET DATA TYPE {column['source_type']}"
+                )
+            if column["source_nullable"] and not column["target_nullable"]:
+                statements.append(
+                    f"ALTER TABLE {path(name)} ALTER COLUMN {column_name} "
+                    "DROP NOT NULL"
+                )
+            elif column["target_nullable"] and not column["source_nullable"]:
+                skipped.append(
+                    {
+                        "object": f"{name}.{column['name']}",
+                        "reason": "NOT NULL нельзя установить для существующей колонки",
+                    }
+                )
+        if include_drops:
+            for column in table["removed_columns"]:
+                statements.append(
+                    f"ALTER TABLE {path(name)} DROP COLUMN IF EXISTS "
+                    f"{quote_identifier(column['name'])}"
+                )
+
+    if include_drops:
+        for table in diff["removed_tables"]:
+            kind = "VIEW" if table["type"] == "VIEW" else "TABLE"
+            statements.append(f"DROP {kind} IF EXISTS {path(table['name'])}")
+
+    return statements, skipped
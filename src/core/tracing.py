@@ -0,0 +1,215 @@
+import functools
+import json
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from src.core.config import config
+from src.core.logging import get_logger, request_id_var
+
+logger = get_logger(__name__)
+
+TRACING_EXPORTERS = ("otlp", "file", "console")
+
+# Статистика Trino, которая записывается в атрибуты span запроса
+_QUERY_STATS = {
+    "queuedTimeMillis": "trino.queued_ms",
+    "elapsedTimeMillis": "trino.elapsed_ms",
+    "cpuTimeMillis": "trino.cpu_ms",
+    "processedRows": "trino.processed_rows",
+    "processedBytes": "trino.processed_bytes",
+    "peakMemoryBytes": "trino.peak_memory_bytes",
+}
+
+
+class _Span:
+    """Обертка span OpenTelemetry: атрибуты со значением None пропускаются."""
+
+    __slots__ = ("span",)
+
+    def __init__(self, span=None):
+        self.span = span
+
+    def set(self, **attributes: Any):
+        if self.span is None:
+            return
+        for key, value in attributes.items():
+            if value is not None:
+                self.span.set_attribute(key, value)
+
+    def set_query(self, cursor):
+        """
+        Записывает query id и статистику запроса Trino.
+
+        :param cursor: Курсор выполненного запроса
+        """
+        if self.span is None:
+            return
+        try:
+            stats = cursor.stats or {}
+            query_id = cursor.query_id
+        except Exception:
+            return
+        self.set(**{"trino.query_id": query_id or stats.get("queryId")})
+        self.set(**{name: stats.get(key) for key, name in _QUERY_STATS.items()})
+
+
+_NOOP_SPAN = _Span()
+_tracer = None
+_tracer_ready = False
+_tracer_lock = Lock()
+
+
+def _get_tracer():
+    """
+    Создает tracer при первом span. OpenTelemetry импортируется только
+    при TRACING_ENABLED, так что выключенная трассировка не замедляет
+    старт сервера.
+    """
+    global _tracer, _tracer_ready
+    if _tracer_ready:
+        return _tracer
+    with _tracer_lock:
+        if not _tracer_ready:
+            if config.TRACING_ENABLED:
+                try:
+                    _tracer = _create_tracer()
+                except ImportError as e:
+                    logger.warning(
+                        "Tracing disabled, OpenTelemetry is not installed "
+                        '(pip install ".[opentelemetry]"): %s',
+                        e,
+                    )
+                except Exception as e:
+                    logger.error("Tracing disabled, cannot set up exporter: %s", e)
+            _tracer_ready = True
+    return _tracer
+
+
+def _create_tracer():
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+    )
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    exporter_name = config.TRACING_EXPORTER
+    if exporter_name not in TRACING_EXPORTERS:
+        raise ValueError(f"неизвестный экспортер трассировки: {exporter_name}.")
+
+    if exporter_name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        exporter = OTLPSpanExporter(endpoint=config.TRACING_OTLP_ENDPOINT)
+    elif exporter_name == "file":
+        exporter = _file_exporter(config.TRACING_FILE)
+    else:
+        exporter = ConsoleSpanExporter()
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": config.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(config.TRACING_SAMPLE_RATIO)),
+    )
+    # Span отправляются фоновым потоком пачками
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    logger.info("Tracing enabled, exporter %s", exporter_name)
+    return provider.get_tracer("trino-mcp")
+
+
+def _file_exporter(path: str):
+    """Экспортер span в файл: одна JSON запись на строку."""
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonLinesSpanExporter(SpanExporter):
+        def __init__(self):
+            self._file = open(path, "a", encoding="utf-8")
+            self._lock = Lock()
+
+        def export(self, spans):
+            lines = "".join(
+                json.dumps(json.loads(span.to_json()), ensure_ascii=False) + "\n"
+                for span in spans
+            )
+            with self._lock:
+                self._file.write(lines)
+                self._file.flush()
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            with self._lock:
+                self._file.close()
+
+    return JsonLinesSpanExporter()
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """
+    Открывает дочерний span текущего контекста.
+
+    Контекст OpenTelemetry хранится в contextvars, поэтому span из потоков
+    asyncio.to_thread становятся дочерними span вызова инструмента.
+    Без TRACING_ENABLED ничего не делает.
+
+    :param name: Имя span
+    :param attributes: Атрибуты (None пропускаются)
+    :yields: Span с методами set и set_query
+    """
+    tracer = _get_tracer() if config.TRACING_ENABLED else None
+    if tracer is None:
+        yield _NOOP_SPAN
+        return
+    with tracer.start_as_current_span(name) as current:
+        wrapped = _Span(current)
+        wrapped.set(**attributes)
+        yield wrapped
+
+
+@contextmanager
+def traced_lock(lock, name: str):
+    """
+    Захватывает блокировку, записывая ожидание отдельным span.
+
+    :param lock: Блокировка
+    :param name: Имя span ожидания
+    """
+    with span(name):
+        lock.acquire()
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def trace_tool(func):
+    """
+    Декоратор инструмента MCP: span на вызов и сериализация результата
+    в строку ответа отдельным span.
+    """
+    name = func.__name__.removesuffix("_tool")
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with span(
+            f"tool {name}", **{"mcp.tool": name, "mcp.request_id": request_id_var.get()}
+        ) as current:
+            result = await func(*args, **kwargs)
+            if not isinstance(result, str):
+                with span("serialize"):
+                    result = str(result)
+            current.set(**{"mcp.response_bytes": len(result)})
+            return result
+
+    return wrapper
+
+
+def get_tracing_stats() -> Dict[str, Optional[Any]]:
+    """Возвращает настройки трассировки."""
+    return {
+        "enabled": _get_tracer() is not None,
+        "exporter": config.TRACING_EXPORTER if config.TRACING_ENABLED else None,
+    }
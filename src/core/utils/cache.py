@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Потокобезопасный LRU кеш с ограничением размера и временем жизни записей.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        :param maxsize: Максимальное количество записей
+        :param ttl: Время жизни записи в секундах (None - без ограничения)
+        """
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу, если оно есть и не истекло.
+
+        :param key: Ключ
+        :param default: Значение при отсутствии ключа
+        :return: Закешированное значение или default
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._misses += 1
+                return default
+
+            value, expires_at = item
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._data[key]
+                self._misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Сохраняет значение, вытесняя самые старые записи при переполнении.
+
+        :param key: Ключ
+        :param value: Значение
+        :param ttl: Время жизни записи в секундах (None - время жизни кеша)
+        """
+        ttl = self._ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (
+                value,
+                time.monotonic() + ttl if ttl is not None else None,
+            )
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Удаляет запись и возвращает ее значение."""
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[0]
+
+    def clear(self):
+        """Очищает кеш."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Возвращает статистику попаданий в кеш."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self._maxsize,
+                "ttl": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
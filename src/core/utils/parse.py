@@ -1,18 +1,28 @@
+from typing import List, Optional, Tuple
 from urllib.parse import parse_qs, urlparse
 
+from src.core.constants import SPOOLING_ENCODINGS, SSL_VERIFICATION_MODES
+
 
 def parse_trino_jdbc(jdbc_url: str) -> dict:
     """
     Парсит JDBC URL Trino и возвращает dict с параметрами для подключения.
-    Пример входа: jdbc:trino://host:443?user=foo&password=bar
+    Пример входа: jdbc:trino://host:443?user=foo&password=bar&SSL=true
+
+    Для логического кластера из нескольких координаторов адреса
+    перечисляются через запятую: jdbc:trino://host1:8443,host2:8443?user=foo.
+    host и port в результате - первый адрес.
 
     :param jdbc_url: строка подключения jdbc
     :returns:
     {
         "host": "host",
         "port": 443,
+        "endpoints": [("host", 443)],
         "user": "foo",
         "password": "bar",
+        "http_scheme": "https",
+        "verify": True,
         **params
     }
     """
@@ -21,9 +31,7 @@ def parse_trino_jdbc(jdbc_url: str) -> dict:
 
     url = jdbc_url[len("jdbc:") :]
     parsed = urlparse(url)
-
-    if not parsed.hostname or not parsed.port:
-        raise ValueError("отсутствует host или port в jdbc строке.")
+    endpoints = _parse_endpoints(parsed.netloc)
 
     params = parse_qs(parsed.query)
     params = {k: v[0] for k, v in params.items()}
@@ -32,9 +40,98 @@ def parse_trino_jdbc(jdbc_url: str) -> dict:
         raise ValueError("trino jdbc строка должна содержать user.")
 
     return {
-        "host": parsed.hostname,
-        "port": parsed.port,
+        "host": endpoints[0][0],
+        "port": endpoints[0][1],
+        "endpoints": endpoints,
         "user": params.get("user"),
         "password": params.get("password", None),
+        "http_scheme": _parse_http_scheme(params, endpoints[0][1]),
+        "verify": _parse_ssl_verify(params),
         **params,
     }
+
+
+def _parse_endpoints(netloc: str) -> List[Tuple[str, int]]:
+    """
+    Разбирает список адресов координаторов host:port через запятую.
+
+    :param netloc: сетевая часть jdbc строки
+    :return: список (host, port)
+    """
+    endpoints = []
+    for item in netloc.split(","):
+        parsed = urlparse(f"//{item.strip()}")
+        try:
+            port = parsed.port
+        except ValueError:
+            port = None
+        if not parsed.hostname or not port:
+            raise ValueError("отсутствует host или port в jdbc строке.")
+        endpoints.append((parsed.hostname, port))
+    return endpoints
+
+
+def _parse_http_scheme(params: dict, port: int) -> str:
+    """
+    Определяет HTTP схему по параметру SSL, а при его отсутствии - по порту.
+
+    :param params: параметры jdbc строки
+    :param port: порт координатора
+    :return: "https" или "http"
+    """
+    ssl = params.get("SSL")
+    if ssl is None:
+        return "https" if port == 443 else "http"
+
+    if ssl.lower() not in ("true", "false"):
+        raise ValueError("параметр SSL в jdbc строке должен быть true или false.")
+    return "https" if ssl.lower() == "true" else "http"
+
+
+def _parse_ssl_verify(params: dict):
+    """
+    Определяет настройку проверки TLS сертификата по параметрам
+    SSLVerification и SSLTrustStorePath.
+
+    Режим CA из JDBC (цепочка сертификатов без проверки имени хоста)
+    отклоняется: requests всегда проверяет имя хоста, и молча заменять
+    CA на FULL нельзя.
+
+    :param params: параметры jdbc строки
+    :return: False, True или путь к CA bundle
+    """
+    mode = params.get("SSLVerification", "FULL").upper()
+    if mode == "CA":
+        raise ValueError(
+            "SSLVerification=CA не поддерживается: имя хоста проверяется всегда. "
+            "Используйте FULL (при необходимости с SSLTrustStorePath) или NONE."
+        )
+    if mode not in SSL_VERIFICATION_MODES:
+        raise ValueError(
+            f"параметр SSLVerification должен быть одним из: "
+            f"{', '.join(SSL_VERIFICATION_MODES)}."
+        )
+
+    if mode == "NONE":
+        return False
+    return params.get("SSLTrustStorePath") or True
+
+
+def parse_spooling_encoding(encoding: Optional[str]) -> Optional[List[str]]:
+    """
+    Парсит список кодировок spooling протокола Trino.
+    Пример входа: "json+zstd,json+lz4,json"
+
+    :param encoding: кодировки через запятую, "none" или пустая строка
+    :return: Список кодировок или None, если spooling протокол отключен
+    """
+    if encoding is None or encoding.strip().lower() in ("", "none"):
+        return None
+
+    encodings = [item.strip() for item in encoding.split(",") if item.strip()]
+    unknown = [item for item in encodings if item not in SPOOLING_ENCODINGS]
+    if unknown:
+        raise ValueError(
+            f"неподдерживаемая кодировка spooling протокола: {', '.join(unknown)}."
+        )
+    return encodings
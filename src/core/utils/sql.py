@@ -0,0 +1,180 @@
+import math
+import re
+from decimal import Decimal
+from typing import Any, List, Sequence
+
+_TOKEN_PATTERN = re.compile(
+    r"""('(?:[^']|'')*')|("(?:[^"]|"")*")|((?:\s|--[^\n]*|/\*.*?\*/)+)""",
+    re.DOTALL,
+)
+_QUERY_START_PATTERN = re.compile(r"^\s*\(*\s*(SELECT|WITH|VALUES|TABLE)\b", re.I)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Нормализует SQL для использования в качестве ключа кеша:
+    удаляет комментарии, схлопывает пробелы и завершающие ';'.
+    Строковые литералы и идентификаторы в кавычках не меняются.
+
+    :param sql: SQL запрос
+    :return: Нормализованный SQL
+    """
+
+    def replace(match: re.Match) -> str:
+        if match.group(1) or match.group(2):
+            return match.group(0)
+        return " "
+
+    return _TOKEN_PATTERN.sub(replace, sql).strip().rstrip(";").strip()
+
+
+def is_query(sql: str) -> bool:
+    """
+    Проверяет, что выражение является запросом на чтение (SELECT/WITH/VALUES).
+
+    :param sql: SQL выражение
+    :return: True для запросов на чтение
+    """
+    return bool(_QUERY_START_PATTERN.match(normalize_sql(sql)))
+
+
+_PLACEHOLDER_PATTERN = re.compile(
+    r"""('(?:[^']|'')*')|("(?:[^"]|"")*")|(--[^\n]*|/\*.*?\*/)|(\?)""",
+    re.DOTALL,
+)
+
+
+def count_placeholders(sql: str) -> int:
+    """
+    Считает параметры ? вне строковых литералов, идентификаторов и комментариев.
+
+    :param sql: SQL запрос с параметрами
+    :return: Количество параметров
+    """
+    return sum(1 for match in _PLACEHOLDER_PATTERN.finditer(sql) if match.group(4))
+
+
+def format_literal(value: Any) -> str:
+    """
+    Форматирует значение параметра как SQL литерал Trino.
+
+    :param value: Значение (None, bool, int, float, Decimal, str, bytes,
+        список или словарь)
+    :return: SQL литерал
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "nan()"
+        if math.isinf(value):
+            return "infinity()" if value > 0 else "-infinity()"
+        return f"DOUBLE '{value!r}'"
+    if isinstance(value, Decimal):
+        return f"DECIMAL '{value}'"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, (bytes, bytearray)):
+        return f"X'{value.hex()}'"
+    if isinstance(value, (list, tuple)):
+        return "ARRAY[" + ", ".join(format_literal(item) for item in value) + "]"
+    if isinstance(value, dict):
+        keys = ", ".join(format_literal(key) for key in value)
+        values = ", ".join(format_literal(item) for item in value.values())
+        return f"MAP(ARRAY[{keys}], ARRAY[{values}])"
+    raise ValueError(f"неподдерживаемый тип параметра: {type(value).__name__}.")
+
+
+def inline_parameters(sql: str, parameters: Sequence[Any]) -> str:
+    """
+    Подставляет параметры в SQL литералами (для EXPLAIN и выполнения
+    без подготовленного выражения).
+
+    :param sql: SQL запрос с параметрами ?
+    :param parameters: Значения параметров по порядку
+    :return: SQL запрос с литералами
+    """
+    values = iter(parameters)
+
+    def replace(match: re.Match) -> str:
+        if match.group(4):
+            return format_literal(next(values))
+        return match.group(0)
+
+    return _PLACEHOLDER_PATTERN.sub(replace, sql)
+
+
+_FINGERPRINT_PATTERN = re.compile(
+    r"""('(?:[^']|'')*')|("(?:[^"]|"")*")|((?:\s|--[^\n]*|/\*.*?\*/)+)"""
+    r"""|((?<![\w$])(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"""
+    r"""|([\w$]+|<>|<=|>=|!=|\|\||->|=>|.)""",
+    re.DOTALL,
+)
+_VALUE_LIST_PATTERN = re.compile(r"\(\?(?:, \?)+\)")
+_ROW_LIST_PATTERN = re.compile(r"\(\?\)(?:, \(\?\))+")
+
+
+def fingerprint_sql(sql: str) -> str:
+    """
+    Приводит SQL к отпечатку, общему для запросов, отличающихся только
+    значениями и оформлением: строковые и числовые литералы заменяются
+    на ?, списки значений IN (...) и строк VALUES схлопываются, комментарии
+    удаляются, пробелы расставляются единообразно, ключевые слова и имена
+    без кавычек приводятся к нижнему регистру.
+
+    :param sql: SQL запрос
+    :return: Отпечаток запроса
+    """
+    tokens = []
+    for match in _FINGERPRINT_PATTERN.finditer(sql):
+        if match.group(3):
+            continue
+        if match.group(1) or match.group(4):
+            tokens.append("?")
+        elif match.group(2):
+            tokens.append(match.group(0))
+        else:
+            tokens.append(match.group(0).lower())
+    while tokens and tokens[-1] == ";":
+        tokens.pop()
+
+    parts = []
+    for i, token in enumerate(tokens):
+        previous = tokens[i - 1] if i else "("
+        if previous not in ("(", ".") and (
+            token not in (",", ")", ".", "(") or (token == "(" and previous == ",")
+        ):
+            parts.append(" ")
+        parts.append(token)
+    text = "".join(parts)
+    text = _VALUE_LIST_PATTERN.sub("(?)", text)
+    return _ROW_LIST_PATTERN.sub("(?)", text)
+
+
+_NAME_PART_PATTERN = re.compile(r'\s*(?:"((?:[^"]|"")*)"|([^\s."]+))\s*(\.|$)')
+
+
+def split_qualified_name(name: str) -> List[str]:
+    """
+    Разбивает имя вида catalog.schema.table на части с учетом
+    идентификаторов в кавычках ("my-cat".s."a.b"): кавычки снимаются,
+    части приводятся к нижнему регистру, как их хранит Trino.
+
+    :param name: Имя объекта
+    :return: Части имени или пустой список, если имя не разбирается
+    """
+    parts = []
+    position = 0
+    separator = "."
+    while separator:
+        match = _NAME_PART_PATTERN.match(name, position)
+        if not match:
+            return []
+        quoted, plain, separator = match.groups()
+        parts.append((plain if quoted is None else quoted.replace('""', '"')).lower())
+        position = match.end()
+    return parts
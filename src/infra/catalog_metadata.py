@@ -0,0 +1,391 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from trino.exceptions import TrinoUserError
+
+from src.core.enums.ddl import DDLType
+from src.core.logging import get_logger
+from src.core.utils.validate import validate_identifier
+from src.infra.cluster_registry import cluster_registry
+from src.infra.connection_manager import connection_manager
+
+logger = get_logger(__name__)
+
+ObjectKey = Tuple[str, str, str]
+
+_ALTER_COLUMN_PATTERN = re.compile(
+    r"^\s*ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?\S+\s+"
+    r"(ADD|DROP|RENAME|ALTER)\s+COLUMN\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?"
+    r"(\"[^\"]+\"|[^\s,;]+)",
+    re.IGNORECASE,
+)
+_CTE_PATTERN = re.compile(r"(?:\bWITH|,)\s+([A-Za-z_]\w*)\s+AS\s*\(", re.IGNORECASE)
+_IF_EXISTS_PATTERN = re.compile(r"\bIF\s+EXISTS\b", re.IGNORECASE)
+_IF_NOT_EXISTS_PATTERN = re.compile(r"\bIF\s+NOT\s+EXISTS\b", re.IGNORECASE)
+_OR_REPLACE_PATTERN = re.compile(r"^\s*CREATE\s+OR\s+REPLACE\b", re.IGNORECASE)
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class CatalogMetadataValidator:
+    """
+    Проверка DDL набора против текущего состояния кластера.
+
+    Все объекты, на которые ссылается набор, собираются заранее и
+    разрешаются одним запросом к information_schema на каталог
+    (schemata + columns через UNION ALL). Затем выражения проходятся
+    по порядку с учетом объектов, которые создает и удаляет сам набор,
+    так что конфликты обнаруживаются до выполнения первого выражения.
+    """
+
+    def validate(
+        self,
+        jdbc_url: str,
+        ddl_list: List[str],
+        analysis: Dict[str, Any],
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Проверяет набор DDL против метаданных кластера.
+
+        :param jdbc_url: JDBC URL или имя кластера
+        :param ddl_list: Список DDL выражений
+        :param analysis: Результат DDLAnalyzer.analyze_ddl_list для ddl_list
+        :param catalog: Каталог по умолчанию
+        :param schema: Схема по умолчанию
+        :return: Найденные конфликты и число запросов к метаданным
+        """
+        params = cluster_registry.resolve(jdbc_url).params
+        catalog = catalog or params.get("catalog")
+        schema = schema or params.get("schema")
+
+        issues: List[Dict[str, Any]] = []
+        statements = []
+        for obj in analysis["objects"]:
+            ddl = ddl_list[obj["index"]]
+            key = self._qualify(obj["name"], catalog, schema, obj["type"])
+            dependencies = [
+                self._qualify(name, catalog, schema)
+                for name in self._table_references(ddl, obj["dependencies"])
+            ]
+            if obj["name"] and key is None:
+                issues.append(
+                    self._issue(
+                        "unresolved_name",
+                        "warning",
+                        "Не задан каталог или схема по умолчанию, "
+                        "объект не проверен по кластеру",
+                        obj,
+                    )
+                )
+            statements.append((obj, ddl, key, [d for d in dependencies if d]))
+
+        lookups: Dict[str, Dict[str, Set[str]]] = {}
+        for _, _, key, dependencies in statements:
+            for ref in ([key] if key else []) + dependencies:
+                names = lookups.setdefault(ref[0], {"schemas": set(), "tables": set()})
+                names["schemas"].add(ref[1])
+                if ref[2]:
+                    names["tables"].add(ref[2])
+
+        schemas: Set[Tuple[str, str]] = set()
+        columns: Dict[ObjectKey, Set[str]] = {}
+        unavailable: Dict[str, str] = {}
+        created: Set[ObjectKey] = set()
+        for catalog_name, names in lookups.items():
+            try:
+                found_schemas, found_columns = self._lookup(
+                    jdbc_url, catalog_name, names["schemas"], names["tables"]
+                )
+            except (TrinoUserError, ValueError) as e:
+                unavailable[catalog_name] = str(e)
+                continue
+            schemas.update(found_schemas)
+            columns.update(found_columns)
+
+        for obj, ddl, key, dependencies in statements:
+            issues.extend(
+                self._check_statement(
+                    obj, ddl, key, dependencies, schemas, columns, unavailable, created
+                )
+            )
+
+        return {
+            "catalogs_checked": sorted(set(lookups) - set(unavailable)),
+            "metadata_queries": len(lookups),
+            "issues": issues,
+        }
+
+    def _lookup(
+        self,
+        jdbc_url: str,
+        catalog: str,
+        schemas: Iterable[str],
+        tables: Iterable[str],
+    ) -> Tuple[Set[Tuple[str, str]], Dict[ObjectKey, Set[str]]]:
+        """
+        Читает существующие схемы и колонки таблиц одним запросом.
+
+        :param jdbc_url: JDBC URL или имя кластера
+        :param catalog: Каталог
+        :param schemas: Имена схем
+        :param tables: Имена таблиц и представлений
+        :return: Существующие схемы и колонки существующих объектов
+        """
+        if not validate_identifier(catalog):
+            raise ValueError(f"невалидное имя каталога: {catalog}.")
+
+        schema_list = ", ".join(_quote(name) for name in sorted(schemas))
+        sql = (
+            "SELECT 'schema', schema_name, NULL, NULL "
+            f"FROM {catalog}.information_schema.schemata "
+            f"WHERE schema_name IN ({schema_list})"
+        )
+        if tables:
+            table_list = ", ".join(_quote(name) for name in sorted(tables))
+            sql += (
+                " UNION ALL SELECT 'column', table_schema, table_name, column_name "
+                f"FROM {catalog}.information_schema.columns "
+                f"WHERE table_schema IN ({schema_list}) "
+                f"AND table_name IN ({table_list})"
+            )
+
+        def fetch(conn):
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            return cursor.fetchall()
+
+        rows = connection_manager.run_with_failover(jdbc_url, fetch)
+        logger.debug("Resolved %s metadata rows in catalog %s", len(rows), catalog)
+
+        found_schemas = set()
+        found_columns: Dict[ObjectKey, Set[str]] = {}
+        for kind, schema, table, column in rows:
+            if kind == "schema":
+                found_schemas.add((catalog, schema))
+            else:
+                found_columns.setdefault((catalog, schema, table), set()).add(column)
+        return found_schemas, found_columns
+
+    def _check_statement(
+        self,
+        obj: Dict[str, Any],
+        ddl: str,
+        key: Optional[ObjectKey],
+        dependencies: List[ObjectKey],
+        schemas: Set[Tuple[str, str]],
+        columns: Dict[ObjectKey, Set[str]],
+        unavailable: Dict[str, str],
+        created: Set[ObjectKey],
+    ) -> List[Dict[str, Any]]:
+        """
+        Проверяет выражение и применяет его к состоянию кластера.
+
+        schemas, columns и created изменяются: созданные набором объекты
+        добавляются, удаленные - убираются, чтобы следующие выражения
+        видели результат предыдущих. Колонки таблиц, созданных набором,
+        известны только из разбора CREATE TABLE, поэтому проблемы с их
+        колонками - предупреждения, а не блокирующие ошибки.
+        """
+        issues = []
+        ddl_type = DDLType(obj["type"])
+        name = obj["name"]
+
+        for ref in ([key] if key else []) + dependencies:
+            if ref[0] in unavailable:
+                issues.append(
+                    self._issue(
+                        "catalog_not_found",
+                        "high",
+                        f"Каталог {ref[0]} недоступен: {unavailable[ref[0]]}",
+                        obj,
+                    )
+                )
+                return issues
+
+        if key is None:
+            return issues
+
+        if ddl_type == DDLType.CREATE_SCHEMA:
+            if (key[0], key[1]) in schemas and not _IF_NOT_EXISTS_PATTERN.search(ddl):
+                issues.append(
+                    self._issue("object_exists", "high", "Схема уже существует", obj)
+                )
+            schemas.add((key[0], key[1]))
+            return issues
+
+        exists = key in columns
+        if ddl_type in (DDLType.CREATE_TABLE, DDLType.CREATE_VIEW):
+            if (key[0], key[1]) not in schemas:
+                issues.append(
+                    self._issue(
+                        "schema_not_found",
+                        "high",
+                        f"Схема {key[0]}.{key[1]} не существует",
+                        obj,
+                    )
+                )
+            if (
+                exists
+                and not _IF_NOT_EXISTS_PATTERN.search(ddl)
+                and not _OR_REPLACE_PATTERN.search(ddl)
+            ):
+                issues.append(
+                    self._issue("object_exists", "high", "Объект уже существует", obj)
+                )
+            for dependency in dependencies:
+                if dependency not in columns:
+                    issues.append(
+                        self._issue(
+                            "missing_dependency",
+                            "high",
+                            f"Зависимость {'.'.join(dependency)} не существует",
+                            obj,
+                        )
+                    )
+            if not exists:
+                columns[key] = {
+                    column["name"].lower() for column in obj.get("columns", [])
+                }
+                created.add(key)
+            return issues
+
+        if_exists = bool(_IF_EXISTS_PATTERN.search(ddl))
+        if ddl_type in (DDLType.DROP_TABLE, DDLType.DROP_VIEW):
+            if not exists and not if_exists:
+                issues.append(
+                    self._issue(
+                        "object_not_found", "high", f"Объект {name} не существует", obj
+                    )
+                )
+            columns.pop(key, None)
+            created.discard(key)
+            return issues
+
+        if ddl_type == DDLType.ALTER_TABLE:
+            if not exists:
+                if not if_exists:
+                    issues.append(
+                        self._issue(
+                            "object_not_found",
+                            "high",
+                            f"Таблица {name} не существует",
+                            obj,
+                        )
+                    )
+                return issues
+            severity = "warning" if key in created else "high"
+            issues.extend(self._check_alter_column(obj, ddl, columns[key], severity))
+        return issues
+
+    def _check_alter_column(
+        self,
+        obj: Dict[str, Any],
+        ddl: str,
+        table_columns: Set[str],
+        severity: str = "high",
+    ) -> List[Dict[str, Any]]:
+        """
+        Проверяет ADD/DROP/RENAME/ALTER COLUMN против колонок таблицы.
+
+        :param severity: Важность найденных проблем
+        """
+        match = _ALTER_COLUMN_PATTERN.match(ddl)
+        if not match:
+            return []
+
+        action = match.group(1).upper()
+        column = match.group(2).strip('"').lower()
+        guarded = bool(re.search(r"\bCOLUMN\s+IF\b", ddl, re.IGNORECASE))
+
+        if action == "ADD":
+            if column in table_columns and not guarded:
+                return [
+                    self._issue(
+                        "column_exists",
+                        severity,
+                        f"Колонка {column} уже существует",
+                        obj,
+                    )
+                ]
+            table_columns.add(column)
+            return []
+
+        if column not in table_columns:
+            if guarded:
+                return []
+            return [
+                self._issue(
+                    "column_not_found",
+                    severity,
+                    f"Колонка {column} не существует",
+                    obj,
+                )
+            ]
+        if action == "DROP":
+            table_columns.discard(column)
+        elif action == "RENAME":
+            renamed = re.search(r"\bTO\s+(\"[^\"]+\"|\S+)", ddl[match.end() :], re.I)
+            table_columns.discard(column)
+            if renamed:
+                table_columns.add(renamed.group(1).strip('";').lower())
+        return []
+
+    @staticmethod
+    def _table_references(ddl: str, dependencies: List[str]) -> List[str]:
+        """Отбрасывает подзапросы и имена CTE из зависимостей выражения."""
+        ctes = {name.lower() for name in _CTE_PATTERN.findall(ddl)}
+        return [
+            name.rstrip(";")
+            for name in dependencies
+            if not name.startswith("(") and name.rstrip(";").lower() not in ctes
+        ]
+
+    @staticmethod
+    def _qualify(
+        name: Optional[str],
+        catalog: Optional[str],
+        schema: Optional[str],
+        ddl_type: Optional[str] = None,
+    ) -> Optional[ObjectKey]:
+        """
+        Дополняет имя объекта каталогом и схемой по умолчанию.
+
+        Для CREATE SCHEMA имя - это catalog.schema, третья часть пустая.
+
+        :return: (catalog, schema, table) в нижнем регистре или None
+        """
+        if not name:
+            return None
+        parts = [part.strip('"').lower() for part in name.split(".")]
+
+        if ddl_type == DDLType.CREATE_SCHEMA.value:
+            if len(parts) == 1 and catalog:
+                return (catalog.lower(), parts[0], "")
+            return (parts[0], parts[1], "") if len(parts) == 2 else None
+
+        if len(parts) == 3:
+            return (parts[0], parts[1], parts[2])
+        if len(parts) == 2 and catalog:
+            return (catalog.lower(), parts[0], parts[1])
+        if len(parts) == 1 and catalog and schema:
+            return (catalog.lower(), schema.lower(), parts[0])
+        return None
+
+    @staticmethod
+    def _issue(
+        issue_type: str, severity: str, message: str, obj: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        return {
+            "type": issue_type,
+            "severity": severity,
+            "message": message,
+            "object": obj["name"],
+            "statement_index": obj["index"],
+        }
+
+
+catalog_metadata_validator = CatalogMetadataValidator()
@@ -0,0 +1,144 @@
+import hashlib
+import os
+from typing import Any, Dict, List, Optional
+
+from src.core.config import config
+from src.core.logging import get_logger
+from src.core.utils.cache import TTLCache
+from src.core.utils.parse import parse_spooling_encoding, parse_trino_jdbc
+
+logger = get_logger(__name__)
+
+# Переопределения порогов guard: параметр JDBC URL -> настройка кластера
+_GUARD_PARAMS = {
+    "guardMaxScanBytes": "guard_max_scan_bytes",
+    "guardMaxScanRows": "guard_max_scan_rows",
+    "guardAction": "guard_action",
+}
+
+
+class Cluster:
+    """
+    Кластер Trino с параметрами подключения, разобранными один раз.
+
+    Создается из именованной записи конфигурации или из JDBC URL,
+    переданного в инструмент напрямую.
+    """
+
+    def __init__(
+        self,
+        jdbc_url: str,
+        name: Optional[str] = None,
+        settings: Optional[Dict[str, Any]] = None,
+    ):
+        settings = settings or {}
+        self.name = name
+        self.params = parse_trino_jdbc(jdbc_url)
+
+        password = settings.get("password")
+        if settings.get("password_env"):
+            password = os.getenv(settings["password_env"])
+        if settings.get("user"):
+            self.params["user"] = settings["user"]
+        if password:
+            self.params["password"] = password
+
+        self.endpoints = self.params["endpoints"]
+        self.key = (
+            f"cluster:{name}"
+            if name
+            else hashlib.sha256(jdbc_url.encode()).hexdigest()[:16]
+        )
+        self.encoding = parse_spooling_encoding(
+            settings.get(
+                "spooling_encoding",
+                self.params.get("encoding", config.SPOOLING_ENCODING),
+            )
+        )
+
+        self.max_idle_connections: Optional[int] = settings.get("max_idle_connections")
+        self.query_timeout: Optional[float] = settings.get("query_timeout")
+        self.table_stats_cache_ttl: Optional[float] = settings.get(
+            "table_stats_cache_ttl"
+        )
+        self.guard_cache_ttl: Optional[float] = settings.get("guard_cache_ttl")
+        self.guard = {
+            setting: settings.get(setting, self.params.get(param))
+            for param, setting in _GUARD_PARAMS.items()
+            if settings.get(setting, self.params.get(param)) is not None
+        }
+
+    @property
+    def display_name(self) -> str:
+        """Имя кластера или адрес первого координатора (без учетных данных)."""
+        return self.name or f"{self.params['host']}:{self.params['port']}"
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Возвращает описание кластера без учетных данных.
+
+        :return: Имя, адреса координаторов, пользователь и настройки
+        """
+        return {
+            "name": self.display_name,
+            "endpoints": [f"{host}:{port}" for host, port in self.endpoints],
+            "user": self.params["user"],
+            "http_scheme": self.params["http_scheme"],
+            "max_idle_connections": self.max_idle_connections,
+            "query_timeout": self.query_timeout,
+            "table_stats_cache_ttl": self.table_stats_cache_ttl,
+            "guard_cache_ttl": self.guard_cache_ttl,
+            "guard": self.guard,
+        }
+
+
+class ClusterRegistry:
+    """
+    Реестр кластеров Trino.
+
+    Именованные кластеры загружаются из конфигурации при старте, так что
+    инструменты принимают имя кластера вместо JDBC URL с паролем.
+    JDBC URL, переданные напрямую, разбираются один раз и кешируются.
+    """
+
+    def __init__(
+        self, clusters: Optional[Dict[str, Dict[str, Any]]] = None, cache_size=256
+    ):
+        self._clusters: Dict[str, Cluster] = {}
+        for name, settings in (clusters or {}).items():
+            if "jdbc_url" not in settings:
+                raise ValueError(f"для кластера {name} не задан jdbc_url.")
+            self._clusters[name] = Cluster(settings["jdbc_url"], name, settings)
+        self._urls = TTLCache(maxsize=cache_size)
+
+        if self._clusters:
+            logger.info("Loaded Trino clusters: %s", ", ".join(self._clusters))
+
+    def resolve(self, cluster: str) -> Cluster:
+        """
+        Возвращает кластер по имени или JDBC URL.
+
+        :param cluster: Имя кластера из конфигурации или JDBC URL
+        :return: Кластер
+        """
+        named = self._clusters.get(cluster)
+        if named is not None:
+            return named
+
+        if not cluster.startswith("jdbc:"):
+            raise ValueError(f"неизвестный кластер Trino: {cluster}.")
+
+        resolved = self._urls.get(cluster)
+        if resolved is None:
+            resolved = Cluster(cluster)
+            self._urls.set(cluster, resolved)
+        return resolved
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Возвращает описания именованных кластеров."""
+        return [cluster.describe() for cluster in self._clusters.values()]
+
+
+cluster_registry = ClusterRegistry(
+    clusters=config.CLUSTERS, cache_size=config.CLUSTER_URL_CACHE_SIZE
+)
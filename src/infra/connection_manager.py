@@ -1,61 +1,130 @@
-import hashlib
 import time
 from contextlib import contextmanager
 from threading import Lock
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, TypeVar
 
 from trino.auth import BasicAuthentication
 from trino.dbapi import connect
+from trino.exceptions import (
+    Http502Error,
+    Http503Error,
+    Http504Error,
+    TrinoConnectionError,
+)
 
+from src.core.config import config
 from src.core.logging import get_logger
-from src.core.utils.parse import parse_trino_jdbc
+from src.core.tracing import span, traced_lock
+from src.infra.cluster_registry import Cluster, cluster_registry
+from src.infra.endpoint_router import Endpoint, endpoint_router
+from src.infra.http_session import http_session_registry
 
 logger = get_logger(__name__)
 
+# Ошибки, означающие недоступность координатора, а не ошибку запроса
+ENDPOINT_ERRORS = (TrinoConnectionError, Http502Error, Http503Error, Http504Error)
+
+T = TypeVar("T")
+
 
 class ConnectionManager:
-    """Менеджер для управления множественными подключениями к Trino."""
+    """
+    Менеджер для управления множественными подключениями к Trino.
+
+    Для каждого JDBC URL держится пул подключений: подключение выдается
+    одному потребителю на время контекста get_connection и возвращается
+    в пул после него. Так параллельные запросы не делят состояние сессии
+    (USE catalog.schema, prepared statements) одного подключения.
 
-    def __init__(self, max_connections: int = 10, connection_ttl: int = 3600):
-        self._connections: Dict[str, Dict[str, Any]] = {}
+    Если в JDBC URL перечислено несколько координаторов, пул ведется
+    для каждого из них, а адрес для запроса выбирает endpoint_router.
+
+    Вместо JDBC URL можно передать имя кластера из cluster_registry;
+    его настройки (например, max_idle_connections) применяются к пулу.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        connection_ttl: int = 3600,
+        max_idle_per_cluster: int = 4,
+    ):
+        self._pools: Dict[str, Dict[str, Any]] = {}
         self._lock = Lock()
         self._max_connections = max_connections
         self._connection_ttl = connection_ttl
+        self._max_idle_per_cluster = max_idle_per_cluster
+
+    def _generate_connection_key(self, cluster: Cluster, endpoint: Endpoint) -> str:
+        """Генерирует уникальный ключ для кластера и адреса координатора."""
+        return f"{cluster.key}@{endpoint[0]}:{endpoint[1]}"
 
-    def _generate_connection_key(self, jdbc_url: str) -> str:
-        """Генерирует уникальный ключ для JDBC URL."""
-        return hashlib.sha256(jdbc_url.encode()).hexdigest()[:16]
+    def _idle_count(self) -> int:
+        return sum(len(pool["idle"]) for pool in self._pools.values())
 
     def _cleanup_expired_connections(self):
-        """Удаляет истекшие соединения."""
+        """Удаляет истекшие свободные соединения и пустые пулы."""
         current_time = time.time()
-        expired_keys = []
+        removed = False
 
-        for key, conn_info in self._connections.items():
-            if current_time - conn_info["created_at"] > self._connection_ttl:
-                expired_keys.append(key)
+        for key in list(self._pools):
+            pool = self._pools[key]
+            alive = [
+                conn_info
+                for conn_info in pool["idle"]
+                if current_time - conn_info["created_at"] <= self._connection_ttl
+            ]
+            removed = removed or len(alive) != len(pool["idle"])
+            pool["idle"] = alive
+            if not pool["idle"] and not pool["in_use"]:
+                del self._pools[key]
 
-        for key in expired_keys:
-            try:
-                self._connections[key]["connection"].close()
-            except Exception as e:
-                logger.warning(f"Error closing expired connection {key}: {e}")
-            finally:
-                del self._connections[key]
+        if removed:
+            self._discard_unused_sessions()
+
+    def _evict_oldest_idle(self):
+        """Вытесняет самое старое свободное соединение среди всех пулов."""
+        candidates = [
+            (conn_info["created_at"], key, conn_info)
+            for key, pool in self._pools.items()
+            for conn_info in pool["idle"]
+        ]
+        if not candidates:
+            return
+        _, key, conn_info = min(candidates, key=lambda item: item[0])
+        self._pools[key]["idle"].remove(conn_info)
+        self._discard_unused_sessions()
+
+    def _discard_unused_sessions(self):
+        """
+        Закрывает пулы HTTP соединений координаторов без кешированных
+        подключений.
+        """
+        http_session_registry.discard_unused(
+            {
+                pool["session_key"]
+                for pool in self._pools.values()
+                if pool["idle"] or pool["in_use"]
+            }
+        )
 
-    def _create_connection(self, jdbc_url: str):
+    def _create_connection(self, cluster: Cluster, endpoint: Endpoint):
         """
         Создает новое подключение к Trino.
-        :param jdbc_url: JDBC URL для подключения к Trino
-        :return: Объект подключения к Trino"""
+        :param cluster: Кластер Trino
+        :param endpoint: Адрес координатора (host, port)
+        :return: Объект подключения к Trino и ключ его пула HTTP соединений"""
         try:
-            conn_params = parse_trino_jdbc(jdbc_url)
+            conn_params = {**cluster.params, "host": endpoint[0], "port": endpoint[1]}
 
             connect_params = {
                 "host": conn_params["host"],
                 "port": conn_params["port"],
                 "user": conn_params["user"],
-                "http_scheme": "https" if conn_params["port"] == 443 else "http",
+                "http_scheme": conn_params["http_scheme"],
+                "verify": conn_params["verify"],
+                "http_session": http_session_registry.get_session(conn_params),
+                "encoding": cluster.encoding,
             }
 
             if conn_params.get("password"):
@@ -69,95 +138,219 @@ class ConnectionManager:
 
             connection = connect(**connect_params)
             logger.info(
-                f"Created new Trino connection to {conn_params['host']}:{conn_params['port']}"
+                "Created new Trino connection to %s:%s",
+                conn_params["host"],
+                conn_params["port"],
             )
-            return connection
+            return connection, http_session_registry.session_key(conn_params)
 
         except Exception as e:
-            logger.error(f"Failed to create connection with JDBC URL {jdbc_url}: {e}")
+            logger.error(
+                "Failed to create connection to %s (%s:%s): %s",
+                cluster.display_name,
+                endpoint[0],
+                endpoint[1],
+                e,
+            )
             raise
 
-    @contextmanager
-    def get_connection(self, jdbc_url: str):
+    def _checkout(
+        self, connection_key: str, cluster: Cluster, endpoint: Endpoint
+    ) -> Dict[str, Any]:
         """
-        Контекстный менеджер для получения подключения.
+        Берет свободное соединение из пула или создает новое.
 
-        :param jdbc_url: JDBC URL для подключения к Trino
-        :yields: connection: Объект подключения к Trino
+        Время проверочного запроса свободного соединения учитывается
+        как задержка координатора.
+
+        :param connection_key: Ключ пула
+        :param cluster: Кластер Trino
+        :param endpoint: Адрес координатора
+        :return: Информация о соединении
         """
-        connection_key = self._generate_connection_key(jdbc_url)
+        while True:
+            with traced_lock(self._lock, "pool.lock_wait"):
+                self._cleanup_expired_connections()
+                pool = self._pools.get(connection_key)
+                conn_info = pool["idle"].pop() if pool and pool["idle"] else None
+                if conn_info is not None:
+                    pool["in_use"] += 1
 
-        with self._lock:
-            self._cleanup_expired_connections()
+            if conn_info is None:
+                break
 
-            if connection_key in self._connections:
-                conn_info = self._connections[connection_key]
-                try:
+            try:
+                started = time.monotonic()
+                with span("pool.probe"):
                     cursor = conn_info["connection"].cursor()
                     cursor.execute("SELECT 1")
                     cursor.fetchall()
+                endpoint_router.record_latency(endpoint, time.monotonic() - started)
+                return conn_info
+            except Exception as e:
+                logger.warning("Cached connection %s is stale: %s", connection_key, e)
+                with self._lock:
+                    pool["in_use"] -= 1
 
-                    yield conn_info["connection"]
-                    return
-                except Exception as e:
-                    logger.warning(f"Cached connection {connection_key} is stale: {e}")
-                    try:
-                        conn_info["connection"].close()
-                    except Exception:
-                        pass
-                    del self._connections[connection_key]
-
-            if len(self._connections) >= self._max_connections:
-                oldest_key = min(
-                    self._connections.keys(),
-                    key=lambda k: self._connections[k]["created_at"],
-                )
-                try:
-                    self._connections[oldest_key]["connection"].close()
-                except Exception:
-                    pass
-                del self._connections[oldest_key]
-
-            connection = self._create_connection(jdbc_url)
-            self._connections[connection_key] = {
-                "connection": connection,
-                "created_at": time.time(),
-                "jdbc_url": jdbc_url,
-            }
+        with span("pool.connect"):
+            connection, session_key = self._create_connection(cluster, endpoint)
+        conn_info = {
+            "connection": connection,
+            "created_at": time.time(),
+            "catalog": connection.catalog,
+            "schema": connection.schema,
+        }
+        with traced_lock(self._lock, "pool.lock_wait"):
+            pool = self._pools.setdefault(
+                connection_key,
+                {
+                    "cluster": cluster,
+                    "endpoint": endpoint,
+                    "session_key": session_key,
+                    "idle": [],
+                    "in_use": 0,
+                },
+            )
+            pool["in_use"] += 1
+        return conn_info
 
+    def _release(self, connection_key: str, conn_info: Dict[str, Any], reuse: bool):
+        """
+        Возвращает соединение в пул.
+
+        Каталог и схема сессии сбрасываются к значениям из JDBC URL,
+        чтобы USE одного потребителя не влиял на следующего.
+
+        :param connection_key: Ключ пула
+        :param conn_info: Информация о соединении
+        :param reuse: Вернуть соединение в пул (False - отбросить)
+        """
+        client_session = conn_info["connection"]._client_session
+        client_session.catalog = conn_info["catalog"]
+        client_session.schema = conn_info["schema"]
+
+        with self._lock:
+            pool = self._pools[connection_key]
+            pool["in_use"] -= 1
+            max_idle = (
+                pool["cluster"].max_idle_connections or self._max_idle_per_cluster
+            )
+            if reuse and len(pool["idle"]) < max_idle:
+                if self._idle_count() >= self._max_connections:
+                    self._evict_oldest_idle()
+                pool["idle"].append(conn_info)
+            if not pool["idle"] and not pool["in_use"]:
+                del self._pools[connection_key]
+                self._discard_unused_sessions()
+
+    @contextmanager
+    def get_connection(self, jdbc_url: str, exclude: Iterable[Endpoint] = ()):
+        """
+        Контекстный менеджер для получения подключения.
+
+        :param jdbc_url: JDBC URL или имя кластера
+        :param exclude: Адреса координаторов, которые не нужно выбирать
+        :yields: connection: Объект подключения к Trino
+        """
+        cluster = cluster_registry.resolve(jdbc_url)
+        endpoint = endpoint_router.choose(cluster.endpoints, exclude)
+        connection_key = self._generate_connection_key(cluster, endpoint)
+        try:
+            with span(
+                "pool.checkout",
+                **{
+                    "trino.cluster": cluster.display_name,
+                    "trino.endpoint": f"{endpoint[0]}:{endpoint[1]}",
+                },
+            ):
+                conn_info = self._checkout(connection_key, cluster, endpoint)
+        except Exception:
+            endpoint_router.release(endpoint)
+            raise
+
+        reuse = True
         try:
-            yield connection
+            yield conn_info["connection"]
         except Exception as e:
-            logger.error(f"Error using connection {connection_key}: {e}")
+            logger.error("Error using connection %s: %s", connection_key, e)
+            if isinstance(e, ENDPOINT_ERRORS):
+                reuse = False
+                endpoint_router.mark_down(endpoint, e)
             raise
+        else:
+            endpoint_router.mark_up(endpoint)
+        finally:
+            endpoint_router.release(endpoint)
+            self._release(connection_key, conn_info, reuse)
+
+    def run_with_failover(self, jdbc_url: str, func: Callable[[Any], T]) -> T:
+        """
+        Выполняет идемпотентную операцию, повторяя ее на другом координаторе
+        логического кластера при ошибке соединения.
+
+        :param jdbc_url: JDBC URL или имя кластера
+        :param func: Операция, принимающая подключение
+        :return: Результат операции
+        """
+        endpoints = cluster_registry.resolve(jdbc_url).endpoints
+        tried = []
+        while True:
+            endpoint: Optional[Tuple[str, int]] = None
+            try:
+                with self.get_connection(jdbc_url, exclude=tried) as conn:
+                    endpoint = (conn.host, conn.port)
+                    return func(conn)
+            except ENDPOINT_ERRORS:
+                if endpoint is None or len(tried) + 1 >= len(endpoints):
+                    raise
+                tried.append(endpoint)
+                logger.warning(
+                    "Retrying on another endpoint after %s:%s failed",
+                    endpoint[0],
+                    endpoint[1],
+                )
 
     def close_all(self):
         """Закрывает все кешированные соединения."""
         with self._lock:
-            for conn_info in self._connections.values():
-                try:
-                    conn_info["connection"].close()
-                except Exception as e:
-                    logger.warning(f"Error closing connection: {e}")
-            self._connections.clear()
+            for pool in self._pools.values():
+                pool["idle"].clear()
+            http_session_registry.close_all()
 
     def get_stats(self) -> Dict[str, Any]:
         """Возвращает статистику по подключениям."""
         with self._lock:
+            now = time.time()
             return {
-                "active_connections": len(self._connections),
+                "active_connections": sum(
+                    pool["in_use"] for pool in self._pools.values()
+                ),
+                "idle_connections": self._idle_count(),
                 "max_connections": self._max_connections,
+                "max_idle_per_cluster": self._max_idle_per_cluster,
                 "connection_ttl": self._connection_ttl,
+                "http_pools": len(http_session_registry),
+                "endpoints": endpoint_router.get_stats(),
                 "connections": [
                     {
-                        "key": key[:8] + "...",
-                        "created_at": info["created_at"],
-                        "age_seconds": int(time.time() - info["created_at"]),
-                        "host": parse_trino_jdbc(info["jdbc_url"])["host"],
+                        "cluster": pool["cluster"].display_name,
+                        "host": pool["endpoint"][0],
+                        "port": pool["endpoint"][1],
+                        "in_use": pool["in_use"],
+                        "idle": len(pool["idle"]),
+                        "oldest_age_seconds": (
+                            int(now - min(c["created_at"] for c in pool["idle"]))
+                            if pool["idle"]
+                            else None
+                        ),
                     }
-                    for key, info in self._connections.items()
+                    for key, pool in self._pools.items()
                 ],
             }
 
 
-connection_manager = ConnectionManager()
+connection_manager = ConnectionManager(
+    max_connections=config.CONNECTION_POOL_SIZE,
+    connection_ttl=config.CONNECTION_TTL,
+    max_idle_per_cluster=config.CONNECTION_POOL_IDLE_PER_CLUSTER,
+)
@@ -0,0 +1,169 @@
+import random
+import time
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.core.config import config
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+Endpoint = Tuple[str, int]
+
+
+class EndpointRouter:
+    """
+    Выбор координатора логического кластера.
+
+    Для каждого адреса учитываются число выполняющихся запросов
+    и сглаженная задержка (EWMA) проверочных запросов. Выбирается
+    здоровый адрес с минимальной оценкой (outstanding + 1) * latency.
+    Адрес, на котором произошла ошибка соединения, исключается
+    на failure_cooldown секунд, после чего снова получает запросы
+    и возвращается в строй при первом успешном.
+    """
+
+    def __init__(self, ewma_alpha: float = 0.3, failure_cooldown: float = 30):
+        self._state: Dict[Endpoint, Dict[str, Any]] = {}
+        self._lock = Lock()
+        self._alpha = ewma_alpha
+        self._failure_cooldown = failure_cooldown
+
+    def _get_state(self, endpoint: Endpoint) -> Dict[str, Any]:
+        state = self._state.get(endpoint)
+        if state is None:
+            state = {
+                "outstanding": 0,
+                "latency": None,
+                "down_until": 0.0,
+                "failures": 0,
+                "last_error": None,
+            }
+            self._state[endpoint] = state
+        return state
+
+    def choose(
+        self, endpoints: List[Endpoint], exclude: Iterable[Endpoint] = ()
+    ) -> Endpoint:
+        """
+        Выбирает адрес для нового запроса и учитывает его как выполняющийся.
+
+        :param endpoints: Адреса координаторов кластера
+        :param exclude: Адреса, уже не ответившие на этот запрос
+        :return: Выбранный адрес
+        """
+        if len(endpoints) == 1:
+            with self._lock:
+                self._get_state(endpoints[0])["outstanding"] += 1
+            return endpoints[0]
+
+        exclude = set(exclude)
+        candidates = [e for e in endpoints if e not in exclude] or list(endpoints)
+
+        with self._lock:
+            now = time.monotonic()
+            states = {e: self._get_state(e) for e in candidates}
+            healthy = [e for e in candidates if states[e]["down_until"] <= now]
+
+            if healthy:
+                known = [
+                    states[e]["latency"]
+                    for e in healthy
+                    if states[e]["latency"] is not None
+                ]
+                default_latency = min(known) if known else 1.0
+                scores = {
+                    e: (states[e]["outstanding"] + 1)
+                    * (states[e]["latency"] or default_latency)
+                    for e in healthy
+                }
+                best = min(scores.values())
+                endpoint = random.choice([e for e in healthy if scores[e] == best])
+            else:
+                endpoint = min(candidates, key=lambda e: states[e]["down_until"])
+
+            states[endpoint]["outstanding"] += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint):
+        """
+        Отмечает завершение запроса на адресе.
+
+        :param endpoint: Адрес координатора
+        """
+        with self._lock:
+            state = self._get_state(endpoint)
+            state["outstanding"] = max(state["outstanding"] - 1, 0)
+
+    def record_latency(self, endpoint: Endpoint, seconds: float):
+        """
+        Учитывает задержку ответа адреса и отмечает его здоровым.
+
+        :param endpoint: Адрес координатора
+        :param seconds: Время ответа в секундах
+        """
+        with self._lock:
+            state = self._get_state(endpoint)
+            if state["latency"] is None:
+                state["latency"] = seconds
+            else:
+                state["latency"] += self._alpha * (seconds - state["latency"])
+            self._mark_up(endpoint, state)
+
+    def mark_up(self, endpoint: Endpoint):
+        """
+        Отмечает адрес здоровым после успешного запроса.
+
+        :param endpoint: Адрес координатора
+        """
+        with self._lock:
+            self._mark_up(endpoint, self._get_state(endpoint))
+
+    @staticmethod
+    def _mark_up(endpoint: Endpoint, state: Dict[str, Any]):
+        if state["failures"]:
+            logger.info("Trino endpoint %s:%s is back up", endpoint[0], endpoint[1])
+        state["down_until"] = 0.0
+        state["failures"] = 0
+
+    def mark_down(self, endpoint: Endpoint, error: Optional[Exception] = None):
+        """
+        Исключает адрес из выбора на время failure_cooldown.
+
+        :param endpoint: Адрес координатора
+        :param error: Ошибка соединения
+        """
+        with self._lock:
+            state = self._get_state(endpoint)
+            state["down_until"] = time.monotonic() + self._failure_cooldown
+            state["failures"] += 1
+            state["last_error"] = str(error) if error else None
+        logger.warning(
+            "Trino endpoint %s:%s is down: %s", endpoint[0], endpoint[1], error
+        )
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Возвращает состояние известных адресов."""
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "endpoint": f"{host}:{port}",
+                    "healthy": state["down_until"] <= now,
+                    "outstanding": state["outstanding"],
+                    "latency_ms": (
+                        round(state["latency"] * 1000, 2)
+                        if state["latency"] is not None
+                        else None
+                    ),
+                    "failures": state["failures"],
+                    "last_error": state["last_error"],
+                }
+                for (host, port), state in self._state.items()
+            ]
+
+
+endpoint_router = EndpointRouter(
+    ewma_alpha=config.ENDPOINT_LATENCY_EWMA_ALPHA,
+    failure_cooldown=config.ENDPOINT_FAILURE_COOLDOWN,
+)
@@ -0,0 +1,195 @@
+import socket
+import ssl
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from src.core.config import config
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class _TunedHTTPAdapter(HTTPAdapter):
+    """
+    HTTP адаптер с общим SSL контекстом и keep-alive опциями сокета.
+
+    Общий SSL контекст избавляет от повторной загрузки CA сертификатов
+    на каждое новое TLS соединение в пуле. Адаптер разделяется сессиями
+    нескольких подключений, поэтому Session.close() его не закрывает:
+    пул закрывает реестр через release().
+    """
+
+    def __init__(
+        self,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        socket_options: Optional[list] = None,
+        **kwargs,
+    ):
+        self._ssl_context = ssl_context
+        self._socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self._ssl_context is not None:
+            pool_kwargs["ssl_context"] = self._ssl_context
+        if self._socket_options is not None:
+            pool_kwargs["socket_options"] = self._socket_options
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def close(self):
+        pass
+
+    def release(self):
+        """Закрывает пул соединений адаптера."""
+        super().close()
+
+
+class HttpSessionRegistry:
+    """
+    Реестр пулов HTTP соединений, разделяемых подключениями к одному
+    координатору Trino.
+
+    Каждое подключение trino по умолчанию создает собственную
+    requests.Session со своим пулом, поэтому опрос statement-ов чаще
+    открывает новые TCP/TLS соединения. Реестр выдает каждому подключению
+    собственную сессию (trino хранит в ней заголовки подключения,
+    подготовленные выражения и авторизацию), но с общим настроенным
+    адаптером: TCP соединения пула переиспользуются всеми подключениями
+    к координатору.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 20,
+        compression: bool = True,
+        tcp_keepalive: bool = True,
+    ):
+        self._adapters: Dict[Tuple, _TunedHTTPAdapter] = {}
+        self._lock = Lock()
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._compression = compression
+        self._tcp_keepalive = tcp_keepalive
+
+    @staticmethod
+    def session_key(conn_params: Dict[str, Any]) -> Tuple:
+        """
+        Возвращает ключ общего пула соединений для параметров подключения.
+
+        Учетные данные в ключ не входят: они хранятся в сессии подключения
+        и передаются в заголовках каждого запроса.
+
+        :param conn_params: Параметры подключения из parse_trino_jdbc
+        :return: Ключ пула
+        """
+        return (
+            conn_params["http_scheme"],
+            conn_params["host"],
+            conn_params["port"],
+            conn_params["verify"],
+        )
+
+    def get_session(self, conn_params: Dict[str, Any]) -> requests.Session:
+        """
+        Создает HTTP сессию нового подключения с общим пулом соединений
+        координатора.
+
+        :param conn_params: Параметры подключения из parse_trino_jdbc
+        :return: Настроенная requests.Session
+        """
+        key = self.session_key(conn_params)
+        with self._lock:
+            adapter = self._adapters.get(key)
+            if adapter is None:
+                adapter = _TunedHTTPAdapter(
+                    ssl_context=self._create_ssl_context(conn_params["verify"]),
+                    socket_options=self._socket_options(),
+                    pool_connections=self._pool_connections,
+                    pool_maxsize=self._pool_maxsize,
+                )
+                self._adapters[key] = adapter
+                logger.info(
+                    "Created HTTP pool for %s://%s:%s",
+                    conn_params["http_scheme"],
+                    conn_params["host"],
+                    conn_params["port"],
+                )
+        return self._create_session(conn_params["verify"], adapter)
+
+    def _create_session(self, verify, adapter: HTTPAdapter) -> requests.Session:
+        """
+        Создает requests.Session с общим адаптером, keep-alive и сжатием.
+
+        :param verify: Настройка проверки TLS сертификата
+        :param adapter: Общий адаптер координатора
+        :return: Новая сессия
+        """
+        session = requests.Session()
+        session.verify = verify
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        session.headers["Connection"] = "keep-alive"
+        if not self._compression:
+            session.headers["Accept-Encoding"] = "identity"
+
+        return session
+
+    @staticmethod
+    def _create_ssl_context(verify) -> Optional[ssl.SSLContext]:
+        """
+        Создает SSL контекст, общий для всех соединений сессии.
+
+        При отключенной проверке сертификата контекст не создается:
+        urllib3 меняет verify_mode переданного контекста, что несовместимо
+        с check_hostname.
+
+        :param verify: Настройка проверки TLS сертификата
+        :return: SSL контекст или None
+        """
+        if verify is False:
+            return None
+        return ssl.create_default_context(
+            cafile=verify if isinstance(verify, str) else None
+        )
+
+    def _socket_options(self) -> Optional[list]:
+        """Возвращает опции сокета с TCP keep-alive."""
+        if not self._tcp_keepalive:
+            return None
+        return HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+
+    def discard_unused(self, used_keys: set):
+        """
+        Закрывает пулы координаторов, для которых не осталось подключений.
+
+        :param used_keys: Ключи пулов, которые еще используются
+        """
+        with self._lock:
+            for key in [k for k in self._adapters if k not in used_keys]:
+                try:
+                    self._adapters.pop(key).release()
+                except Exception as e:
+                    logger.warning("Error closing HTTP pool: %s", e)
+
+    def close_all(self):
+        """Закрывает все пулы HTTP соединений."""
+        self.discard_unused(set())
+
+    def __len__(self) -> int:
+        return len(self._adapters)
+
+
+http_session_registry = HttpSessionRegistry(
+    pool_connections=config.HTTP_POOL_CONNECTIONS,
+    pool_maxsize=config.HTTP_POOL_MAXSIZE,
+    compression=config.HTTP_COMPRESSION,
+    tcp_keepalive=config.HTTP_TCP_KEEPALIVE,
+)
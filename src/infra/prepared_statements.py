@@ -0,0 +1,134 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Sequence
+from weakref import WeakKeyDictionary
+
+from trino.exceptions import TrinoUserError
+
+from src.core.config import config
+from src.core.logging import get_logger
+from src.core.utils.sql import format_literal
+
+logger = get_logger(__name__)
+
+
+class PreparedStatementCache:
+    """
+    Кеш подготовленных выражений для подключений пула.
+
+    Подготовленное выражение живет в сессии Trino, а клиент trino
+    отправляет текст всех подготовленных выражений сессии в заголовке
+    каждого запроса. Поэтому на подключение хранится не больше
+    max_statements выражений суммарным размером не больше max_bytes
+    (самые давно использованные удаляются через DEALLOCATE PREPARE),
+    а слишком большие шаблоны выполняются без подготовки.
+    """
+
+    def __init__(self, max_statements: int = 16, max_bytes: int = 4096):
+        self._statements: "WeakKeyDictionary[Any, OrderedDict[str, str]]" = (
+            WeakKeyDictionary()
+        )
+        self._lock = Lock()
+        self._max_statements = max_statements
+        self._max_bytes = max_bytes
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+
+    def execute(self, connection, cursor, sql: str, parameters: Sequence[Any]) -> bool:
+        """
+        Выполняет запрос как EXECUTE подготовленного выражения.
+
+        :param connection: Подключение, в сессии которого хранится выражение
+        :param cursor: Курсор этого подключения
+        :param sql: Шаблон запроса с параметрами ?
+        :param parameters: Значения параметров
+        :return: False, если шаблон слишком велик для подготовки
+            (запрос не выполнен)
+        """
+        if not self._max_statements or len(sql.encode()) > self._max_bytes:
+            with self._lock:
+                self._bypassed += 1
+            return False
+
+        name = self._prepare(connection, cursor, sql)
+        statement = f"EXECUTE {name}"
+        if parameters:
+            statement += " USING " + ", ".join(format_literal(p) for p in parameters)
+
+        try:
+            cursor.execute(statement)
+        except TrinoUserError as e:
+            # Сессия могла потерять выражение (например, после переподключения)
+            if "not found" not in str(e).lower():
+                raise
+            with self._lock:
+                self._statements.get(connection, {}).pop(sql, None)
+            self._prepare(connection, cursor, sql)
+            cursor.execute(statement)
+        return True
+
+    def _prepare(self, connection, cursor, sql: str) -> str:
+        """
+        Возвращает имя подготовленного выражения, при необходимости
+        выполняя PREPARE.
+        """
+        name = "mcp_" + hashlib.sha256(sql.encode()).hexdigest()[:16]
+        with self._lock:
+            statements = self._statements.setdefault(connection, OrderedDict())
+            if sql in statements:
+                statements.move_to_end(sql)
+                self._hits += 1
+                return name
+            self._misses += 1
+
+            evicted = []
+            count = len(statements)
+            size = sum(len(s.encode()) for s in statements) + len(sql.encode())
+            for old_sql, old_name in statements.items():
+                if count < self._max_statements and size <= self._max_bytes:
+                    break
+                evicted.append((old_sql, old_name))
+                count -= 1
+                size -= len(old_sql.encode())
+
+        for old_sql, old_name in evicted:
+            # Выражение убирается из кеша только после DEALLOCATE: при ошибке
+            # оно остается в сессии и должно учитываться в лимитах
+            try:
+                cursor.execute(f"DEALLOCATE PREPARE {old_name}")
+                cursor.fetchall()
+            except TrinoUserError as e:
+                if "not found" not in str(e).lower():
+                    raise
+            with self._lock:
+                self._statements.get(connection, {}).pop(old_sql, None)
+
+        # Заголовок X-Trino-Added-Prepare приходит в финальном ответе
+        cursor.execute(f"PREPARE {name} FROM {sql}")
+        cursor.fetchall()
+
+        with self._lock:
+            self._statements.setdefault(connection, OrderedDict())[sql] = name
+        logger.debug("Prepared statement %s", name)
+        return name
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику кеша подготовленных выражений."""
+        with self._lock:
+            return {
+                "connections": len(self._statements),
+                "statements": sum(len(s) for s in self._statements.values()),
+                "max_statements_per_connection": self._max_statements,
+                "max_bytes_per_connection": self._max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "bypassed": self._bypassed,
+            }
+
+
+prepared_statement_cache = PreparedStatementCache(
+    max_statements=config.PREPARED_STATEMENTS_PER_CONNECTION,
+    max_bytes=config.PREPARED_STATEMENTS_MAX_BYTES,
+)
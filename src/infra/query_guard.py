@@ -0,0 +1,537 @@
+import json
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+from trino.exceptions import TrinoUserError
+
+from src.core.config import config
+from src.core.logging import get_logger
+from src.core.utils.sql import is_query, normalize_sql
+from src.core.utils.validate import validate_identifier
+from src.infra.cluster_registry import cluster_registry
+from src.infra.shared_cache import create_cache
+from src.infra.table_stats import table_stats_provider
+
+logger = get_logger(__name__)
+
+GUARD_ACTIONS = ("reject", "require_predicate", "sample")
+
+
+class QueryGuard:
+    """
+    Проверка стоимости запроса перед выполнением.
+
+    Оценка объема чтения берется из EXPLAIN (TYPE IO, FORMAT JSON) и
+    кешируется по нормализованному SQL. Если оценка для таблицы неизвестна,
+    используется закешированная статистика таблицы. При превышении порогов
+    запрос отклоняется, у агента запрашивается фильтр по партициям или к
+    тяжелым таблицам применяется TABLESAMPLE.
+
+    Пороги задаются в конфигурации и переопределяются для кластера
+    параметрами JDBC URL (guardMaxScanBytes, guardMaxScanRows, guardAction)
+    или настройками именованного кластера.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_scan_bytes: float = 0,
+        max_scan_rows: float = 0,
+        action: str = "reject",
+        cache_size: int = 1024,
+        cache_ttl: float = 300,
+    ):
+        self._enabled = enabled
+        self._max_scan_bytes = max_scan_bytes
+        self._max_scan_rows = max_scan_rows
+        self._action = action
+        self._cache = create_cache("query_guard", maxsize=cache_size, ttl=cache_ttl)
+
+    def thresholds(self, jdbc_url: str) -> Dict[str, Any]:
+        """
+        Возвращает пороги для кластера с учетом его переопределений.
+
+        :param jdbc_url: JDBC URL или имя кластера
+        :return: Пороги и действие при их превышении
+        """
+        overrides = cluster_registry.resolve(jdbc_url).guard
+        action = overrides.get("guard_action", self._action)
+        if action not in GUARD_ACTIONS:
+            raise ValueError(
+                f"параметр guardAction должен быть одним из: {', '.join(GUARD_ACTIONS)}."
+            )
+        return {
+            "max_scan_bytes": float(
+                overrides.get("guard_max_scan_bytes", self._max_scan_bytes)
+            ),
+            "max_scan_rows": float(
+                overrides.get("guard_max_scan_rows", self._max_scan_rows)
+            ),
+            "action": action,
+        }
+
+    def check(
+        self,
+        connection,
+        jdbc_url: str,
+        sql: str,
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Оценивает запрос и решает, можно ли его выполнять.
+
+        Подключение должно находиться в том же контексте (USE catalog.schema),
+        в котором будет выполнен запрос.
+
+        :param connection: Подключение к Trino
+        :param jdbc_url: JDBC URL для подключения к Trino
+        :param sql: SQL запрос
+        :param catalog: Каталог по умолчанию
+        :param schema: Схема по умолчанию
+        :return: Решение: action (allow/reject/require_predicate/sample),
+            sql для выполнения, оценка и причина
+        """
+        if not self._enabled or not is_query(sql):
+            return {"action": "allow", "sql": sql}
+
+        thresholds = self.thresholds(jdbc_url)
+        if not thresholds["max_scan_bytes"] and not thresholds["max_scan_rows"]:
+            return {"action": "allow", "sql": sql}
+
+        key = (jdbc_url, catalog, schema, normalize_sql(sql))
+        estimate = self._cache.get(key)
+        if estimate is None:
+            try:
+                estimate = self._estimate(connection.cursor(), jdbc_url, sql)
+            except TrinoUserError as e:
+                # Запрос с ошибкой упадет и при выполнении с понятным сообщением
+                logger.debug("EXPLAIN failed, skipping guard: %s", e)
+                return {"action": "allow", "sql": sql}
+            self._cache.set(
+                key, estimate, ttl=cluster_registry.resolve(jdbc_url).guard_cache_ttl
+            )
+
+        params = cluster_registry.resolve(jdbc_url).params
+        return self._decide(
+            sql,
+            estimate,
+            thresholds,
+            catalog or params.get("catalog"),
+            schema or params.get("schema"),
+        )
+
+    def _estimate(self, cursor, jdbc_url: str, sql: str) -> Dict[str, Any]:
+        """
+        Получает оценку чтения по таблицам из EXPLAIN (TYPE IO).
+
+        :return: Суммарные оценки и оценки по таблицам
+        """
+        cursor.execute(f"EXPLAIN (TYPE IO, FORMAT JSON) {sql}")
+        plan = json.loads(cursor.fetchone()[0])
+
+        tables = []
+        for info in plan.get("inputTableColumnInfos", []):
+            table = info.get("table", {})
+            schema_table = table.get("schemaTable", {})
+            name = ".".join(
+                [
+                    table.get("catalog", ""),
+                    schema_table.get("schema", ""),
+                    schema_table.get("table", ""),
+                ]
+            )
+            estimate = info.get("estimate", {})
+            constraint = info.get("constraint", {})
+            entry = {
+                "table": name,
+                "rows": _finite(estimate.get("outputRowCount")),
+                "bytes": _finite(estimate.get("outputSizeInBytes")),
+                "has_predicate": bool(constraint.get("columnConstraints"))
+                or bool(constraint.get("none")),
+                "source": "explain",
+            }
+            if (entry["rows"] is None or entry["bytes"] is None) and (
+                validate_identifier(name, allow_qualified=True)
+            ):
+                self._fill_from_table_stats(jdbc_url, entry)
+            tables.append(entry)
+
+        return {
+            "rows": _sum_known(t["rows"] for t in tables),
+            "bytes": _sum_known(t["bytes"] for t in tables),
+            "tables": tables,
+        }
+
+    @staticmethod
+    def _fill_from_table_stats(jdbc_url: str, entry: Dict[str, Any]):
+        """
+        Дополняет неизвестную оценку статистикой таблицы (без фильтров).
+
+        :param jdbc_url: JDBC URL для подключения к Trino
+        :param entry: Оценка по таблице
+        """
+        try:
+            stats = table_stats_provider.get(jdbc_url, entry["table"])
+        except TrinoUserError as e:
+            logger.debug("No stats for %s: %s", entry["table"], e)
+            return
+
+        rows = stats.get("row_count") or stats.get("row_count_estimate")
+        size = stats.get("data_size_bytes") or stats.get("data_size_estimate")
+        if entry["rows"] is None and rows is not None:
+            entry["rows"] = rows
+            entry["source"] = "table_stats"
+        if entry["bytes"] is None and size is not None:
+            entry["bytes"] = size
+            entry["source"] = "table_stats"
+        entry["partition_columns"] = stats.get("partition_columns")
+
+    def _decide(
+        self,
+        sql: str,
+        estimate: Dict[str, Any],
+        thresholds: Dict[str, Any],
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Принимает решение по оценке и порогам.
+
+        Если TABLESAMPLE нельзя применить однозначно, у агента
+        запрашивается фильтр по партициям, а при его наличии запрос
+        отклоняется.
+
+        :param catalog: Каталог сессии для неполных имен таблиц
+        :param schema: Схема сессии для неполных имен таблиц
+        :return: Решение guard
+        """
+        offending = [
+            table
+            for table in estimate["tables"]
+            if _exceeds(
+                table, thresholds["max_scan_bytes"], thresholds["max_scan_rows"]
+            )
+        ]
+        totals_exceed = _exceeds(
+            estimate, thresholds["max_scan_bytes"], thresholds["max_scan_rows"]
+        )
+        decision = {"estimate": estimate, "thresholds": thresholds}
+
+        if not offending and not totals_exceed:
+            return {"action": "allow", "sql": sql, **decision}
+
+        action = thresholds["action"]
+        if action == "sample" and offending:
+            rewritten = self._apply_tablesample(
+                sql, offending, thresholds, catalog, schema
+            )
+            if rewritten is not None:
+                return {
+                    "action": "sample",
+                    "sql": rewritten,
+                    "reason": "Запрос превышает порог чтения, применен TABLESAMPLE",
+                    **decision,
+                }
+
+        if action in ("require_predicate", "sample"):
+            unfiltered = [t for t in offending if not t["has_predicate"]]
+            if unfiltered:
+                return {
+                    "action": "require_predicate",
+                    "sql": sql,
+                    "reason": (
+                        "Запрос читает таблицы целиком сверх порога. Добавьте фильтр "
+                        "по партициям для: "
+                        + ", ".join(_describe_table_hint(table) for table in unfiltered)
+                    ),
+                    **decision,
+                }
+
+        return {
+            "action": "reject",
+            "sql": sql,
+            "reason": (
+                f"Оценка чтения ({_format_estimate(estimate)}) превышает порог "
+                f"({_format_estimate(_threshold_estimate(thresholds))})"
+            ),
+            **decision,
+        }
+
+    @staticmethod
+    def _apply_tablesample(
+        sql: str,
+        offending: List[Dict[str, Any]],
+        thresholds: Dict[str, Any],
+        catalog: Optional[str] = None,
+        schema: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Добавляет TABLESAMPLE SYSTEM к ссылкам на тяжелые таблицы.
+
+        Процент выборки подбирается так, чтобы оценка чтения уложилась
+        в порог. Переписываются только ссылки после FROM/JOIN (и в списке
+        FROM через запятую), которые с учетом каталога и схемы сессии
+        совпадают с полным именем таблицы из плана EXPLAIN. Литералы,
+        комментарии и имена CTE пропускаются. Если ссылку нельзя
+        сопоставить однозначно (идентификатор в кавычках, неизвестный
+        контекст для неполного имени, алиас со списком колонок, период
+        FOR TIMESTAMP|VERSION AS OF) или ни
+        одна ссылка на таблицу не найдена, возвращается None.
+
+        :return: Переписанный SQL или None
+        """
+        percents = {}
+        for table in offending:
+            percent = 100.0
+            for metric, limit in (
+                ("bytes", thresholds["max_scan_bytes"]),
+                ("rows", thresholds["max_scan_rows"]),
+            ):
+                if limit and table[metric]:
+                    percent = min(percent, 100.0 * limit / table[metric])
+            percents[table["table"].lower()] = max(round(percent, 4), 0.0001)
+
+        tokens = _tokenize(sql)
+        ctes = _cte_names(tokens)
+        insertions: List[tuple] = []
+        found = set()
+
+        i = 0
+        while i < len(tokens):
+            kind, text, _, _ = tokens[i]
+            i += 1
+            if kind != "word" or text.upper() not in ("FROM", "JOIN"):
+                continue
+            if _is_expression_from(tokens, i - 1):
+                continue
+            in_from_list = text.upper() == "FROM"
+            while True:
+                reference = _read_reference(tokens, i)
+                if reference is None:
+                    break
+                parts, quoted, i = reference
+                name = _qualify_reference(parts, ctes, catalog, schema)
+                # FOR TIMESTAMP|VERSION AS OF <выражение> стоит перед
+                # TABLESAMPLE, а конец выражения без разбора не найти
+                has_period = i < len(tokens) and tokens[i][1].upper() == "FOR"
+                alias_end, i, ambiguous = _skip_alias(tokens, i)
+
+                last = parts[-1].lower()
+                if quoted or name is False:
+                    # Имя в кавычках или без контекста сессии: сопоставить
+                    # с таблицей плана однозначно нельзя
+                    if any(key.rsplit(".", 1)[-1] == last for key in percents):
+                        return None
+                elif name in percents:
+                    if ambiguous or has_period:
+                        return None
+                    already_sampled = (
+                        i < len(tokens) and tokens[i][1].upper() == "TABLESAMPLE"
+                    )
+                    if not already_sampled:
+                        insertions.append((alias_end, percents[name]))
+                    found.add(name)
+
+                if not (in_from_list and i < len(tokens) and tokens[i][1] == ","):
+                    break
+                i += 1
+
+        if set(percents) - found:
+            return None
+        for position, percent in sorted(insertions, reverse=True):
+            sql = f"{sql[:position]} TABLESAMPLE SYSTEM ({percent}){sql[position:]}"
+        return sql
+
+
+_GUARD_TOKEN_PATTERN = re.compile(
+    r"""(?P<skip>\s+|--[^\n]*|/\*.*?\*/)"""
+    r"""|(?P<literal>'(?:[^']|'')*')"""
+    r"""|(?P<quoted>"(?:[^"]|"")*")"""
+    r"""|(?P<word>[A-Za-z_][\w$@]*)"""
+    r"""|(?P<other>\d[\w.]*|.)""",
+    re.DOTALL,
+)
+
+# Слова, которые не могут быть алиасом таблицы
+_RELATION_KEYWORDS = {
+    "WHERE", "JOIN", "ON", "USING", "GROUP", "ORDER", "LIMIT", "OFFSET",
+    "FETCH", "INNER", "LEFT", "RIGHT", "FULL", "OUTER", "CROSS", "NATURAL",
+    "UNION", "EXCEPT", "INTERSECT", "TABLESAMPLE", "HAVING", "WINDOW",
+    "MATCH_RECOGNIZE", "FOR", "LATERAL", "UNNEST", "WITH", "SELECT", "FROM",
+    "VALUES", "AS", "QUALIFY",
+}  # fmt: skip
+
+
+# Функции, в аргументах которых встречается FROM
+_FROM_FUNCTIONS = {"EXTRACT", "SUBSTRING", "TRIM", "POSITION", "OVERLAY"}
+
+
+def _tokenize(sql: str) -> List[tuple]:
+    """Токены SQL без пробелов и комментариев: (вид, текст, начало, конец)."""
+    return [
+        (match.lastgroup, match.group(), match.start(), match.end())
+        for match in _GUARD_TOKEN_PATTERN.finditer(sql)
+        if match.lastgroup != "skip"
+    ]
+
+
+def _is_expression_from(tokens: List[tuple], i: int) -> bool:
+    """
+    FROM внутри выражения (IS DISTINCT FROM, EXTRACT(... FROM ...) и т.п.),
+    а не в предложении FROM.
+    """
+    if (
+        i >= 2
+        and tokens[i - 1][1].upper() == "DISTINCT"
+        and tokens[i - 2][1].upper() in ("IS", "NOT")
+    ):
+        return True
+    depth = 0
+    for j in range(i - 1, 0, -1):
+        text = tokens[j][1]
+        if text == ")":
+            depth += 1
+        elif text == "(":
+            if depth == 0:
+                return tokens[j - 1][1].upper() in _FROM_FUNCTIONS
+            depth -= 1
+    return False
+
+
+def _cte_names(tokens: List[tuple]) -> set:
+    """Имена CTE: идентификатор перед AS ( после WITH, RECURSIVE или запятой."""
+    names = set()
+    for i in range(1, len(tokens) - 2):
+        previous = tokens[i - 1][1].upper()
+        if (
+            previous in ("WITH", "RECURSIVE", ",")
+            and tokens[i][0] in ("word", "quoted")
+            and tokens[i + 1][1].upper() == "AS"
+            and tokens[i + 2][1] == "("
+        ):
+            names.add(tokens[i][1].strip('"').lower())
+    return names
+
+
+def _read_reference(tokens: List[tuple], i: int) -> Optional[tuple]:
+    """
+    Читает имя таблицы (части через точку) начиная с токена i.
+
+    :return: (части имени, есть ли части в кавычках, следующий индекс)
+        или None, если на позиции не имя таблицы
+    """
+    parts: List[str] = []
+    quoted = False
+    while i < len(tokens):
+        kind, text, _, _ = tokens[i]
+        if kind == "quoted":
+            quoted = True
+            parts.append(text[1:-1].replace('""', '"'))
+        elif kind == "word" and (parts or text.upper() not in _RELATION_KEYWORDS):
+            parts.append(text)
+        else:
+            break
+        i += 1
+        if i < len(tokens) and tokens[i][1] == ".":
+            i += 1
+            continue
+        break
+    if not parts or len(parts) > 3:
+        return None
+    return parts, quoted, i
+
+
+def _qualify_reference(
+    parts: List[str], ctes: set, catalog: Optional[str], schema: Optional[str]
+):
+    """
+    Полное имя ссылки в нижнем регистре.
+
+    :return: Имя, None для CTE или False, если контекст сессии неизвестен
+    """
+    parts = [part.lower() for part in parts]
+    if len(parts) == 1 and parts[0] in ctes:
+        return None
+    if len(parts) < 3 and not catalog:
+        return False
+    if len(parts) == 1 and not schema:
+        return False
+    prefix = [catalog.lower(), (schema or "").lower()][: 3 - len(parts)]
+    return ".".join(prefix + parts)
+
+
+def _skip_alias(tokens: List[tuple], i: int) -> tuple:
+    """
+    Пропускает алиас таблицы ([AS] alias).
+
+    :return: (позиция конца ссылки с алиасом в тексте, следующий индекс,
+        есть ли у алиаса список колонок)
+    """
+    end = tokens[i - 1][3]
+    if i < len(tokens) and tokens[i][1].upper() == "AS":
+        i += 1
+    if i < len(tokens) and (
+        tokens[i][0] == "quoted"
+        or (tokens[i][0] == "word" and tokens[i][1].upper() not in _RELATION_KEYWORDS)
+    ):
+        end = tokens[i][3]
+        i += 1
+    ambiguous = i < len(tokens) and tokens[i][1] == "("
+    return end, i, ambiguous
+
+
+def _finite(value) -> Optional[float]:
+    """Возвращает число или None для NaN/отсутствующих оценок."""
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) or math.isinf(value) else value
+
+
+def _sum_known(values) -> Optional[float]:
+    """Суммирует известные значения; None, если известных нет."""
+    known = [value for value in values if value is not None]
+    return sum(known) if known else None
+
+
+def _exceeds(estimate: Dict[str, Any], max_bytes: float, max_rows: float) -> bool:
+    """Проверяет превышение хотя бы одного порога."""
+    return bool(
+        (max_bytes and (estimate.get("bytes") or 0) > max_bytes)
+        or (max_rows and (estimate.get("rows") or 0) > max_rows)
+    )
+
+
+def _threshold_estimate(thresholds: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "bytes": thresholds["max_scan_bytes"] or None,
+        "rows": thresholds["max_scan_rows"] or None,
+    }
+
+
+def _format_estimate(estimate: Dict[str, Any]) -> str:
+    parts = []
+    if estimate.get("bytes") is not None:
+        parts.append(f"{estimate['bytes'] / 1024 ** 3:.2f} GiB")
+    if estimate.get("rows") is not None:
+        parts.append(f"{int(estimate['rows'])} rows")
+    return ", ".join(parts) or "unknown"
+
+
+def _describe_table_hint(table: Dict[str, Any]) -> str:
+    partition_columns = table.get("partition_columns")
+    if partition_columns:
+        return f"{table['table']} (партиции: {', '.join(partition_columns)})"
+    return table["table"]
+
+
+query_guard = QueryGuard(
+    enabled=config.GUARD_ENABLED,
+    max_scan_bytes=config.GUARD_MAX_SCAN_BYTES,
+    max_scan_rows=config.GUARD_MAX_SCAN_ROWS,
+    action=config.GUARD_ACTION,
+    cache_size=config.GUARD_CACHE_SIZE,
+    cache_ttl=config.GUARD_CACHE_TTL,
+)
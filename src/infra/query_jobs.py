@@ -0,0 +1,333 @@
+import contextvars
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from src.core.config import config
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+JOB_STATES = ("QUEUED", "RUNNING", "FINISHED", "FAILED", "CANCELLED")
+FINAL_STATES = ("FINISHED", "FAILED", "CANCELLED")
+
+
+class QueryJob:
+    """
+    Фоновый запрос: состояние, курсор для прогресса и сохраненный результат.
+    """
+
+    def __init__(self, jdbc_url: str, sql: str):
+        self.job_id = uuid.uuid4().hex
+        self.jdbc_url = jdbc_url
+        self.sql = sql
+        self.state = "QUEUED"
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.result_bytes = 0
+        self.error: Optional[str] = None
+        self.cancel_requested = False
+        self.cursor = None
+        self.future: Optional[Future] = None
+        self._final_stats: Dict[str, Any] = {}
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINAL_STATES
+
+    def attach_cursor(self, cursor):
+        """
+        Запоминает курсор перед выполнением запроса.
+
+        :param cursor: Курсор, на котором будет выполнен запрос
+        """
+        if self.cancel_requested:
+            raise RuntimeError("Query job was cancelled")
+        self.cursor = cursor
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Возвращает прогресс по статистике Trino.
+
+        Статистика обновляется клиентом trino при каждом опросе
+        координатора, поэтому читается напрямую из курсора.
+
+        :return: Состояние запроса в Trino, доля завершенных сплитов и объем
+        """
+        stats = self._final_stats
+        if self.cursor is not None:
+            try:
+                stats = self.cursor.stats or stats
+            except Exception:
+                pass
+
+        total_splits = stats.get("totalSplits") or 0
+        completed_splits = stats.get("completedSplits") or 0
+        return {
+            "query_id": stats.get("queryId"),
+            "trino_state": stats.get("state"),
+            "percent": (
+                round(100.0 * completed_splits / total_splits, 1)
+                if total_splits
+                else None
+            ),
+            "completed_splits": completed_splits,
+            "total_splits": total_splits,
+            "processed_rows": stats.get("processedRows"),
+            "processed_bytes": stats.get("processedBytes"),
+            "elapsed_ms": stats.get("elapsedTimeMillis"),
+        }
+
+    def release_cursor(self):
+        """Сохраняет финальную статистику и освобождает курсор."""
+        if self.cursor is not None:
+            try:
+                self._final_stats = dict(self.cursor.stats or {})
+            except Exception:
+                pass
+            self.cursor = None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Возвращает статус задачи без результата.
+
+        :return: Состояние, время и прогресс
+        """
+        now = self.finished_at or time.time()
+        status = {
+            "job_id": self.job_id,
+            "state": self.state,
+            "sql": self.sql,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": (
+                round(now - self.started_at, 3) if self.started_at else None
+            ),
+            "progress": self.progress(),
+        }
+        if self.error:
+            status["error"] = self.error
+        if self.state == "FINISHED" and self.result is not None:
+            status["row_count"] = self.result.get("row_count")
+            status["result_bytes"] = self.result_bytes
+        return status
+
+
+class QueryJobManager:
+    """
+    Менеджер фоновых запросов.
+
+    Запросы выполняются в пуле потоков (не более max_running одновременно),
+    остальные ждут в очереди. Таблица задач ограничена max_jobs: при
+    переполнении вытесняются самые старые завершенные задачи. Результаты
+    хранятся не дольше retention секунд после завершения, а их суммарный
+    размер ограничен max_result_bytes.
+    """
+
+    def __init__(
+        self,
+        max_jobs: int = 100,
+        max_running: int = 4,
+        retention: float = 3600,
+        max_result_bytes: int = 256 * 1024 * 1024,
+    ):
+        self._jobs: "OrderedDict[str, QueryJob]" = OrderedDict()
+        self._lock = Lock()
+        self._max_jobs = max_jobs
+        self._max_running = max_running
+        self._retention = retention
+        self._max_result_bytes = max_result_bytes
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_running, thread_name_prefix="query-job"
+            )
+        return self._executor
+
+    def submit(
+        self,
+        jdbc_url: str,
+        sql: str,
+        runner: Callable[..., Dict[str, Any]],
+    ) -> QueryJob:
+        """
+        Ставит запрос в очередь на фоновое выполнение.
+
+        :param jdbc_url: JDBC URL для подключения к Trino
+        :param sql: SQL запрос
+        :param runner: Функция выполнения запроса, принимающая on_cursor
+            и возвращающая результат
+        :return: Созданная задача
+        """
+        job = QueryJob(jdbc_url, sql)
+        with self._lock:
+            self._cleanup(make_room=True)
+            if len(self._jobs) >= self._max_jobs:
+                raise ValueError(
+                    f"Достигнут лимит фоновых запросов ({self._max_jobs}), "
+                    "дождитесь завершения или отмените запросы."
+                )
+            self._jobs[job.job_id] = job
+            # request_id вызова submit_query сохраняется в логах задачи
+            job.future = self._get_executor().submit(
+                contextvars.copy_context().run, self._run, job, runner
+            )
+
+        logger.info("Submitted query job %s", job.job_id)
+        return job
+
+    def _run(self, job: QueryJob, runner: Callable[..., Dict[str, Any]]):
+        """Выполняет задачу в потоке пула."""
+        with self._lock:
+            if job.cancel_requested:
+                return
+            job.state = "RUNNING"
+            job.started_at = time.time()
+
+        try:
+            result = runner(on_cursor=job.attach_cursor)
+        except Exception as e:
+            result = {"error": str(e)}
+
+        with self._lock:
+            job.release_cursor()
+            job.finished_at = time.time()
+            if job.cancel_requested:
+                job.state = "CANCELLED"
+            elif "error" in result:
+                job.state = "FAILED"
+                job.error = result["error"]
+            else:
+                job.state = "FINISHED"
+                job.result = result
+                job.result_bytes = len(str(result))
+                self._enforce_result_budget()
+
+        logger.info("Query job %s %s", job.job_id, job.state.lower())
+
+    def get(self, job_id: str) -> QueryJob:
+        """
+        Возвращает задачу по идентификатору.
+
+        :param job_id: Идентификатор задачи
+        :return: Задача
+        """
+        with self._lock:
+            self._cleanup()
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Query job not found or expired: {job_id}")
+        return job
+
+    def cancel(self, job_id: str) -> QueryJob:
+        """
+        Отменяет задачу: ожидающая снимается с очереди, выполняющаяся
+        отменяется в Trino.
+
+        :param job_id: Идентификатор задачи
+        :return: Задача
+        """
+        job = self.get(job_id)
+        with self._lock:
+            if job.finished:
+                return job
+            job.cancel_requested = True
+            if job.state == "QUEUED":
+                job.future.cancel()
+                job.state = "CANCELLED"
+                job.finished_at = time.time()
+                return job
+            cursor = job.cursor
+
+        if cursor is not None:
+            try:
+                cursor.cancel()
+            except Exception as e:
+                logger.warning("Error cancelling query job %s: %s", job_id, e)
+        return job
+
+    def _cleanup(self, make_room: bool = False):
+        """
+        Удаляет задачи, срок хранения которых истек. Вызывается под lock.
+
+        :param make_room: Вытеснить самые старые завершенные задачи,
+            чтобы освободить место под новую
+        """
+        now = time.time()
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self._retention
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+        if not make_room:
+            return
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        while len(self._jobs) >= self._max_jobs and finished:
+            del self._jobs[finished.pop(0)]
+
+    def _enforce_result_budget(self):
+        """
+        Освобождает результаты самых старых задач сверх общего лимита размера.
+        Вызывается под lock.
+        """
+        total = sum(job.result_bytes for job in self._jobs.values())
+        for job in self._jobs.values():
+            if total <= self._max_result_bytes:
+                return
+            if job.result is not None:
+                total -= job.result_bytes
+                job.result = None
+                job.result_bytes = 0
+                job.error = "Result evicted: retention size limit exceeded"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику задач.
+
+        :return: Количество задач по состояниям и объем результатов
+        """
+        with self._lock:
+            self._cleanup()
+            states = {state: 0 for state in JOB_STATES}
+            for job in self._jobs.values():
+                states[job.state] += 1
+            return {
+                "jobs": len(self._jobs),
+                "max_jobs": self._max_jobs,
+                "max_running": self._max_running,
+                "states": states,
+                "result_bytes": sum(job.result_bytes for job in self._jobs.values()),
+                "max_result_bytes": self._max_result_bytes,
+            }
+
+    def shutdown(self):
+        """Отменяет все незавершенные задачи и останавливает пул."""
+        with self._lock:
+            job_ids = [job_id for job_id, job in self._jobs.items() if not job.finished]
+        for job_id in job_ids:
+            try:
+                self.cancel(job_id)
+            except KeyError:
+                pass
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+query_job_manager = QueryJobManager(
+    max_jobs=config.QUERY_JOBS_MAX,
+    max_running=config.QUERY_JOBS_MAX_RUNNING,
+    retention=config.QUERY_JOBS_RETENTION,
+    max_result_bytes=config.QUERY_JOBS_MAX_RESULT_BYTES,
+)
@@ -0,0 +1,224 @@
+import atexit
+import os
+import shutil
+import tempfile
+import time
+from multiprocessing.connection import Client, Listener
+from threading import Lock, Thread, local
+from typing import Any, Dict, Hashable, Optional
+
+from src.core.config import config
+from src.core.logging import get_logger
+from src.core.utils.cache import TTLCache
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+_RETRY_INTERVAL = 30.0
+
+
+class CacheStoreServer:
+    """
+    Общее хранилище кешей для воркеров сервера.
+
+    Работает в родительском процессе и принимает подключения воркеров
+    по unix сокету (сообщения pickle с проверкой authkey). Каждое
+    пространство имен - отдельный TTLCache, размер и время жизни
+    задает клиент при первом обращении.
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self._listener = Listener(address, family="AF_UNIX", authkey=authkey)
+        self._caches: Dict[str, TTLCache] = {}
+        self._lock = Lock()
+
+    def serve_forever(self):
+        """Принимает подключения, каждое обслуживается отдельным потоком."""
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return
+            except Exception as e:
+                logger.warning("Rejected cache store connection: %s", e)
+                continue
+            Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def close(self):
+        self._listener.close()
+
+    def _cache(self, namespace: str, maxsize: int, ttl: Optional[float]) -> TTLCache:
+        cache = self._caches.get(namespace)
+        if cache is None:
+            with self._lock:
+                cache = self._caches.setdefault(namespace, TTLCache(maxsize, ttl))
+        return cache
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    op, namespace, maxsize, ttl, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    cache = self._cache(namespace, maxsize, ttl)
+                    if op == "get":
+                        result = cache.get(args[0], _MISSING)
+                        result = (False, None) if result is _MISSING else (True, result)
+                    elif op == "set":
+                        result = cache.set(*args)
+                    elif op == "pop":
+                        result = cache.pop(args[0], _MISSING)
+                        result = (False, None) if result is _MISSING else (True, result)
+                    elif op == "clear":
+                        result = cache.clear()
+                    elif op == "len":
+                        result = len(cache)
+                    elif op == "stats":
+                        result = cache.stats()
+                    else:
+                        raise ValueError(f"неизвестная операция хранилища: {op}.")
+                    conn.send((True, result))
+                except Exception as e:
+                    conn.send((False, str(e)))
+
+
+class SharedTTLCache:
+    """
+    Кеш с интерфейсом TTLCache, хранящийся в CacheStoreServer.
+
+    У каждого потока свое подключение к хранилищу. Если хранилище
+    недоступно, кеш временно работает как локальный TTLCache и
+    повторяет подключение через 30 секунд.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        address: str,
+        authkey: bytes,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+    ):
+        self._namespace = namespace
+        self._address = address
+        self._authkey = authkey
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._local = local()
+        self._fallback = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._unavailable_until = 0.0
+
+    def _call(self, op: str, *args: Any) -> Any:
+        if time.monotonic() < self._unavailable_until:
+            raise ConnectionError("cache store unavailable")
+        conn = getattr(self._local, "conn", None)
+        try:
+            if conn is None:
+                conn = Client(self._address, family="AF_UNIX", authkey=self._authkey)
+                self._local.conn = conn
+            conn.send((op, self._namespace, self._maxsize, self._ttl, args))
+            ok, result = conn.recv()
+        except (OSError, EOFError) as e:
+            self._local.conn = None
+            self._unavailable_until = time.monotonic() + _RETRY_INTERVAL
+            logger.warning(
+                "Cache store %s unavailable, using local cache: %s", self._address, e
+            )
+            raise ConnectionError(str(e)) from e
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            found, value = self._call("get", key)
+        except ConnectionError:
+            return self._fallback.get(key, default)
+        return value if found else default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        try:
+            self._call("set", key, value, ttl)
+        except ConnectionError:
+            self._fallback.set(key, value, ttl)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            found, value = self._call("pop", key)
+        except ConnectionError:
+            return self._fallback.pop(key, default)
+        return value if found else default
+
+    def clear(self):
+        self._fallback.clear()
+        try:
+            self._call("clear")
+        except ConnectionError:
+            pass
+
+    def __len__(self) -> int:
+        try:
+            return self._call("len")
+        except ConnectionError:
+            return len(self._fallback)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            stats = self._call("stats")
+        except ConnectionError:
+            return {**self._fallback.stats(), "shared": False}
+        return {**stats, "shared": True}
+
+
+def create_cache(namespace: str, maxsize: int = 1024, ttl: Optional[float] = None):
+    """
+    Создает кеш: общий для воркеров, если задан CACHE_STORE_ADDRESS,
+    иначе локальный TTLCache процесса.
+
+    :param namespace: Имя кеша в хранилище
+    :param maxsize: Максимальное количество записей
+    :param ttl: Время жизни записи в секундах
+    :return: Кеш с интерфейсом TTLCache
+    """
+    if not config.CACHE_STORE_ADDRESS:
+        return TTLCache(maxsize=maxsize, ttl=ttl)
+    return SharedTTLCache(
+        namespace,
+        config.CACHE_STORE_ADDRESS,
+        bytes.fromhex(config.CACHE_STORE_AUTHKEY),
+        maxsize=maxsize,
+        ttl=ttl,
+    )
+
+
+def _remove_cache_store(server: CacheStoreServer, directory: str):
+    """Закрывает хранилище и удаляет каталог его сокета."""
+    try:
+        server.close()
+    except OSError as e:
+        logger.debug("Error closing cache store: %s", e)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def start_cache_store() -> CacheStoreServer:
+    """
+    Запускает хранилище в фоновом потоке текущего процесса и передает
+    его адрес и ключ воркерам через переменные окружения. При выходе
+    процесса хранилище закрывается, а сокет и временный каталог удаляются.
+
+    :return: Запущенное хранилище
+    """
+    directory = tempfile.mkdtemp(prefix="trino-mcp-")
+    address = os.path.join(directory, "cache.sock")
+    authkey = os.urandom(32)
+    server = CacheStoreServer(address, authkey)
+    Thread(target=server.serve_forever, name="cache-store", daemon=True).start()
+    atexit.register(_remove_cache_store, server, directory)
+
+    os.environ["CACHE_STORE_ADDRESS"] = address
+    os.environ["CACHE_STORE_AUTHKEY"] = authkey.hex()
+    logger.info("Shared cache store listening on %s", address)
+    return server
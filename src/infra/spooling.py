@@ -0,0 +1,197 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+from trino.client import (
+    CompressedQueryDataDecoderFactory,
+    DecodableSegment,
+    SegmentDecoder,
+    SpooledSegment,
+)
+from trino.dbapi import SegmentCursor
+from trino.mapper import RowMapperFactory
+
+from src.core.config import config
+from src.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def open_cursor(connection):
+    """
+    Открывает курсор для чтения результата запроса.
+
+    Если на подключении задана кодировка spooling протокола, возвращается
+    SegmentCursor, отдающий сегменты без скачивания. Иначе - обычный курсор.
+
+    :param connection: Подключение к Trino
+    :return: Курсор
+    """
+    try:
+        return connection.cursor("segment")
+    except ValueError:
+        # Кодировка spooling протокола на подключении не задана
+        return connection.cursor()
+
+
+def iter_rows(cursor, limit: int) -> Iterator[List[Any]]:
+    """
+    Итерирует не более limit строк результата.
+
+    Для SegmentCursor сегменты скачиваются и декодируются параллельно,
+    а чтение прекращается сразу после набора limit строк.
+
+    :param cursor: Курсор после execute
+    :param limit: Максимальное количество строк
+    :yields: Строки результата
+    """
+    if not isinstance(cursor, SegmentCursor):
+        yield from islice(iter(cursor.fetchone, None), limit)
+        return
+
+    if limit <= 0:
+        return
+
+    reader = SpooledRowReader(cursor, max_rows=limit)
+    count = 0
+    try:
+        for row in reader:
+            yield row
+            count += 1
+            if count >= limit:
+                break
+    finally:
+        reader.close()
+
+    if count >= limit:
+        cursor.cancel()
+
+
+def fetch_rows(cursor, limit: int) -> List[List[Any]]:
+    """
+    Читает не более limit строк результата.
+
+    :param cursor: Курсор после execute
+    :param limit: Максимальное количество строк
+    :return: Список строк
+    """
+    if not isinstance(cursor, SegmentCursor):
+        return cursor.fetchmany(limit)
+    return list(iter_rows(cursor, limit))
+
+
+class SpooledRowReader:
+    """
+    Итератор строк результата, полученного по spooling протоколу.
+
+    Сегменты скачиваются с опережением в пуле потоков (не более
+    max_workers сегментов одновременно), декодируются там же и отдаются
+    в исходном порядке. После чтения сегмент подтверждается (ack).
+    Сегменты сверх max_rows (по rowsCount из метаданных) не запрашиваются.
+
+    Если сервер не поддерживает spooling протокол, курсор возвращает
+    обычные строки - они отдаются как есть.
+    """
+
+    def __init__(
+        self,
+        cursor: SegmentCursor,
+        max_workers: Optional[int] = None,
+        max_rows: Optional[int] = None,
+    ):
+        self._cursor = cursor
+        self._rows_left = max_rows
+        self._max_workers = max_workers or config.SPOOLING_FETCH_WORKERS
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        self._items = iter(cursor.fetchone, None)
+        self._pending: deque = deque()
+        self._decoders: Dict[str, SegmentDecoder] = {}
+        self._mapper = None
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        try:
+            while True:
+                self._fill_window()
+                if not self._pending:
+                    return
+
+                item, future = self._pending.popleft()
+                yield from future.result()
+
+                if isinstance(item, DecodableSegment) and isinstance(
+                    item.segment, SpooledSegment
+                ):
+                    item.segment.acknowledge()
+        finally:
+            self.close()
+
+    def close(self):
+        """Останавливает скачивание сегментов, которые еще не начаты."""
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fill_window(self):
+        """Ставит в очередь скачивание следующих сегментов до размера окна."""
+        while len(self._pending) < self._max_workers:
+            if self._rows_left is not None and self._rows_left <= 0:
+                return
+
+            item = next(self._items, None)
+            if item is None:
+                return
+
+            if isinstance(item, DecodableSegment):
+                decoder = self._decoder(item.encoding)
+                future = self._executor.submit(decoder.decode, item.segment)
+            else:
+                future = Future()
+                future.set_result([item])
+            self._pending.append((item, future))
+
+            if self._rows_left is not None:
+                self._rows_left -= self._rows_count(item)
+
+    @staticmethod
+    def _rows_count(item) -> int:
+        """
+        Возвращает число строк в элементе курсора.
+
+        :param item: Сегмент или обычная строка
+        :return: Число строк (для сегмента без метаданных - 0)
+        """
+        if isinstance(item, DecodableSegment):
+            return item.segment.metadata.get("rowsCount", 0)
+        return 1
+
+    def _decoder(self, encoding: str) -> SegmentDecoder:
+        """
+        Возвращает декодер сегментов для кодировки.
+
+        Вызывается в потоке чтения: создание маппера может обратиться
+        к координатору за описанием колонок.
+
+        :param encoding: Кодировка сегмента
+        :return: Декодер, скачивающий и декодирующий сегмент
+        """
+        decoder = self._decoders.get(encoding)
+        if decoder is None:
+            decoder = SegmentDecoder(
+                CompressedQueryDataDecoderFactory(self._row_mapper()).create(encoding)
+            )
+            self._decoders[encoding] = decoder
+        return decoder
+
+    def _row_mapper(self):
+        """
+        Создает маппер значений по колонкам результата.
+
+        trino не предоставляет публичного доступа к сырым описаниям колонок
+        (typeSignature), поэтому они берутся из запроса курсора
+        (версия клиента закреплена в зависимостях).
+        """
+        if self._mapper is None:
+            self._mapper = RowMapperFactory().create(
+                columns=self._cursor._query.columns, legacy_primitive_types=False
+            )
+        return self._mapper
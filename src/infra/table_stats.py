@@ -0,0 +1,160 @@
+import time
+from typing import Any, Dict
+
+from trino.exceptions import TrinoUserError
+
+from src.core.config import config
+from src.core.logging import get_logger
+from src.infra.cluster_registry import cluster_registry
+from src.infra.connection_manager import connection_manager
+from src.infra.shared_cache import create_cache
+
+logger = get_logger(__name__)
+
+
+class TableStatsProvider:
+    """
+    Получает статистику и размер таблиц с кешированием.
+
+    Источники: SHOW STATS FOR (оценки оптимизатора), а для Hive/Iceberg -
+    служебные таблицы $partitions и $files (точное число файлов, строк
+    и объем данных без сканирования самой таблицы).
+    """
+
+    def __init__(self, cache_size: int = 1024, cache_ttl: float = 600):
+        self._cache = create_cache("table_stats", maxsize=cache_size, ttl=cache_ttl)
+
+    def get(
+        self,
+        jdbc_url: str,
+        table_path: str,
+        include_partitions: bool = True,
+        refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Возвращает статистику таблицы, по возможности из кеша.
+
+        :param jdbc_url: JDBC URL для подключения к Trino
+        :param table_path: Провалидированное имя таблицы (catalog.schema.table)
+        :param include_partitions: Запрашивать $partitions/$files
+        :param refresh: Игнорировать кеш
+        :return: Статистика таблицы
+        """
+        key = (jdbc_url, table_path.lower(), include_partitions)
+        if not refresh:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return {**cached, "cached": True}
+
+        def collect(conn):
+            cursor = conn.cursor()
+            stats = self._show_stats(cursor, table_path)
+            if include_partitions:
+                stats.update(self._partition_info(cursor, table_path))
+            return stats
+
+        stats = connection_manager.run_with_failover(jdbc_url, collect)
+
+        stats["collected_at"] = time.time()
+        self._cache.set(
+            key, stats, ttl=cluster_registry.resolve(jdbc_url).table_stats_cache_ttl
+        )
+        return {**stats, "cached": False}
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику кеша."""
+        return self._cache.stats()
+
+    @staticmethod
+    def _show_stats(cursor, table_path: str) -> Dict[str, Any]:
+        """
+        Разбирает результат SHOW STATS FOR.
+
+        Строка с column_name = NULL содержит итоговое число строк таблицы.
+
+        :param cursor: Курсор Trino
+        :param table_path: Имя таблицы
+        :return: Оценки числа строк, объема и статистика колонок
+        """
+        cursor.execute(f"SHOW STATS FOR {table_path}")
+
+        row_count = None
+        columns = {}
+        for row in cursor.fetchall():
+            (
+                column_name,
+                data_size,
+                distinct_count,
+                nulls_fraction,
+                rows,
+                low_value,
+                high_value,
+            ) = row[:7]
+            if column_name is None:
+                row_count = rows
+                continue
+            columns[column_name] = {
+                "data_size": data_size,
+                "distinct_values_count": distinct_count,
+                "nulls_fraction": nulls_fraction,
+                "low_value": low_value,
+                "high_value": high_value,
+            }
+
+        sizes = [c["data_size"] for c in columns.values() if c["data_size"] is not None]
+        return {
+            "row_count_estimate": row_count,
+            "data_size_estimate": sum(sizes) if sizes else None,
+            "column_stats": columns,
+        }
+
+    @staticmethod
+    def _partition_info(cursor, table_path: str) -> Dict[str, Any]:
+        """
+        Читает служебные таблицы $partitions и $files.
+
+        Таблицы существуют только у части коннекторов (Hive, Iceberg, Delta),
+        поэтому ошибки их чтения не считаются ошибкой статистики.
+
+        :param cursor: Курсор Trino
+        :param table_path: Имя таблицы
+        :return: Число партиций, ключи партиционирования и данные файлов
+        """
+        prefix, table = table_path.rsplit(".", 1)
+        info: Dict[str, Any] = {}
+
+        try:
+            cursor.execute(f'SELECT * FROM {prefix}."{table}$partitions" LIMIT 0')
+            cursor.fetchall()
+            description = {desc[0]: desc[1] for desc in cursor.description or []}
+
+            cursor.execute(f'SELECT count(*) FROM {prefix}."{table}$partitions"')
+            info["partition_count"] = cursor.fetchone()[0]
+            if "partition" in description and "record_count" in description:
+                # Iceberg: ключи партиционирования - поля колонки partition
+                info["partition_spec"] = description["partition"]
+            else:
+                info["partition_columns"] = list(description)
+        except TrinoUserError as e:
+            logger.debug("No $partitions table for %s: %s", table_path, e)
+
+        try:
+            cursor.execute(
+                "SELECT count(*), sum(record_count), sum(file_size_in_bytes) "
+                f'FROM {prefix}."{table}$files"'
+            )
+            file_count, record_count, size = cursor.fetchone()
+            info.update(
+                file_count=file_count,
+                row_count=record_count,
+                data_size_bytes=size,
+            )
+        except TrinoUserError as e:
+            logger.debug("No $files table for %s: %s", table_path, e)
+
+        return info
+
+
+table_stats_provider = TableStatsProvider(
+    cache_size=config.TABLE_STATS_CACHE_SIZE, cache_ttl=config.TABLE_STATS_CACHE_TTL
+)
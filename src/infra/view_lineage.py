@@ -0,0 +1,326 @@
+import hashlib
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.config import config
+from src.core.ddl_analyzer import ddl_analyzer
+from src.core.logging import get_logger
+from src.core.utils.sql import format_literal, split_qualified_name
+from src.infra.cluster_registry import cluster_registry
+from src.infra.connection_manager import connection_manager
+
+logger = get_logger(__name__)
+
+LINEAGE_DIRECTIONS = ("upstream", "downstream", "both")
+
+
+def _definition_hash(definition: Optional[str]) -> str:
+    """Хеш текста представления, совпадающий с to_hex(md5(to_utf8(...))) Trino."""
+    return hashlib.md5((definition or "").encode()).hexdigest().upper()
+
+
+def _qualify(name: str, catalog: str, schema: str) -> Optional[str]:
+    """
+    Дополняет ссылку из текста представления его каталогом и схемой.
+
+    :return: Полное имя или None, если ссылка не разбирается
+    """
+    parts = split_qualified_name(name)
+    if not parts or len(parts) > 3:
+        return None
+    return ".".join([catalog, schema][: 3 - len(parts)] + parts)
+
+
+class _CatalogViews:
+    """Представления одного каталога: хеши текстов и ребра графа."""
+
+    def __init__(self):
+        self.hashes: Dict[str, str] = {}
+        self.upstream: Dict[str, Set[str]] = {}
+        self.downstream: Dict[str, Set[str]] = {}
+        self.loaded_at = 0.0
+
+    def apply(self, view: str, digest: str, references: Set[str]):
+        self.remove(view)
+        self.hashes[view] = digest
+        self.upstream[view] = references
+        for reference in references:
+            self.downstream.setdefault(reference, set()).add(view)
+
+    def copy(self) -> "_CatalogViews":
+        copied = _CatalogViews()
+        copied.hashes = dict(self.hashes)
+        copied.upstream = {view: set(refs) for view, refs in self.upstream.items()}
+        copied.downstream = {ref: set(views) for ref, views in self.downstream.items()}
+        return copied
+
+    def remove(self, view: str):
+        self.hashes.pop(view, None)
+        for reference in self.upstream.pop(view, ()):
+            views = self.downstream.get(reference)
+            if views is not None:
+                views.discard(view)
+                if not views:
+                    del self.downstream[reference]
+
+
+class ViewLineageIndex:
+    """
+    Граф зависимостей представлений каталога.
+
+    Тексты всех представлений каталога читаются одним запросом
+    к information_schema.views, ссылки разбираются один раз
+    (DDLAnalyzer.extract_query_references), после чего upstream и
+    downstream объекта - обход графа в памяти без запросов к кластеру.
+
+    По истечении ttl индекс обновляется инкрементально: запрашиваются
+    только хеши текстов (md5 на стороне Trino), заново читаются и
+    разбираются лишь новые и измененные представления. Изменения
+    применяются к копии индекса, которая затем заменяет текущий, так
+    что параллельные обходы графа не видят частично обновленный индекс.
+    """
+
+    def __init__(self, ttl: float = 600, fetch_batch_size: int = 500):
+        self._ttl = ttl
+        self._fetch_batch_size = fetch_batch_size
+        self._catalogs: Dict[Tuple[str, str], _CatalogViews] = {}
+        self._locks: Dict[Tuple[str, str], Lock] = {}
+        self._lock = Lock()
+        self._full_loads = 0
+        self._incremental_refreshes = 0
+        self._definitions_parsed = 0
+
+    def ensure(
+        self, jdbc_url: str, catalog: str, refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Загружает или обновляет индекс каталога.
+
+        :param jdbc_url: JDBC URL или имя кластера
+        :param catalog: Провалидированное имя каталога
+        :param refresh: Обновить индекс, даже если ttl не истек
+        :return: Способ обновления (cached, full, incremental) и изменения
+        """
+        catalog = catalog.lower()
+        key = (cluster_registry.resolve(jdbc_url).key, catalog)
+        with self._lock:
+            lock = self._locks.setdefault(key, Lock())
+
+        with lock:
+            state = self._catalogs.get(key)
+            if state is not None and not refresh:
+                if time.monotonic() - state.loaded_at < self._ttl:
+                    return {"catalog": catalog, "mode": "cached"}
+
+            if state is None:
+                info = self._load(jdbc_url, catalog, key)
+            else:
+                info = self._refresh(jdbc_url, catalog, key, state)
+            return {"catalog": catalog, **info}
+
+    def lineage(
+        self,
+        jdbc_url: str,
+        catalogs: Iterable[str],
+        name: str,
+        direction: str = "both",
+        max_depth: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Возвращает зависимости объекта по загруженным индексам каталогов.
+
+        :param jdbc_url: JDBC URL или имя кластера
+        :param catalogs: Каталоги, представления которых учитываются
+        :param name: Полное имя объекта (catalog.schema.name)
+        :param direction: upstream, downstream или both
+        :param max_depth: Глубина обхода (None - без ограничения)
+        :return: Объекты выше и ниже по графу с глубиной
+        """
+        if direction not in LINEAGE_DIRECTIONS:
+            raise ValueError(f"неизвестное направление обхода: {direction}.")
+
+        cluster_key = cluster_registry.resolve(jdbc_url).key
+        states = [
+            self._catalogs[(cluster_key, catalog.lower())]
+            for catalog in catalogs
+            if (cluster_key, catalog.lower()) in self._catalogs
+        ]
+        name = name.lower()
+        is_view = any(name in state.hashes for state in states)
+
+        def upstream(node: str) -> Set[str]:
+            return set().union(*(state.upstream.get(node, ()) for state in states))
+
+        def downstream(node: str) -> Set[str]:
+            return set().union(*(state.downstream.get(node, ()) for state in states))
+
+        result: Dict[str, Any] = {
+            "name": name,
+            "is_view": is_view,
+            "views_indexed": sum(len(state.hashes) for state in states),
+        }
+        for walk, edges in (("upstream", upstream), ("downstream", downstream)):
+            if direction in (walk, "both"):
+                result[walk] = [
+                    {
+                        "name": node,
+                        "depth": depth,
+                        "is_view": any(node in state.hashes for state in states),
+                    }
+                    for node, depth in self._walk(name, edges, max_depth)
+                ]
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает размер индекса и счетчики обновлений."""
+        with self._lock:
+            states = list(self._catalogs.values())
+        return {
+            "catalogs": len(states),
+            "views": sum(len(state.hashes) for state in states),
+            "full_loads": self._full_loads,
+            "incremental_refreshes": self._incremental_refreshes,
+            "definitions_parsed": self._definitions_parsed,
+        }
+
+    def _load(
+        self, jdbc_url: str, catalog: str, key: Tuple[str, str]
+    ) -> Dict[str, Any]:
+        """Читает тексты всех представлений каталога одним запросом."""
+        rows = self._fetch(
+            jdbc_url,
+            "SELECT table_schema, table_name, view_definition "
+            f"FROM {catalog}.information_schema.views",
+        )
+        state = _CatalogViews()
+        self._parse(state, catalog, rows)
+        state.loaded_at = time.monotonic()
+        with self._lock:
+            self._catalogs[key] = state
+            self._full_loads += 1
+        logger.info("Indexed %s views of catalog %s", len(state.hashes), catalog)
+        return {"mode": "full", "views": len(state.hashes), "queries": 1}
+
+    def _refresh(
+        self,
+        jdbc_url: str,
+        catalog: str,
+        key: Tuple[str, str],
+        state: _CatalogViews,
+    ) -> Dict[str, Any]:
+        """
+        Сравнивает хеши текстов с индексом и перечитывает только новые
+        и измененные представления.
+        """
+        rows = self._fetch(
+            jdbc_url,
+            "SELECT table_schema, table_name, to_hex(md5(to_utf8(view_definition))) "
+            f"FROM {catalog}.information_schema.views",
+        )
+        current = {
+            f"{catalog}.{schema}.{table}".lower(): d for schema, table, d in rows
+        }
+        removed = set(state.hashes) - set(current)
+        stale = [
+            (schema, table)
+            for schema, table, digest in rows
+            if state.hashes.get(f"{catalog}.{schema}.{table}".lower()) != digest
+        ]
+        added = sum(
+            1
+            for schema, table in stale
+            if f"{catalog}.{schema}.{table}".lower() not in state.hashes
+        )
+
+        queries = 1
+        if stale or removed:
+            state = state.copy()
+        for start in range(0, len(stale), self._fetch_batch_size):
+            by_schema: Dict[str, List[str]] = {}
+            for schema, table in stale[start : start + self._fetch_batch_size]:
+                by_schema.setdefault(schema, []).append(table)
+            condition = " OR ".join(
+                f"(table_schema = {format_literal(schema)} AND table_name IN "
+                f"({', '.join(format_literal(table) for table in tables)}))"
+                for schema, tables in by_schema.items()
+            )
+            self._parse(
+                state,
+                catalog,
+                self._fetch(
+                    jdbc_url,
+                    "SELECT table_schema, table_name, view_definition "
+                    f"FROM {catalog}.information_schema.views WHERE {condition}",
+                ),
+            )
+            queries += 1
+
+        for view in removed:
+            state.remove(view)
+        state.loaded_at = time.monotonic()
+        with self._lock:
+            self._catalogs[key] = state
+            self._incremental_refreshes += 1
+        logger.debug(
+            "Refreshed views of catalog %s: %s stale, %s removed",
+            catalog,
+            len(stale),
+            len(removed),
+        )
+        return {
+            "mode": "incremental",
+            "views": len(state.hashes),
+            "added": added,
+            "changed": len(stale) - added,
+            "removed": len(removed),
+            "queries": queries,
+        }
+
+    def _parse(self, state: _CatalogViews, catalog: str, rows: List[List[Any]]):
+        """Разбирает ссылки представлений и добавляет их в граф."""
+        for schema, table, definition in rows:
+            references = {
+                _qualify(reference, catalog, schema.lower())
+                for reference in ddl_analyzer.extract_query_references(definition or "")
+            }
+            references.discard(None)
+            view = f"{catalog}.{schema}.{table}".lower()
+            state.apply(view, _definition_hash(definition), references)
+        with self._lock:
+            self._definitions_parsed += len(rows)
+
+    @staticmethod
+    def _fetch(jdbc_url: str, sql: str) -> List[List[Any]]:
+        def fetch(conn):
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            return cursor.fetchall()
+
+        return connection_manager.run_with_failover(jdbc_url, fetch)
+
+    @staticmethod
+    def _walk(
+        start: str, edges: Callable[[str], Set[str]], max_depth: Optional[int]
+    ) -> List[Tuple[str, int]]:
+        """Обход графа в ширину: (объект, глубина) без повторов и циклов."""
+        seen = {start: 0}
+        frontier = [start]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for neighbour in sorted(edges(node)):
+                    if neighbour not in seen:
+                        seen[neighbour] = depth
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        del seen[start]
+        return sorted(seen.items(), key=lambda item: (item[1], item[0]))
+
+
+view_lineage_index = ViewLineageIndex(
+    ttl=config.VIEW_LINEAGE_CACHE_TTL,
+    fetch_batch_size=config.VIEW_LINEAGE_FETCH_BATCH_SIZE,
+)
@@ -0,0 +1,378 @@
+import atexit
+import hashlib
+import os
+import queue
+import sqlite3
+import time
+from threading import Event, Lock, Thread
+from typing import Any, Dict, List, Optional
+
+from src.core.config import config
+from src.core.logging import get_logger
+from src.core.utils.sql import fingerprint_sql
+from src.infra.cluster_registry import cluster_registry
+
+logger = get_logger(__name__)
+
+REPORT_ORDERS = {
+    "elapsed": "total_elapsed_ms",
+    "cpu": "total_cpu_ms",
+    "bytes": "total_processed_bytes",
+    "rows": "total_processed_rows",
+    "calls": "calls",
+    "errors": "errors",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    fingerprint TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    first_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queries (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    tool TEXT NOT NULL,
+    cluster TEXT,
+    fingerprint TEXT NOT NULL,
+    sql TEXT NOT NULL,
+    query_id TEXT,
+    elapsed_ms REAL,
+    queued_ms REAL,
+    cpu_ms REAL,
+    processed_rows INTEGER,
+    processed_bytes INTEGER,
+    peak_memory_bytes INTEGER,
+    row_count INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS queries_ts ON queries (ts);
+CREATE INDEX IF NOT EXISTS queries_fingerprint ON queries (fingerprint, ts);
+"""
+
+
+class WorkloadHistory:
+    """
+    Журнал выполненных запросов в локальной базе SQLite.
+
+    Инструменты только кладут запись в очередь, запись в базу выполняет
+    фоновый поток пачками в одной транзакции, поэтому журнал не
+    добавляет задержки к запросам. При переполнении очереди записи
+    отбрасываются (счетчик dropped). Запросы группируются по отпечатку
+    (SQL без литералов), текст отпечатка хранится один раз.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        enabled: bool = True,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+        retention_days: float = 30,
+        max_sql_length: int = 4096,
+    ):
+        self.path = path
+        self.enabled = enabled and bool(path)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._batch_size = batch_size
+        self._retention_days = retention_days
+        self._max_sql_length = max_sql_length
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+        self._recorded = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+
+    def record(
+        self,
+        tool: str,
+        jdbc_url: str,
+        sql: str,
+        elapsed_ms: float,
+        cursor=None,
+        row_count: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        """
+        Добавляет выполненный запрос в журнал (без блокировки).
+
+        :param tool: Инструмент, выполнивший запрос
+        :param jdbc_url: JDBC URL или имя кластера
+        :param sql: SQL запрос
+        :param elapsed_ms: Время выполнения на стороне сервера MCP
+        :param cursor: Курсор запроса: из него берутся query id и статистика Trino
+        :param row_count: Число возвращенных строк
+        :param error: Текст ошибки
+        """
+        if not self.enabled:
+            return
+
+        stats: Dict[str, Any] = {}
+        query_id = None
+        if cursor is not None:
+            try:
+                stats = cursor.stats or {}
+                query_id = cursor.query_id
+            except Exception:
+                pass
+
+        entry = (
+            time.time(),
+            tool,
+            _cluster_name(jdbc_url),
+            sql,
+            query_id or stats.get("queryId"),
+            round(elapsed_ms, 3),
+            stats.get("queuedTimeMillis"),
+            stats.get("cpuTimeMillis"),
+            stats.get("processedRows"),
+            stats.get("processedBytes"),
+            stats.get("peakMemoryBytes"),
+            row_count,
+            error[:1000] if error else None,
+        )
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return
+        with self._lock:
+            self._recorded += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Дожидается записи в базу всех записей, добавленных до вызова.
+
+        :param timeout: Максимальное время ожидания в секундах
+        :return: True, если записи сохранены
+        """
+        if not self.enabled or self._thread is None:
+            return True
+        done = Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def report(
+        self,
+        since_hours: float = 24,
+        tool: Optional[str] = None,
+        cluster: Optional[str] = None,
+        order_by: str = "elapsed",
+        limit: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        Агрегирует журнал по отпечаткам запросов.
+
+        :param since_hours: Период отчета в часах (0 - весь журнал)
+        :param tool: Только запросы этого инструмента
+        :param cluster: Только запросы этого кластера (имя или JDBC URL)
+        :param order_by: Сортировка: elapsed, cpu, bytes, rows, calls, errors
+        :param limit: Количество отпечатков в отчете
+        :return: Итоги периода и самые затратные отпечатки
+        """
+        if order_by not in REPORT_ORDERS:
+            raise ValueError(f"неизвестная сортировка отчета: {order_by}.")
+        if not self.enabled:
+            raise ValueError("журнал запросов отключен (WORKLOAD_HISTORY_ENABLED).")
+
+        self.flush()
+        conditions = []
+        params: List[Any] = []
+        if since_hours:
+            conditions.append("q.ts >= ?")
+            params.append(time.time() - since_hours * 3600)
+        if tool:
+            conditions.append("q.tool = ?")
+            params.append(tool)
+        if cluster:
+            conditions.append("q.cluster = ?")
+            params.append(_cluster_name(cluster))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        if not os.path.exists(self.path):
+            return {"totals": {"calls": 0}, "top_fingerprints": []}
+
+        with self._connect() as db:
+            db.row_factory = sqlite3.Row
+            totals = db.execute(
+                f"""
+                SELECT count(*) AS calls,
+                       count(q.error) AS errors,
+                       count(DISTINCT q.fingerprint) AS fingerprints,
+                       sum(q.elapsed_ms) AS total_elapsed_ms,
+                       sum(q.cpu_ms) AS total_cpu_ms,
+                       sum(q.processed_rows) AS total_processed_rows,
+                       sum(q.processed_bytes) AS total_processed_bytes,
+                       min(q.ts) AS first_ts,
+                       max(q.ts) AS last_ts
+                FROM queries q {where}
+                """,
+                params,
+            ).fetchone()
+            rows = db.execute(
+                f"""
+                SELECT q.fingerprint,
+                       f.text AS fingerprint_text,
+                       count(*) AS calls,
+                       count(q.error) AS errors,
+                       group_concat(DISTINCT q.tool) AS tools,
+                       sum(q.elapsed_ms) AS total_elapsed_ms,
+                       avg(q.elapsed_ms) AS avg_elapsed_ms,
+                       max(q.elapsed_ms) AS max_elapsed_ms,
+                       sum(q.cpu_ms) AS total_cpu_ms,
+                       sum(q.processed_rows) AS total_processed_rows,
+                       sum(q.processed_bytes) AS total_processed_bytes,
+                       max(q.peak_memory_bytes) AS max_peak_memory_bytes,
+                       sum(q.row_count) AS total_returned_rows,
+                       max(q.ts) AS last_seen,
+                       max(q.id) AS last_id
+                FROM queries q JOIN fingerprints f USING (fingerprint)
+                {where}
+                GROUP BY q.fingerprint
+                ORDER BY {REPORT_ORDERS[order_by]} DESC NULLS LAST
+                LIMIT ?
+                """,
+                params + [limit],
+            ).fetchall()
+
+            top = []
+            for row in rows:
+                item = dict(row)
+                last = db.execute(
+                    "SELECT sql, query_id, error FROM queries WHERE id = ?",
+                    (item.pop("last_id"),),
+                ).fetchone()
+                item["avg_elapsed_ms"] = round(item["avg_elapsed_ms"] or 0, 3)
+                item["error_rate"] = round(item["errors"] / item["calls"], 4)
+                item["last_sql"] = last["sql"]
+                item["last_query_id"] = last["query_id"]
+                if last["error"]:
+                    item["last_error"] = last["error"]
+                top.append(item)
+
+        return {
+            "since_hours": since_hours or None,
+            "order_by": order_by,
+            "totals": dict(totals),
+            "top_fingerprints": top,
+            "recorder": self.get_stats(),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает счетчики журнала."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "path": os.path.abspath(self.path) if self.path else None,
+                "recorded": self._recorded,
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "queued": self._queue.qsize(),
+            }
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._write_loop, name="workload-history", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.flush, 2.0)
+
+    def _write_loop(self):
+        """Фоновый поток: записывает очередь в базу пачками."""
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            db = self._connect()
+            db.executescript(_SCHEMA)
+            if self._retention_days:
+                db.execute(
+                    "DELETE FROM queries WHERE ts < ?",
+                    (time.time() - self._retention_days * 86400,),
+                )
+                db.commit()
+        except Exception as e:
+            logger.error("Workload history disabled, cannot open %s: %s", self.path, e)
+            self.enabled = False
+            db = None
+
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries = [item for item in batch if not isinstance(item, Event)]
+            if entries and db is not None:
+                try:
+                    self._write(db, entries)
+                    with self._lock:
+                        self._written += len(entries)
+                except Exception as e:
+                    logger.warning("Error writing workload history: %s", e)
+                    with self._lock:
+                        self._failed += len(entries)
+            for item in batch:
+                if isinstance(item, Event):
+                    item.set()
+
+    def _write(self, db: sqlite3.Connection, entries: List[tuple]):
+        rows = []
+        fingerprints = {}
+        for entry in entries:
+            sql = entry[3]
+            text = fingerprint_sql(sql)
+            fingerprint = hashlib.sha256(text.encode()).hexdigest()[:16]
+            fingerprints[fingerprint] = (fingerprint, text, entry[0])
+            rows.append(
+                entry[:3] + (fingerprint, sql[: self._max_sql_length]) + entry[4:]
+            )
+        with db:
+            db.executemany(
+                "INSERT OR IGNORE INTO fingerprints VALUES (?, ?, ?)",
+                fingerprints.values(),
+            )
+            db.executemany(
+                """
+                INSERT INTO queries (
+                    ts, tool, cluster, fingerprint, sql, query_id, elapsed_ms,
+                    queued_ms, cpu_ms, processed_rows, processed_bytes,
+                    peak_memory_bytes, row_count, error
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+
+
+def _cluster_name(jdbc_url: str) -> Optional[str]:
+    """Имя кластера для журнала (без учетных данных из JDBC URL)."""
+    try:
+        return cluster_registry.resolve(jdbc_url).display_name
+    except Exception:
+        return None
+
+
+workload_history = WorkloadHistory(
+    path=config.WORKLOAD_HISTORY_PATH,
+    enabled=config.WORKLOAD_HISTORY_ENABLED,
+    queue_size=config.WORKLOAD_HISTORY_QUEUE_SIZE,
+    retention_days=config.WORKLOAD_HISTORY_RETENTION_DAYS,
+)